@@ -0,0 +1,47 @@
+import json
+import os
+import shutil
+import stat
+import sys
+
+import pytest
+
+# Add the 'src' directory and this directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_yt_dlp import full_entry
+
+FAKE_YT_DLP = os.path.join(os.path.dirname(__file__), "fake_yt_dlp.py")
+FAKE_API_DIR = os.path.join(os.path.dirname(__file__), "fake_api")
+
+
+@pytest.fixture
+def fake_base_dir(tmp_path):
+    """Application base directory whose bin/yt-dlp.exe is the fake script."""
+    if sys.platform == "win32":
+        pytest.skip("the fake yt-dlp is a script and needs a POSIX shebang")
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    yt_dlp = bin_dir / "yt-dlp.exe"
+    with open(FAKE_YT_DLP, "r", encoding="utf-8") as f:
+        yt_dlp.write_text(f"#!{sys.executable}\n" + f.read(), encoding="utf-8")
+    yt_dlp.chmod(yt_dlp.stat().st_mode | stat.S_IEXEC)
+    shutil.copy(yt_dlp, bin_dir / "ffmpeg.exe")
+    return str(tmp_path)
+
+
+@pytest.fixture
+def fake_yt_dlp_package(monkeypatch):
+    """Make the fake yt_dlp package importable for the in-process backend."""
+    monkeypatch.syspath_prepend(FAKE_API_DIR)
+
+
+@pytest.fixture(scope="session")
+def flat_lines():
+    """20000 listing lines as printed with the --print entry template."""
+    keys = ("id", "url", "title", "duration")
+    return [json.dumps({key: full_entry(i)[key] for key in keys}) for i in range(20000)]
@@ -0,0 +1,68 @@
+"""
+Stand-in for the yt_dlp package used by the backend benchmark.
+
+YoutubeDL.download() runs the download of fake_yt_dlp in the calling
+process. Like the real package, its screen output goes to the ``logger``
+option and ``--print`` output to YoutubeDL.to_stdout(), which writes to
+the process's stdout.
+"""
+
+import io
+import sys
+from collections import namedtuple
+
+import fake_yt_dlp
+
+ParsedOptions = namedtuple("ParsedOptions", "parser options urls ydl_opts")
+
+
+def parse_options(argv):
+    """Keep the command line for YoutubeDL, as yt_dlp.parse_options() parses it."""
+    urls = [arg for arg in argv if arg.startswith("http")]
+    return ParsedOptions(None, None, urls, {"argv": list(argv)})
+
+
+class _LoggerStream(io.TextIOBase):
+    """Text stream writing complete lines to a yt-dlp logger."""
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.pending = ""
+
+    def write(self, text):
+        lines = (self.pending + text).split("\n")
+        self.pending = lines.pop()
+        for line in lines:
+            self.logger.debug(line)
+        return len(text)
+
+
+class YoutubeDL:
+    """Downloads with fake_yt_dlp, reporting through params["logger"]."""
+
+    def __init__(self, params):
+        self.params = params
+        self._out = sys.stdout
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def close(self):
+        pass
+
+    def to_stdout(self, message):
+        self._out.write(message + "\n")
+        self._out.flush()
+
+    def download(self, urls):
+        stdout, forced_print = sys.stdout, fake_yt_dlp.forced_print
+        sys.stdout = _LoggerStream(self.params["logger"])
+        fake_yt_dlp.forced_print = self.to_stdout
+        try:
+            fake_yt_dlp.download(self.params["argv"])
+        finally:
+            sys.stdout, fake_yt_dlp.forced_print = stdout, forced_print
+        return 0
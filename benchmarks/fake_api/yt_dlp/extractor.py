@@ -0,0 +1,9 @@
+"""Fake extractor registry; loading it costs FAKE_YTDLP_STARTUP seconds."""
+
+import os
+import time
+
+
+def gen_extractor_classes():
+    time.sleep(float(os.environ.get("FAKE_YTDLP_STARTUP", "0")))
+    return []
@@ -0,0 +1,265 @@
+"""
+Scripted stand-in for yt-dlp used by the benchmarks.
+
+It understands just enough of the command line built by app.engine:
+
+- ``--flat-playlist`` prints FAKE_YTDLP_ENTRIES listing entries, either as
+  full ``--dump-json`` objects or with the fields of a ``--print`` template.
+- Anything else is a download. Every stream of a comma-separated
+  ``--format`` gets the ``before_dl:`` metadata line with its file name, then
+  FAKE_YTDLP_PROGRESS_LINES progress lines (template JSON when
+  ``--progress-template`` is given, plain ``[download]  x%`` otherwise)
+  and its ``after_move:`` path; the file is created if the output
+  directory exists. A single stream ends with a merge step instead.
+- Commands with ``-progress`` act as ffmpeg: FAKE_FFMPEG_SECONDS of
+  ``-progress`` output, then the output file is written. Other commands
+  with ``-i`` describe the input like ``ffmpeg -i`` does.
+
+FAKE_YTDLP_RATE limits the number of lines printed per second (0 means
+as fast as possible). FAKE_YTDLP_STARTUP adds the seconds yt-dlp.exe needs
+to unpack and import its extractors before listing or downloading.
+
+With FAKE_YTDLP_FRAGMENTS set, downloads are fragmented streams instead:
+every fragment takes FAKE_YTDLP_FRAGMENT_LATENCY seconds, and
+``--concurrent-fragments`` (or aria2c's ``-x``) fragments are fetched at
+once, like DASH/HLS downloads on a high-latency link.
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+ENTRIES = int(os.environ.get("FAKE_YTDLP_ENTRIES", "2000"))
+PROGRESS_LINES = int(os.environ.get("FAKE_YTDLP_PROGRESS_LINES", "200"))
+RATE = float(os.environ.get("FAKE_YTDLP_RATE", "0"))
+FRAGMENTS = int(os.environ.get("FAKE_YTDLP_FRAGMENTS", "0"))
+FRAGMENT_LATENCY = float(os.environ.get("FAKE_YTDLP_FRAGMENT_LATENCY", "0.02"))
+FFMPEG_SECONDS = float(os.environ.get("FAKE_FFMPEG_SECONDS", "0.1"))
+STARTUP = float(os.environ.get("FAKE_YTDLP_STARTUP", "0"))
+
+# Total size reported for every fake download
+TOTAL_BYTES = 50 * 1024 * 1024
+
+
+def full_entry(index):
+    """Return a flat-playlist entry shaped like real --dump-json output."""
+    video_id = "v%010d" % index
+    url = "https://www.youtube.com/watch?v=" + video_id
+    return {
+        "_type": "url",
+        "ie_key": "Youtube",
+        "id": video_id,
+        "url": url,
+        "title": "Benchmark video number %d with a realistic title" % index,
+        "description": None,
+        "duration": 60.0 + index % 600,
+        "channel_id": "UCbenchmarkchannel000000",
+        "channel": "Benchmark Channel",
+        "uploader": "Benchmark Channel",
+        "uploader_url": "https://www.youtube.com/@benchmark",
+        "thumbnails": [
+            {
+                "url": "https://i.ytimg.com/vi/%s/hqdefault.jpg?sqp=%d" % (video_id, h),
+                "height": h,
+                "width": h * 16 // 9,
+            }
+            for h in (94, 110, 138, 188)
+        ],
+        "view_count": index * 37,
+        "webpage_url": url,
+        "original_url": url,
+        "extractor": "youtube",
+        "extractor_key": "Youtube",
+        "playlist_count": ENTRIES,
+        "playlist": "Benchmark Channel - Videos",
+        "playlist_index": index + 1,
+        "duration_string": "1:00",
+        "_version": {"version": "2024.08.06", "repository": "yt-dlp/yt-dlp"},
+    }
+
+
+def option(args, name):
+    """Return the values following every occurrence of an option."""
+    return [args[i + 1] for i, arg in enumerate(args[:-1]) if arg == name]
+
+
+def render(template, data):
+    """Render the %(.{a,b})j templates used by app.engine."""
+
+    def replace(match):
+        keys = match.group(2).split(",")
+        source = data.get(match.group(1), {}) if match.group(1) else data
+        return json.dumps({key: source.get(key) for key in keys})
+
+    return re.sub(r"%\((\w*)\.\{([\w,]+)\}\)j", replace, template)
+
+
+def emit(line):
+    """Print one line, honouring FAKE_YTDLP_RATE."""
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+    if RATE:
+        time.sleep(1.0 / RATE)
+
+
+def forced_print(line):
+    """Print the output of a --print template."""
+    emit(line)
+
+
+def list_entries(args):
+    """Print the entries of a fake playlist."""
+    templates = option(args, "--print")
+    for index in range(ENTRIES):
+        entry = full_entry(index)
+        if templates:
+            emit(render(templates[0], entry))
+        else:
+            emit(json.dumps(entry))
+
+
+def download(args):
+    """Pretend to download a single video."""
+    url = next((arg for arg in args if arg.startswith("http")), "")
+    info = {"id": url.rsplit("=", 1)[-1], "title": "Video " + url, "duration": 212}
+    progress_templates = dict(
+        template.split(":", 1) for template in option(args, "--progress-template")
+    )
+    streams = (option(args, "--format") or ["best"])[0].split(",")
+    for index in range(len(streams)):
+        info["filename"] = stream_path(args, info, index)
+        for template in option(args, "--print"):
+            if template.startswith("before_dl:"):
+                forced_print(render(template[len("before_dl:") :], info))
+
+        if FRAGMENTS:
+            download_fragments(args, progress_templates)
+        else:
+            download_stream(progress_templates)
+        move_stream(args, info, index)
+
+    if len(streams) > 1:
+        return
+    if "postprocess" in progress_templates:
+        for status in ("started", "finished"):
+            progress = {"status": status, "postprocessor": "Merger"}
+            emit(render(progress_templates["postprocess"], {"progress": progress}))
+    else:
+        emit('[Merger] Merging formats into "Video.mp4"')
+
+
+def download_stream(progress_templates):
+    """Print the progress of one stream."""
+    started = time.monotonic()
+    for step in range(1, PROGRESS_LINES + 1):
+        done = TOTAL_BYTES * step // PROGRESS_LINES
+        if "download" in progress_templates:
+            progress = {
+                "status": "downloading" if step < PROGRESS_LINES else "finished",
+                "downloaded_bytes": done,
+                "total_bytes": TOTAL_BYTES,
+                "speed": done / max(time.monotonic() - started, 0.001),
+                "eta": PROGRESS_LINES - step,
+            }
+            emit(render(progress_templates["download"], {"progress": progress}))
+        else:
+            emit(
+                "[download] %5.1f%% of   50.00MiB at    4.20MiB/s ETA 00:%02d"
+                % (done * 100.0 / TOTAL_BYTES, (PROGRESS_LINES - step) % 60)
+            )
+
+
+def stream_path(args, info, index):
+    """Return the file a stream is downloaded to, or None without --output."""
+    outputs = option(args, "--output")
+    if not outputs:
+        return None
+    return (
+        outputs[0]
+        .replace("%(title)s", info["id"])
+        .replace("%(format_id)s", str(137 + index))
+        .replace("%(ext)s", "m4a" if index else "mp4")
+    )
+
+
+def move_stream(args, info, index):
+    """Create the file of a downloaded stream and print its path."""
+    path = stream_path(args, info, index)
+    if path is None:
+        return
+    if os.path.isdir(os.path.dirname(path)):
+        with open(path, "wb") as f:
+            f.write(b"fake media")
+    for template in option(args, "--print"):
+        if template.startswith("after_move:"):
+            forced_print(template[len("after_move:") :].replace("%(filepath)s", path))
+
+
+def parallel_fragments(args):
+    """Return the number of fragments the command fetches at once."""
+    for value in option(args, "--external-downloader-args"):
+        match = re.search(r"-x (\d+)", value)
+        if match:
+            return int(match.group(1))
+    values = option(args, "--concurrent-fragments")
+    return int(values[0]) if values else 1
+
+
+def download_fragments(args, progress_templates):
+    """Pretend to download a fragmented stream."""
+    parallel = parallel_fragments(args)
+    fragment_bytes = TOTAL_BYTES // FRAGMENTS
+    started = time.monotonic()
+    for first in range(0, FRAGMENTS, parallel):
+        # A batch of fragments costs one round trip
+        time.sleep(FRAGMENT_LATENCY)
+        done = min(first + parallel, FRAGMENTS)
+        progress = {
+            "status": "downloading" if done < FRAGMENTS else "finished",
+            "downloaded_bytes": done * fragment_bytes,
+            "total_bytes": FRAGMENTS * fragment_bytes,
+            "speed": done * fragment_bytes / (time.monotonic() - started),
+            "fragment_index": done,
+            "fragment_count": FRAGMENTS,
+        }
+        if "download" in progress_templates:
+            emit(render(progress_templates["download"], {"progress": progress}))
+
+
+def ffmpeg(args):
+    """Pretend to merge or convert streams like ffmpeg -progress pipe:1."""
+    steps = 10
+    for step in range(1, steps + 1):
+        time.sleep(FFMPEG_SECONDS / steps)
+        emit("out_time_ms=%d" % (step * 212000000 // steps))
+        emit("progress=continue" if step < steps else "progress=end")
+    with open(args[-1], "wb") as f:
+        f.write(b"fake media")
+
+
+def probe():
+    """Describe an input file like ffmpeg -i without an output does."""
+    emit("  Duration: 00:03:32.00, start: 0.000000, bitrate: 128 kb/s")
+    emit("At least one output file must be specified")
+    return 1
+
+
+def main():
+    args = sys.argv[1:]
+    if "-progress" in args:
+        ffmpeg(args)
+    elif "-i" in args:
+        return probe()
+    elif "--flat-playlist" in args:
+        time.sleep(STARTUP)
+        list_entries(args)
+    else:
+        time.sleep(STARTUP)
+        download(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
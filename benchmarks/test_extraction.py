@@ -0,0 +1,81 @@
+"""Benchmarks for playlist/channel listing and the selection dialog."""
+
+import json
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.engine import iter_flat_entries
+from app.tasks import PlaylistEntry
+
+
+def test_parse_flat_entries(benchmark, flat_lines):
+    """Parse 20000 printed listing lines into PlaylistEntry objects."""
+
+    def parse():
+        return [PlaylistEntry.from_json(json.loads(line)) for line in flat_lines]
+
+    entries = benchmark(parse)
+    assert len(entries) == 20000
+
+
+def test_list_fake_channel(benchmark, fake_base_dir, monkeypatch):
+    """List a 2000-entry channel through a real yt-dlp subprocess."""
+    monkeypatch.setenv("FAKE_YTDLP_ENTRIES", "2000")
+
+    def list_channel():
+        return list(iter_flat_entries(fake_base_dir, "https://y/@bench/videos"))
+
+    entries = benchmark.pedantic(list_channel, rounds=5)
+    assert len(entries) == 2000
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    """Offscreen QApplication for widget benchmarks."""
+    pytest.importorskip("PyQt6")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
+
+
+def test_build_selection_dialog(benchmark, qapp, flat_lines):
+    """Fill the selection dialog with 20000 entries in streaming batches."""
+    from app.selection_dialog import VideoSelectionDialog
+
+    items = [(entry["url"], entry["title"]) for entry in map(json.loads, flat_lines)]
+    batches = [items[i : i + 50] for i in range(0, len(items), 50)]
+
+    def build():
+        dialog = VideoSelectionDialog("Benchmark")
+        for batch in batches:
+            dialog.add_entries(batch)
+        dialog.set_extraction_finished()
+        count = dialog.entry_count()
+        dialog.deleteLater()
+        return count
+
+    assert benchmark(build) == 20000
+
+
+def test_parse_url_import(benchmark):
+    """Normalize and deduplicate 5000 pasted URLs in different spellings."""
+    from app.url_import import collect_urls, split_urls
+
+    spellings = [
+        "https://www.youtube.com/watch?v={}&t=10s",
+        "https://youtu.be/{}?si=share",
+        "youtube.com/shorts/{}",
+    ]
+    text = "\n".join(
+        spellings[i % len(spellings)].format(f"vid{i % 2500:07d}") for i in range(5000)
+    )
+
+    def parse():
+        return collect_urls(split_urls(text))
+
+    urls, duplicates, invalid = benchmark(parse)
+    assert (len(urls), duplicates, invalid) == (2500, 2500, [])
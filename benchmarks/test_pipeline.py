@@ -0,0 +1,192 @@
+"""Benchmarks for the download queue, progress parsing and activity log."""
+
+import os
+import queue
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.engine import (
+    BACKEND_API,
+    BACKEND_SUBPROCESS,
+    DownloadEngine,
+    execute_task,
+    run_download,
+)
+from app.log_buffer import LogBuffer
+from app.progress import PROGRESS_PREFIX, parse_progress_line
+from app.queue_store import QueueStore
+from app.tasks import AUDIO_FORMAT_ORIGINAL, DownloadTask
+
+TEMPLATE_LINE = PROGRESS_PREFIX + (
+    '{"status": "downloading", "downloaded_bytes": 1048576, '
+    '"total_bytes": 52428800, "total_bytes_estimate": null, "speed": 4404019.2, '
+    '"eta": 11, "fragment_index": null, "fragment_count": null}'
+)
+LEGACY_LINE = "[download]  42.1% of ~ 10.00MiB at  1.20MiB/s ETA 00:07 (frag 3/20)"
+
+
+def test_queue_throughput(benchmark, tmp_path):
+    """Enqueue 2000 tasks and run them through pop/mark_done."""
+    tasks = [
+        DownloadTask.create(f"https://y/watch?v={i}", "/out", "Single Video").to_dict()
+        for i in range(2000)
+    ]
+
+    def churn():
+        store = QueueStore(str(tmp_path / "queue.db"))
+        store.extend(tasks)
+        while True:
+            task = store.pop_next()
+            if task is None:
+                break
+            store.mark_done(task["queue_id"])
+        store.resume()
+        store.close()
+
+    benchmark.pedantic(churn, rounds=3)
+
+
+@pytest.mark.parametrize("line", [TEMPLATE_LINE, LEGACY_LINE], ids=["json", "legacy"])
+def test_parse_progress(benchmark, line):
+    """Parse 10000 progress lines."""
+    lines = [line] * 10000
+
+    def parse():
+        return [parse_progress_line(item) for item in lines]
+
+    events = benchmark(parse)
+    assert events[0] is not None
+
+
+def test_log_pipeline(benchmark):
+    """Push 10000 log lines from four slots and drain them like the GUI."""
+    progress = [f"[download] {i % 100:5.1f}% of 50.00MiB" for i in range(10000)]
+
+    def pipeline():
+        buffer = LogBuffer()
+        for i, line in enumerate(progress):
+            buffer.push(line, i % 4)
+            if i % 50 == 0:
+                buffer.push(f"[info] message {i}", i % 4)
+            if i % 500 == 0:
+                buffer.drain()
+        return buffer.drain()
+
+    benchmark(pipeline)
+
+
+def test_run_download_output(benchmark, fake_base_dir, monkeypatch):
+    """Process the output of a fake download with 2000 progress lines."""
+    monkeypatch.setenv("FAKE_YTDLP_PROGRESS_LINES", "2000")
+    events = []
+
+    def download():
+        task = DownloadTask.create("https://y/watch?v=abc", "/out", "Single Video")
+        run_download(task, fake_base_dir, on_progress=events.append)
+        return task
+
+    task = benchmark.pedantic(download, rounds=5)
+    assert task.title == "Video https://y/watch?v=abc"
+    assert task.merges_streams
+
+
+@pytest.mark.parametrize(
+    "fragments, downloader",
+    [(1, None), (4, None), (8, None), (8, "aria2c")],
+    ids=["serial", "fragments-4", "fragments-8", "aria2c-8"],
+)
+def test_fragment_throughput(
+    benchmark, fake_base_dir, monkeypatch, fragments, downloader
+):
+    """Download a 50 MiB stream of 40 fragments with 20 ms latency each."""
+    monkeypatch.setenv("FAKE_YTDLP_FRAGMENTS", "40")
+    monkeypatch.setenv("FAKE_YTDLP_FRAGMENT_LATENCY", "0.02")
+    if downloader:
+        # Only the path is passed on, the fake yt-dlp never runs it
+        open(os.path.join(fake_base_dir, "bin", "aria2c.exe"), "w").close()
+    events = []
+
+    def download():
+        task = DownloadTask.create(
+            "https://y/watch?v=abc",
+            "/out",
+            "Single Video",
+            concurrent_fragments=fragments,
+            downloader=downloader,
+        )
+        run_download(task, fake_base_dir, on_progress=events.append)
+        return task
+
+    benchmark.pedantic(download, rounds=3)
+    assert events[-1].fragment_index == 40
+
+
+@pytest.mark.parametrize("pipelined", [False, True], ids=["inline", "pipelined"])
+def test_post_processing_overlap(benchmark, fake_base_dir, monkeypatch, pipelined):
+    """Download and merge 4 videos with one network and one ffmpeg worker."""
+    monkeypatch.setenv("FAKE_YTDLP_PROGRESS_LINES", "20")
+    monkeypatch.setenv("FAKE_YTDLP_RATE", "200")
+    monkeypatch.setenv("FAKE_FFMPEG_SECONDS", "0.2")
+    out_dir = os.path.join(fake_base_dir, "out")
+    os.makedirs(out_dir)
+
+    def tasks():
+        return [
+            DownloadTask.create(f"https://y/watch?v={i}", out_dir, "Single Video")
+            for i in range(4)
+        ]
+
+    def inline():
+        return [execute_task(t, fake_base_dir, None, 0, queue.Queue()) for t in tasks()]
+
+    def overlapped():
+        engine = DownloadEngine(
+            fake_base_dir, lambda event: None, max_workers=1, cpu_workers=1
+        )
+        futures = [engine.submit(task, i) for i, task in enumerate(tasks())]
+        results = [future.result() for future in futures]
+        engine.shutdown()
+        return results
+
+    results = benchmark.pedantic(overlapped if pipelined else inline, rounds=2)
+    assert all(task.error is None for task in results)
+    assert all(task.filepath.endswith(".mp4") for task in results)
+
+
+@pytest.mark.parametrize("backend", [BACKEND_SUBPROCESS, BACKEND_API])
+def test_backend_startup(
+    benchmark, fake_base_dir, fake_yt_dlp_package, monkeypatch, backend
+):
+    """Download 8 videos with 2 workers when yt-dlp takes 0.3 s to start."""
+    monkeypatch.setenv("FAKE_YTDLP_STARTUP", "0.3")
+    monkeypatch.setenv("FAKE_YTDLP_PROGRESS_LINES", "20")
+    out_dir = os.path.join(fake_base_dir, "out")
+    os.makedirs(out_dir)
+    engine = DownloadEngine(
+        fake_base_dir, lambda event: None, max_workers=2, backend=backend
+    )
+    assert engine.backend == backend
+
+    def batch():
+        futures = [
+            engine.submit(
+                DownloadTask.create(
+                    f"https://y/watch?v={i}",
+                    out_dir,
+                    "MP3 Only",
+                    audio_format=AUDIO_FORMAT_ORIGINAL,
+                ),
+                i,
+            )
+            for i in range(8)
+        ]
+        return [future.result() for future in futures]
+
+    # The first batch starts the workers, later ones find them loaded
+    results = benchmark.pedantic(batch, rounds=3, warmup_rounds=1)
+    engine.shutdown()
+    assert all(task.error is None for task in results)
+    # Both backends report the printed file paths
+    assert all(task.filepath.endswith(".mp4") for task in results)
@@ -0,0 +1,440 @@
+"""
+Headless batch mode for running downloads without the GUI.
+
+Usage:
+    python main.py --batch urls.txt --mode "Playlist MP3" --out DIR --jobs 4
+
+This module must not import PyQt6 so that batch runs start quickly and
+work on machines without a display.
+"""
+
+import argparse
+import functools
+import os
+import sys
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Set, TextIO
+
+from .concurrency import ConcurrencyController, parse_rate
+from .download_index import DownloadIndex, media_kind
+from .engine import (
+    BACKEND_SUBPROCESS,
+    BACKENDS,
+    CHANNEL_MODES,
+    DEFAULT_CONCURRENT_FRAGMENTS,
+    DEFAULT_CPU_WORKERS,
+    DOWNLOAD_MODES,
+    EVENT_DOWNLOADED,
+    EVENT_FINISHED,
+    EVENT_METADATA,
+    EVENT_PROGRESS,
+    PLAYLIST_MODES,
+    DownloadEngine,
+    EngineEvent,
+    channel_entry_filter,
+    channel_listing_url,
+    find_aria2c,
+    get_archive_path,
+    iter_flat_entries,
+    partial_bytes,
+)
+from .metrics import MetricsLog, format_summary
+from .progress import STAGE_DOWNLOAD, format_bytes, parse_bytes
+from .queue_store import QueueStore
+from .tasks import AUDIO_FORMAT_MP3, AUDIO_FORMATS, DownloadTask
+
+# Upper bound for the --jobs option
+MAX_JOBS = 16
+
+# Maximum seconds the scheduler sleeps without being woken up
+SCHEDULE_INTERVAL = 1.0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for batch mode."""
+    parser = argparse.ArgumentParser(
+        prog="yt-downloader-gui",
+        description="Download the URLs listed in a file without opening the GUI.",
+    )
+    parser.add_argument(
+        "--batch",
+        required=True,
+        metavar="FILE",
+        help="text file with one URL per line ('-' reads from stdin)",
+    )
+    parser.add_argument(
+        "--mode", default="Single Video", choices=DOWNLOAD_MODES, help="download mode"
+    )
+    parser.add_argument(
+        "--out", default=".", metavar="DIR", help="download destination directory"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=3, help="number of concurrent downloads"
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="adapt the number of concurrent downloads to the available "
+        "bandwidth, using --jobs as the maximum",
+    )
+    parser.add_argument(
+        "--limit-rate",
+        type=parse_rate,
+        metavar="RATE",
+        help="total download speed limit such as 5M, split across downloads",
+    )
+    parser.add_argument(
+        "--fragments",
+        type=int,
+        default=DEFAULT_CONCURRENT_FRAGMENTS,
+        metavar="N",
+        help="DASH/HLS fragments downloaded in parallel per video "
+        f"(default: {DEFAULT_CONCURRENT_FRAGMENTS})",
+    )
+    parser.add_argument(
+        "--http-chunk-size",
+        type=parse_bytes,
+        metavar="SIZE",
+        help="download in ranged requests of this size, such as 10M",
+    )
+    parser.add_argument(
+        "--aria2c",
+        action="store_true",
+        help="use aria2c as external downloader if it is installed",
+    )
+    parser.add_argument(
+        "--audio-format",
+        default=AUDIO_FORMAT_MP3,
+        choices=AUDIO_FORMATS,
+        help="audio modes: convert to mp3 or keep the original m4a/opus "
+        "stream without re-encoding (default: mp3)",
+    )
+    parser.add_argument(
+        "--cpu-jobs",
+        type=int,
+        default=DEFAULT_CPU_WORKERS,
+        metavar="N",
+        help="number of concurrent merges and MP3 conversions, separate "
+        f"from --jobs (default: {DEFAULT_CPU_WORKERS})",
+    )
+    parser.add_argument(
+        "--quality",
+        default="Best Available",
+        help="video quality such as 1080p (default: Best Available)",
+    )
+    parser.add_argument(
+        "--audio-quality", default="320", help="MP3 bitrate in kbps (default: 320)"
+    )
+    parser.add_argument("--cookies", metavar="FILE", help="cookie file to use")
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="run downloads in worker processes instead of threads",
+    )
+    parser.add_argument(
+        "--backend",
+        default=BACKEND_SUBPROCESS,
+        choices=BACKENDS,
+        help="run bin/yt-dlp.exe for every download, or the yt_dlp Python "
+        "package in worker processes that stay loaded (default: subprocess)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="JSON lines file receiving per-download metrics "
+        "(default: data/metrics.jsonl)",
+    )
+    parser.add_argument(
+        "--prometheus",
+        metavar="FILE",
+        help="Prometheus text file updated with download totals",
+    )
+    parser.add_argument(
+        "--queue",
+        metavar="DB",
+        help="queue database; an interrupted batch resumes from it",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="DB",
+        help="index of downloaded files used to skip videos already in the "
+        "output folder (default: data/downloads.db)",
+    )
+    parser.add_argument(
+        "--redownload",
+        action="store_true",
+        help="download videos again even if they are already in the output folder",
+    )
+    return parser
+
+
+def read_urls(stream: TextIO) -> List[str]:
+    """
+    Read URLs from a batch file, skipping blank lines and # comments.
+
+    Args:
+        stream: Open text file
+
+    Returns:
+        List of URLs in file order, without duplicates
+    """
+    urls: List[str] = []
+    seen = set()
+    for line in stream:
+        url = line.strip()
+        if not url or url.startswith("#") or url in seen:
+            continue
+        seen.add(url)
+        urls.append(url)
+    return urls
+
+
+def expand_url(args: argparse.Namespace, base_dir: str, url: str) -> List[DownloadTask]:
+    """
+    Turn a batch URL into download tasks for the selected mode.
+
+    Playlists and channels are listed with a flat extraction and every
+    video becomes a task; other URLs become a single task.
+
+    Args:
+        args: Parsed command-line arguments
+        base_dir: Application base directory containing bin/
+        url: URL from the batch file
+
+    Returns:
+        List of download tasks
+    """
+    archive = None
+    keep = None
+    if args.mode in CHANNEL_MODES:
+        url = channel_listing_url(url, args.mode)
+        archive = get_archive_path(base_dir, url)
+        keep = channel_entry_filter(args.mode)
+    elif args.mode not in PLAYLIST_MODES:
+        return [_task(args, url)]
+
+    tasks = []
+    for entry in iter_flat_entries(base_dir, url):
+        if keep is not None and not keep(entry):
+            continue
+        tasks.append(_task(args, entry.url, entry.title, archive))
+    return tasks
+
+
+def _task(
+    args: argparse.Namespace,
+    url: str,
+    title: Optional[str] = None,
+    archive: Optional[str] = None,
+) -> DownloadTask:
+    """Create a download task from the command-line options."""
+    return DownloadTask.create(
+        url,
+        os.path.abspath(args.out),
+        args.mode,
+        video_quality=args.quality,
+        audio_quality=args.audio_quality,
+        title=title,
+        archive=archive,
+        concurrent_fragments=max(1, args.fragments),
+        http_chunk_size=args.http_chunk_size,
+        downloader="aria2c" if args.aria2c else None,
+        audio_format=args.audio_format,
+    )
+
+
+def run_batch(args: argparse.Namespace, base_dir: str) -> int:
+    """
+    Queue the batch URLs and download them with the download engine.
+
+    Args:
+        args: Parsed command-line arguments
+        base_dir: Application base directory containing bin/
+
+    Returns:
+        Process exit code (0 if every download succeeded)
+    """
+    store = QueueStore(args.queue or os.path.join(base_dir, "data", "cli_queue.db"))
+    failed = 0
+
+    # Tasks left over from an interrupted run are downloaded first
+    resumed = store.resume()
+    if resumed:
+        print(f"Resuming {resumed} queued downloads", flush=True)
+
+    if args.batch == "-":
+        urls = read_urls(sys.stdin)
+    else:
+        with open(args.batch, "r", encoding="utf-8") as f:
+            urls = read_urls(f)
+
+    # Files in the output folder are indexed before anything is queued
+    out_dir = os.path.abspath(args.out)
+    index = DownloadIndex(args.index or os.path.join(base_dir, "data", "downloads.db"))
+    index.rebuild([out_dir])
+
+    # Videos still queued from the interrupted run are not queued twice
+    queued = store.queued_urls()
+
+    for url in urls:
+        try:
+            tasks = expand_url(args, base_dir, url)
+        except Exception as e:
+            print(f"Failed to list {url}: {e}", flush=True)
+            failed += 1
+            continue
+        if not args.redownload:
+            downloaded = index.lookup(
+                out_dir, media_kind(args.mode), [(t.url, t.title or "") for t in tasks]
+            )
+            if downloaded:
+                print(f"Skipping {len(downloaded)} already downloaded", flush=True)
+                tasks = [task for task in tasks if task.url not in downloaded]
+        already_queued = sum(task.url in queued for task in tasks)
+        if already_queued:
+            print(f"Skipping {already_queued} already queued", flush=True)
+            tasks = [task for task in tasks if task.url not in queued]
+        queued.update(task.url for task in tasks)
+        store.extend(task.to_dict() for task in tasks)
+        print(f"Queued {len(tasks)} downloads from {url}", flush=True)
+
+    if args.aria2c and find_aria2c(base_dir) is None:
+        print("aria2c not found, using the yt-dlp downloader", file=sys.stderr)
+
+    metrics_log = MetricsLog(
+        args.metrics or os.path.join(base_dir, "data", "metrics.jsonl"),
+        args.prometheus,
+    )
+    jobs = max(1, min(args.jobs, MAX_JOBS))
+    controller = ConcurrencyController(
+        1 if args.adaptive else jobs, jobs, args.limit_rate
+    )
+    wake = threading.Event()
+    started: Dict[int, DownloadTask] = {}
+    engine = DownloadEngine(
+        base_dir,
+        functools.partial(_report_event, controller, wake, store, started),
+        max_workers=jobs,
+        use_processes=args.processes,
+        metrics_log=metrics_log,
+        cpu_workers=max(1, args.cpu_jobs),
+        download_index=index,
+        backend=args.backend,
+    )
+    if engine.backend != args.backend:
+        print("yt_dlp package not found, using bin/yt-dlp.exe", file=sys.stderr)
+    running: Set["Future[DownloadTask]"] = set()
+    try:
+        while store or running:
+            # Keep at most `limit` downloads transferring; tasks that are
+            # being converted do not count, the rest stay in the queue
+            while store and controller.active < controller.limit:
+                data = store.pop_next()
+                if data is None:
+                    break
+                task = DownloadTask.from_dict(data)
+                task.rate_limit = controller.job_rate_limit()
+                resumed = partial_bytes(task)
+                if resumed:
+                    name = task.title or task.url
+                    print(f"Resuming {name}: {format_bytes(resumed)} kept", flush=True)
+                started[task.queue_id] = task
+                controller.started(task.queue_id)
+                future = engine.submit(task, task.queue_id, args.cookies)
+                future.add_done_callback(lambda _: wake.set())
+                running.add(future)
+
+            # Wait for a freed download slot or a finished task
+            wake.wait(SCHEDULE_INTERVAL)
+            wake.clear()
+            done = {future for future in running if future.done()}
+            running -= done
+            for future in done:
+                task = future.result()
+                started.pop(task.queue_id, None)
+                if task.error:
+                    failed += 1
+                    store.mark_failed(task.queue_id, task.error)
+                else:
+                    store.mark_done(task.queue_id)
+    finally:
+        engine.shutdown(wait=not running)
+        store.close()
+        index.close()
+
+    summary = format_summary(metrics_log.summary())
+    if summary:
+        print(" | ".join(summary))
+    print(f"Finished with {failed} failures" if failed else "All downloads finished")
+    return 1 if failed else 0
+
+
+def _report_event(
+    controller: ConcurrencyController,
+    wake: threading.Event,
+    store: QueueStore,
+    started: Dict[int, DownloadTask],
+    event: EngineEvent,
+) -> None:
+    """
+    Feed the concurrency controller, keep the files of running downloads
+    and print every finished download.
+
+    Args:
+        controller: Controller of the running batch
+        wake: Set when the scheduler may start another download
+        store: Queue storing the files of running downloads
+        started: Running tasks by queue ID
+        event: Engine event whose key is the queue ID
+    """
+    if event.kind == EVENT_METADATA:
+        # Remember the files being written so the next run can resume them
+        task = started.get(event.key)
+        if task is not None:
+            task.apply_metadata(event.data)
+            store.update(event.key, task.to_dict())
+        return
+
+    if event.kind == EVENT_PROGRESS:
+        downloading = event.data.stage == STAGE_DOWNLOAD
+        controller.progress(event.key, event.data.speed if downloading else None)
+    elif event.kind == EVENT_DOWNLOADED:
+        controller.finished(event.key, event.data.error)
+        wake.set()
+    elif event.kind == EVENT_FINISHED:
+        task = event.data
+        name = task.title or task.url
+        if task.error:
+            print(f"FAILED {name}: {task.error}", flush=True)
+        else:
+            print(f"Done   {name}", flush=True)
+        return
+    else:
+        return
+
+    if controller.update():
+        speed = controller.throughput
+        at = f" at {format_bytes(speed)}/s" if speed else ""
+        print(f"Adaptive concurrency: {controller.limit} downloads{at}", flush=True)
+        wake.set()
+
+
+def main(argv: List[str], base_dir: str) -> int:
+    """
+    Entry point for batch mode.
+
+    Args:
+        argv: Command-line arguments without the program name
+        base_dir: Application base directory containing bin/
+
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return run_batch(args, base_dir)
+    except KeyboardInterrupt:
+        # Running tasks are resumed by the next batch run
+        print("Interrupted", file=sys.stderr)
+        return 130
@@ -0,0 +1,250 @@
+"""
+Adaptive download concurrency and bandwidth limiting.
+
+ConcurrencyController decides how many downloads may run at once. It
+watches the combined speed reported by yt-dlp progress and the result of
+finished downloads, and adjusts the limit AIMD-style: one more download
+while the combined speed keeps growing, half as many when downloads are
+throttled or failing. A global speed limit is split across the jobs.
+"""
+
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from .progress import parse_bytes
+
+# Seconds of progress averaged before each adjustment
+ADJUST_INTERVAL = 10.0
+
+# Relative throughput gain that justifies the last added download
+MIN_GAIN = 0.05
+
+# Adjustment windows to wait after backing off from a saturated link
+HOLD_WINDOWS = 3
+
+# Failure rate within a window that counts as throttling
+ERROR_RATE_THRESHOLD = 0.5
+
+# Concurrency used when adaptive mode starts
+INITIAL_JOBS = 2
+
+# Error messages that mean the server is rate limiting us
+_THROTTLE_RE = re.compile(r"HTTP Error 429|Too Many Requests|rate.?limit", re.I)
+
+
+def parse_rate(value: str) -> int:
+    """
+    Parse a speed limit in yt-dlp's --limit-rate notation.
+
+    Args:
+        value: Rate such as "500K", "2.5M" or "1048576"
+
+    Returns:
+        Rate in bytes per second
+
+    Raises:
+        ValueError: If the rate cannot be parsed
+    """
+    value = value.strip()
+    if value.lower().endswith("/s"):
+        value = value[:-2]
+    return parse_bytes(value)
+
+
+def is_throttle_error(error: str) -> bool:
+    """Return True if a download error indicates rate limiting."""
+    return bool(_THROTTLE_RE.search(error))
+
+
+class ConcurrencyController:
+    """
+    Thread-safe AIMD controller for the number of concurrent downloads.
+
+    The scheduler asks for ``limit`` before starting a download and reports
+    started(), progress() and finished() for every download. update() is
+    called periodically and changes the limit at most once per
+    ADJUST_INTERVAL. With min_jobs equal to max_jobs the limit is fixed.
+    """
+
+    def __init__(
+        self, min_jobs: int = 1, max_jobs: int = 1, rate_limit: Optional[int] = None
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            min_jobs: Lowest number of concurrent downloads
+            max_jobs: Highest number of concurrent downloads
+            rate_limit: Optional total speed limit in bytes per second
+        """
+        self._lock = threading.Lock()
+        self.min_jobs = 1
+        self.max_jobs = 1
+        self.limit = 1
+        self.rate_limit = rate_limit
+        self.throughput: Optional[float] = None
+        self._speeds: Dict[object, float] = {}
+        self._active: set = set()
+        self._previous: Optional[float] = None
+        self._increased = False
+        self._hold = 0
+        self._reset_window(time.monotonic())
+        self.set_bounds(min_jobs, max_jobs)
+
+    def set_bounds(self, min_jobs: int, max_jobs: int) -> None:
+        """
+        Change the user bounds, restarting adaptation if they differ.
+
+        Args:
+            min_jobs: Lowest number of concurrent downloads
+            max_jobs: Highest number of concurrent downloads
+        """
+        with self._lock:
+            self.max_jobs = max(1, max_jobs)
+            self.min_jobs = max(1, min(min_jobs, self.max_jobs))
+            if self.min_jobs == self.max_jobs:
+                self.limit = self.max_jobs
+            else:
+                self.limit = max(self.min_jobs, min(INITIAL_JOBS, self.max_jobs))
+            self._previous = None
+            self._increased = False
+            self._hold = 0
+
+    @property
+    def active(self) -> int:
+        """Number of downloads started and not yet downloaded."""
+        with self._lock:
+            return len(self._active)
+
+    @property
+    def adaptive(self) -> bool:
+        """Whether the limit is adjusted automatically."""
+        return self.min_jobs != self.max_jobs
+
+    def job_rate_limit(self) -> Optional[int]:
+        """
+        Return the speed limit for a download started now.
+
+        The global limit is split evenly across the allowed jobs.
+
+        Returns:
+            Bytes per second, or None without a global limit
+        """
+        if not self.rate_limit:
+            return None
+        return max(1, self.rate_limit // self.limit)
+
+    def started(self, key: object) -> None:
+        """Record that a download was started."""
+        with self._lock:
+            self._active.add(key)
+
+    def progress(self, key: object, speed: Optional[float]) -> None:
+        """
+        Record the current speed of a download.
+
+        Args:
+            key: Download key
+            speed: Speed in bytes per second, or None when the download is
+                post-processing and no longer transferring
+        """
+        with self._lock:
+            if speed is None:
+                self._speeds.pop(key, None)
+            else:
+                self._speeds[key] = speed
+            self._speed_sum += sum(self._speeds.values())
+            self._samples += 1
+            if len(self._active) >= self.limit:
+                self._saturated = True
+
+    def finished(self, key: object, error: Optional[str] = None) -> None:
+        """
+        Record the result of a download.
+
+        Args:
+            key: Download key
+            error: Error message if the download failed
+        """
+        with self._lock:
+            self._active.discard(key)
+            self._speeds.pop(key, None)
+            self._finished += 1
+            if error:
+                self._failed += 1
+                if is_throttle_error(error):
+                    self._throttled = True
+
+    def update(self, now: Optional[float] = None) -> bool:
+        """
+        Adjust the limit once the current window has ended.
+
+        Args:
+            now: Current time.monotonic() value
+
+        Returns:
+            True if the limit changed
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if now - self._window_start < ADJUST_INTERVAL:
+                return False
+
+            self.throughput = self._speed_sum / self._samples if self._samples else None
+            limit = self._adjust()
+            self._reset_window(now)
+            if limit == self.limit:
+                return False
+            self.limit = limit
+            return True
+
+    def _adjust(self) -> int:
+        """Return the limit for the next window (lock held)."""
+        if not self.adaptive:
+            return self.limit
+
+        # Multiplicative decrease when the server pushes back
+        failing = (
+            self._finished >= 2
+            and self._failed / self._finished >= ERROR_RATE_THRESHOLD
+        )
+        if self._throttled or failing:
+            self._previous = None
+            self._increased = False
+            self._hold = HOLD_WINDOWS
+            return max(self.min_jobs, self.limit // 2)
+
+        if self._hold:
+            self._hold -= 1
+            return self.limit
+
+        # Nothing to learn if the queue did not use every slot
+        if not self._saturated or self.throughput is None:
+            return self.limit
+
+        previous, self._previous = self._previous, self.throughput
+        if (
+            self._increased
+            and previous is not None
+            and self.throughput < previous * (1 + MIN_GAIN)
+        ):
+            # The last download added no throughput, the link is full
+            self._increased = False
+            self._hold = HOLD_WINDOWS
+            return max(self.min_jobs, self.limit - 1)
+
+        # Additive increase while throughput keeps growing
+        self._increased = self.limit < self.max_jobs
+        return min(self.max_jobs, self.limit + 1)
+
+    def _reset_window(self, now: float) -> None:
+        """Start a new measurement window (lock held)."""
+        self._window_start = now
+        self._speed_sum = 0.0
+        self._samples = 0
+        self._finished = 0
+        self._failed = 0
+        self._throttled = False
+        self._saturated = False
@@ -0,0 +1,339 @@
+"""
+Index of downloaded files used to skip videos that already exist.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .tasks import DownloadTask, is_audio_mode
+
+# Kinds of downloaded files; a video and its MP3 are different downloads
+KIND_VIDEO = "video"
+KIND_AUDIO = "audio"
+
+# File extensions indexed per kind
+AUDIO_EXTENSIONS = {"mp3", "m4a", "opus", "ogg", "aac", "flac", "wav"}
+VIDEO_EXTENSIONS = {"mp4", "mkv", "webm", "mov", "avi", "flv"}
+
+# Video IDs in yt-dlp's default file names, e.g. "Title [dQw4w9WgXcQ]"
+_FILENAME_ID_RE = re.compile(r"\[([\w-]{11})\]$")
+
+# Separately downloaded streams that have not been merged yet
+_STREAM_PART_RE = re.compile(r"\.f(\d+|\w+-[\w-]+)$")
+
+# Characters yt-dlp replaces by look-alikes when naming files after titles
+_FILENAME_CHARS = {ord(char): chr(ord(char) + 0xFEE0) for char in '|*<>:"?'}
+_FILENAME_CHARS.update({ord("/"): "⧸", ord("\\"): "⧹"})
+
+# Bytes read at a time when hashing files
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def video_id_from_url(url: str) -> Optional[str]:
+    """
+    Extract the video ID from a YouTube video URL.
+
+    Args:
+        url: Watch, shorts, embed or youtu.be URL
+
+    Returns:
+        Video ID, or None for other URLs
+    """
+    parts = urlsplit(url.strip())
+    if parts.netloc.lower().endswith("youtu.be"):
+        return parts.path.strip("/").split("/")[0] or None
+
+    video_ids = parse_qs(parts.query).get("v")
+    if video_ids:
+        return video_ids[0]
+
+    segments = [segment for segment in parts.path.split("/") if segment]
+    if len(segments) >= 2 and segments[0] in ("shorts", "embed", "live"):
+        return segments[1]
+    return None
+
+
+def title_stem(title: str) -> str:
+    """
+    Return the file name yt-dlp gives a title, without the extension.
+
+    Args:
+        title: Video title
+
+    Returns:
+        Title with the characters yt-dlp replaces in file names replaced
+    """
+    return title.translate(_FILENAME_CHARS).strip()
+
+
+def media_kind(mode: str) -> str:
+    """Return the kind of file a download mode produces."""
+    return KIND_AUDIO if is_audio_mode(mode) else KIND_VIDEO
+
+
+def file_kind(path: str) -> Optional[str]:
+    """
+    Classify a file by its extension.
+
+    Args:
+        path: File path
+
+    Returns:
+        KIND_AUDIO, KIND_VIDEO, or None for other files
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in AUDIO_EXTENSIONS:
+        return KIND_AUDIO
+    if extension in VIDEO_EXTENSIONS:
+        return KIND_VIDEO
+    return None
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _folder_key(path: str) -> str:
+    """Normalize a folder path for comparisons."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+class DownloadIndex:
+    """
+    SQLite index of downloaded files, keyed by path.
+
+    Every row holds the folder of the file, the video ID if known, the file
+    name without extension (yt-dlp derives it from the title), the kind
+    (video or audio), format, size and optionally a SHA-256 hash. Videos
+    are looked up by ID or, for files indexed without one, by title.
+    Lookups only report files that still exist and drop stale rows.
+    """
+
+    def __init__(self, db_path: str, hash_files: bool = False):
+        """
+        Open (or create) the index database.
+
+        Args:
+            db_path: Path to the SQLite database file, or ":memory:"
+            hash_files: Store a SHA-256 hash of every added file
+        """
+        self.db_path = db_path
+        self.hash_files = hash_files
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, "
+                "folder TEXT NOT NULL, "
+                "video_id TEXT, "
+                "stem TEXT NOT NULL, "
+                "kind TEXT NOT NULL, "
+                "format TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "sha256 TEXT, "
+                "added REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS files_folder ON files (folder, kind)"
+            )
+
+    def __len__(self) -> int:
+        """Return the number of indexed files."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def _row(
+        self, path: str, video_id: Optional[str], sha256: Optional[str] = None
+    ) -> Optional[tuple]:
+        """Build the row of a media file, or None if it is not one."""
+        kind = file_kind(path)
+        stem, extension = os.path.splitext(os.path.basename(path))
+        if kind is None or _STREAM_PART_RE.search(stem):
+            return None
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+
+        if video_id is None:
+            match = _FILENAME_ID_RE.search(stem)
+            video_id = match.group(1) if match else None
+        if sha256 is None and self.hash_files:
+            sha256 = file_sha256(path)
+        folder = _folder_key(os.path.dirname(path))
+        format_name = extension.lower().lstrip(".")
+        return (path, folder, video_id, stem, kind, format_name, size, sha256)
+
+    def add(self, path: str, video_id: Optional[str] = None) -> bool:
+        """
+        Add or update a downloaded file.
+
+        Args:
+            path: Path of the file
+            video_id: Video ID; read from "[id]" in the file name if omitted
+
+        Returns:
+            True if the file was indexed, False if it is missing or not a
+            media file
+        """
+        path = os.path.abspath(path)
+        row = self._row(path, video_id)
+        if row is None:
+            return False
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row + (time.time(),),
+            )
+        return True
+
+    def record(self, task: DownloadTask) -> bool:
+        """
+        Add the file of a finished download task.
+
+        Args:
+            task: Task with ``filepath`` set
+
+        Returns:
+            True if the file was indexed
+        """
+        if task.error or not task.filepath:
+            return False
+        return self.add(task.filepath, task.video_id or video_id_from_url(task.url))
+
+    def lookup(
+        self, folder: str, kind: str, videos: Iterable[Tuple[str, str]]
+    ) -> Dict[str, str]:
+        """
+        Find videos that have already been downloaded to a folder.
+
+        Args:
+            folder: Download destination folder
+            kind: KIND_VIDEO or KIND_AUDIO
+            videos: (video_url, title) tuples
+
+        Returns:
+            Dictionary mapping the URL of every downloaded video to its file
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, video_id, stem FROM files WHERE folder = ? AND kind = ?",
+                (_folder_key(folder), kind),
+            ).fetchall()
+        if not rows:
+            return {}
+
+        by_id = {video_id: path for path, video_id, _ in rows if video_id}
+        by_stem = {stem: path for path, video_id, stem in rows if not video_id}
+
+        found: Dict[str, str] = {}
+        stale: List[str] = []
+        for url, title in videos:
+            path = by_id.get(video_id_from_url(url) or "")
+            if path is None and title:
+                path = by_stem.get(title_stem(title))
+            if path is None:
+                continue
+            if os.path.exists(path):
+                found[url] = path
+            else:
+                stale.append(path)
+
+        if stale:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "DELETE FROM files WHERE path = ?", [(path,) for path in stale]
+                )
+        return found
+
+    def find(
+        self, folder: str, kind: str, url: str, title: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Find the file of a single downloaded video.
+
+        Args:
+            folder: Download destination folder
+            kind: KIND_VIDEO or KIND_AUDIO
+            url: Video URL
+            title: Video title, if known
+
+        Returns:
+            Path of the existing file, or None
+        """
+        return self.lookup(folder, kind, [(url, title or "")]).get(url)
+
+    def folders(self) -> List[str]:
+        """Return the folders that contain indexed files."""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT folder FROM files").fetchall()
+        return [row[0] for row in rows]
+
+    def rebuild(self, folders: Iterable[str]) -> int:
+        """
+        Re-index output folders by scanning them for media files.
+
+        Subfolders are not scanned, downloads are saved directly into the
+        chosen folder. Video IDs learned from earlier downloads are kept
+        for files that still exist; other files get the ID from an "[id]"
+        in their name or are matched by title.
+
+        Args:
+            folders: Folders to scan
+
+        Returns:
+            Number of files indexed in the scanned folders
+        """
+        rows = []
+        for folder in folders:
+            folder_key = _folder_key(folder)
+            with self._lock, self._conn:
+                known = {
+                    path: (video_id, sha256)
+                    for path, video_id, sha256 in self._conn.execute(
+                        "SELECT path, video_id, sha256 FROM files WHERE folder = ?",
+                        (folder_key,),
+                    )
+                }
+                self._conn.execute("DELETE FROM files WHERE folder = ?", (folder_key,))
+
+            try:
+                entries = list(os.scandir(folder))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                path = os.path.abspath(entry.path)
+                video_id, sha256 = known.get(path, (None, None))
+                row = self._row(path, video_id, sha256)
+                if row is not None:
+                    rows.append(row + (time.time(),))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -3,29 +3,69 @@ Handles the download queue and execution.
 """
 
 import os
-import re
 import threading
-import subprocess
-import json
-import sys
-from typing import Dict, List, Any, Tuple, TYPE_CHECKING, Optional
-
-from PyQt6.QtWidgets import (
-    QMessageBox,
-    QDialog,
-    QScrollArea,
-    QWidget,
-    QVBoxLayout,
-    QLabel,
-    QCheckBox,
-    QHBoxLayout,
-    QPushButton,
-)
+import time
+from typing import Any, Dict, List, Set, Tuple, TYPE_CHECKING, Optional, Callable
+
+from PyQt6.QtWidgets import QDialog, QMessageBox
 from PyQt6.QtCore import QTimer, pyqtSignal, QObject, QMetaObject, Qt, Q_ARG
 from PyQt6.QtGui import QIcon
 
+from .engine import (
+    BACKEND_API,
+    BACKEND_SUBPROCESS,
+    CHANNEL_MODES,
+    EVENT_DOWNLOADED,
+    EVENT_FINISHED,
+    EVENT_METADATA,
+    EVENT_METRICS,
+    EVENT_OUTPUT,
+    EVENT_PROGRESS,
+    PLAYLIST_MODES,
+    DownloadEngine,
+    EngineEvent,
+    channel_entry_filter,
+    channel_listing_url,
+    get_archive_path,
+    iter_flat_entries,
+    partial_bytes,
+    read_archive_ids,
+    resolve_backend,
+)
+from .tasks import DownloadTask, PlaylistEntry
+from .concurrency import ConcurrencyController
+from .download_index import media_kind, video_id_from_url
+from .extraction_cache import ExtractionCache, listing_cache_key
+from .metrics import MetricsLog
+from .progress import STAGE_DOWNLOAD, STAGE_MERGE, format_bytes
+from .url_import import (
+    URL_CHANNEL,
+    URL_PLAYLIST,
+    URL_VIDEO,
+    ImportedUrl,
+    classify_url,
+    collect_urls,
+    count_types,
+    expand_concurrently,
+    playlist_from_url,
+    split_urls,
+)
+
 if TYPE_CHECKING:
     from .main_window import YTDGUI
+    from .selection_dialog import VideoSelectionDialog
+
+# Upper bound for the "Concurrent Downloads" setting
+MAX_CONCURRENT_DOWNLOADS = 8
+
+# Number of entries sent to the selection dialog at once while extracting
+ENTRY_BATCH_SIZE = 50
+
+# Maximum delay in seconds before a partial batch is sent to the dialog
+ENTRY_BATCH_INTERVAL = 0.25
+
+# Channel sync stops listing after this many already-downloaded videos in a row
+SYNC_KNOWN_THRESHOLD = 5
 
 
 class WorkerSignals(QObject):
@@ -34,7 +74,35 @@ class WorkerSignals(QObject):
     finished = pyqtSignal()
     error = pyqtSignal(tuple)
     result = pyqtSignal(object)
-    download_complete = pyqtSignal()
+    entries = pyqtSignal(tuple)
+    extraction_finished = pyqtSignal(tuple)
+    sync_finished = pyqtSignal(tuple)
+    import_finished = pyqtSignal(int)
+    single_checked = pyqtSignal(tuple)
+    engine_event = pyqtSignal(object)
+
+
+class ExtractionJob:
+    """State of one running playlist or channel extraction."""
+
+    def __init__(self, save_path: str, mode: str, title: str, empty_message: str):
+        """
+        Initialize the extraction job.
+
+        Args:
+            save_path: Download destination path
+            mode: Download mode
+            title: Title of the selection dialog
+            empty_message: Warning shown when no videos are found
+        """
+        self.save_path = save_path
+        self.mode = mode
+        self.title = title
+        self.empty_message = empty_message
+        self.cancelled = threading.Event()
+        self.finished = False
+        self.dialog: Optional["VideoSelectionDialog"] = None
+        self.archive: Optional[str] = None
 
 
 class DownloadManager:
@@ -42,32 +110,249 @@ class DownloadManager:
 
     def __init__(self, main_app: "YTDGUI"):
         self.main_app = main_app
+        self.extraction_cache = ExtractionCache(
+            os.path.join(main_app.base_dir, "data", "extraction_cache.db")
+        )
         self.signals = WorkerSignals()
         self.signals.error.connect(self._on_playlist_error)
         self.signals.result.connect(self._on_playlist_result)
-        self.signals.download_complete.connect(self._on_download_complete)
+        self.signals.entries.connect(self._on_playlist_entries)
+        self.signals.extraction_finished.connect(self._on_extraction_finished)
+        self.signals.sync_finished.connect(self._on_sync_finished)
+        self.signals.import_finished.connect(self._on_import_finished)
+        self.signals.single_checked.connect(self._on_single_checked)
+        self.signals.engine_event.connect(self._on_engine_event)
+
+        # Downloads run in the Qt-free engine; its events are forwarded
+        # to the main thread through the engine_event signal
+        self.metrics_log = MetricsLog(
+            os.path.join(main_app.base_dir, "data", "metrics.jsonl")
+        )
+        self.engine = self._create_engine(main_app.ytdlp_backend)
+
+        # Decides how many of the configured slots may run at once
+        self.concurrency = ConcurrencyController(
+            main_app.max_concurrent_downloads, main_app.max_concurrent_downloads
+        )
+
+        # Engine events are keyed by queue ID. Downloading tasks occupy a
+        # worker slot; downloaded tasks are merged or converted to MP3
+        # without one.
+        self._slots: Dict[int, int] = {}
+        self.post_processing: Dict[int, DownloadTask] = {}
+
+        # Folders scanned into the download index during this session
+        self._scanned_folders: Set[str] = set()
+
+    def _create_engine(self, backend: str) -> DownloadEngine:
+        """
+        Create the download engine.
+
+        Args:
+            backend: yt-dlp backend, one of engine.BACKENDS
+
+        Returns:
+            Engine reporting its events through the engine_event signal
+        """
+        return DownloadEngine(
+            self.main_app.base_dir,
+            self.signals.engine_event.emit,
+            max_workers=MAX_CONCURRENT_DOWNLOADS,
+            metrics_log=self.metrics_log,
+            download_index=self.main_app.download_index,
+            backend=backend,
+        )
+
+    def set_in_process_backend(self, enabled: bool) -> None:
+        """
+        Choose whether yt-dlp runs in-process in warm worker processes.
+
+        The engine is replaced as soon as no download is running or
+        post-processing.
+
+        Args:
+            enabled: Use the yt_dlp package instead of bin/yt-dlp.exe
+        """
+        self.main_app.ytdlp_backend = BACKEND_API if enabled else BACKEND_SUBPROCESS
+        if self.is_busy():
+            self.main_app.log_message(
+                "The yt-dlp backend changes when the running downloads finish"
+            )
+        self._apply_backend()
+
+    def _apply_backend(self) -> None:
+        """Switch the engine to the chosen backend if it is idle."""
+        backend = resolve_backend(self.main_app.ytdlp_backend)
+        if backend == self.engine.backend or self.is_busy():
+            return
+
+        self.engine.shutdown()
+        self.engine = self._create_engine(backend)
+        if backend == BACKEND_API:
+            self.main_app.log_message("Running yt-dlp in-process")
+        else:
+            self.main_app.log_message("Running bin/yt-dlp.exe for every download")
 
     def _on_playlist_error(self, error_info: tuple) -> None:
         """Handles errors from the playlist processing thread."""
-        exctype, value = error_info
+        job, value = error_info
+        job.finished = True
+        message = str(value)
+        stderr = getattr(value, "stderr", None)
+        if stderr:
+            message = stderr.strip().splitlines()[-1]
+
+        # Keep the dialog open if some videos were already listed
+        if job.dialog is not None and job.dialog.entry_count():
+            job.dialog.set_extraction_finished(message)
+            return
+
+        if job.dialog is not None:
+            job.dialog.reject()
         QMessageBox.critical(
-            self.main_app, "Error", f"Failed to extract playlist information: {value}"
+            self.main_app, "Error", f"Failed to extract video information: {message}"
         )
 
-    def _on_playlist_result(self, result: Any) -> None:
-        """Handles successful results from the playlist processing thread."""
-        entries, save_path, mode, title = result
+    def _on_playlist_result(self, job: ExtractionJob) -> None:
+        """Handles the start of extraction by opening the selection dialog."""
+        self._show_video_selection_dialog(job)
+
+    def _on_playlist_entries(self, payload: tuple) -> None:
+        """Handles a batch of entries from the playlist processing thread."""
+        job, entries, downloaded = payload
+        if job.dialog is not None:
+            job.dialog.add_entries(entries, downloaded)
+
+    def _on_extraction_finished(self, payload: tuple) -> None:
+        """Handles the end of extraction in the main thread."""
+        job, count = payload
+        job.finished = True
+        if job.dialog is None:
+            return
+
+        if count == 0:
+            job.dialog.reject()
+            QMessageBox.warning(self.main_app, "Warning", job.empty_message)
+            return
+
+        job.dialog.set_extraction_finished()
+
+    def _on_sync_finished(self, payload: tuple) -> None:
+        """Handles the result of a channel sync in the main thread."""
+        job, entries = payload
+        job.finished = True
         if not entries:
-            QMessageBox.warning(
-                self.main_app, "Warning", "No videos found in the playlist."
-            )
+            self.main_app.log_message("Channel sync: no new uploads found")
+            self.main_app.update_status("Channel is up to date")
             return
 
-    def _on_download_complete(self) -> None:
-        """Handle download completion in the main thread."""
-        self.main_app.downloading = False
-        self.main_app.updateProgressSignal.emit(0)
+        self._queue_videos(entries, job.save_path, job.mode, job.archive)
+        self.main_app.log_message(
+            f"Channel sync: added {len(entries)} new videos to download queue"
+        )
+
+        # Switch to activity page and start downloads
+        self.main_app.ui_manager.switch_page("Activity")
+        self.process_queue()
+
+    def _on_import_finished(self, queued: int) -> None:
+        """Handles the end of a bulk URL import in the main thread."""
+        if not queued:
+            self.main_app.update_status("Nothing to import")
+            return
+
+        # Switch to activity page and start downloads
+        self.main_app.ui_manager.switch_page("Activity")
+        self.process_queue()
+
+    def _on_download_complete(self, slot: int) -> None:
+        """
+        Handle the end of a download's network transfer in the main thread.
+
+        Args:
+            slot: Worker slot that has finished and can take a new task
+        """
+        self.main_app.active_downloads.pop(slot, None)
+        self.main_app.log_buffer.end_progress(slot)
+        self.main_app.updateSlotProgressSignal.emit(slot, 0)
+        self.main_app.updateSlotLabelSignal.emit(slot, "Idle")
+        self.process_queue()
+
+    def _on_task_finished(self, task: DownloadTask) -> None:
+        """
+        Record the result of a task whose post-processing has ended.
+
+        Args:
+            task: Finished task with ``error`` set on failure
+        """
+        if task.queue_id is not None:
+            if task.error:
+                self.main_app.download_queue.mark_failed(task.queue_id, task.error)
+            else:
+                self.main_app.download_queue.mark_done(task.queue_id)
+        self._apply_backend()
         self.process_queue()
+        if not self.is_busy():
+            self.main_app.start_deferred_update()
+
+    def is_busy(self) -> bool:
+        """Return True while a download is running or post-processing."""
+        return bool(self.main_app.active_downloads or self.post_processing)
+
+    def set_max_concurrent_downloads(self, value: int) -> None:
+        """
+        Change the number of worker slots used by the scheduler.
+
+        Lowering the value lets running downloads finish; raising it starts
+        queued tasks immediately.
+
+        Args:
+            value: New maximum number of concurrent downloads
+        """
+        self.main_app.max_concurrent_downloads = max(
+            1, min(int(value), MAX_CONCURRENT_DOWNLOADS)
+        )
+        self._update_concurrency_bounds()
+
+    def set_adaptive_concurrency(self, enabled: bool) -> None:
+        """
+        Let the controller pick the number of concurrent downloads.
+
+        The "Concurrent Downloads" setting becomes the upper bound.
+
+        Args:
+            enabled: Whether adaptive concurrency is enabled
+        """
+        self.main_app.adaptive_concurrency = enabled
+        self._update_concurrency_bounds()
+
+    def set_rate_limit(self, rate_limit: Optional[int]) -> None:
+        """
+        Set the total download speed limit, split across concurrent downloads.
+
+        The limit applies to downloads started afterwards.
+
+        Args:
+            rate_limit: Bytes per second, or None for no limit
+        """
+        self.main_app.rate_limit = rate_limit or None
+        self.concurrency.rate_limit = self.main_app.rate_limit
+
+    def _update_concurrency_bounds(self) -> None:
+        """Apply the concurrency settings to the controller."""
+        maximum = self.main_app.max_concurrent_downloads
+        minimum = 1 if self.main_app.adaptive_concurrency else maximum
+        self.concurrency.set_bounds(minimum, maximum)
+        self.process_queue()
+
+    def _next_free_slot(self) -> Optional[int]:
+        """Return the lowest free worker slot, or None if all are busy."""
+        if len(self.main_app.active_downloads) >= self.concurrency.limit:
+            return None
+        for slot in range(self.main_app.max_concurrent_downloads):
+            if slot not in self.main_app.active_downloads:
+                return slot
+        return None
 
     def add_to_queue(self) -> None:
         """
@@ -88,14 +373,9 @@ class DownloadManager:
             return
 
         # Handle different download modes
-        if mode in ["Playlist Video", "Playlist MP3"]:
+        if mode in PLAYLIST_MODES:
             self._handle_playlist_download(url, save_path, mode)
-        elif mode in [
-            "Channel Videos",
-            "Channel Videos MP3",
-            "Channel Shorts",
-            "Channel Shorts MP3",
-        ]:
+        elif mode in CHANNEL_MODES:
             self._handle_channel_download(url, save_path, mode)
         else:
             # Single video or MP3 only
@@ -103,7 +383,7 @@ class DownloadManager:
 
     def _handle_playlist_download(self, url: str, save_path: str, mode: str) -> None:
         """Handle playlist download mode."""
-        if "list=" not in url:
+        if playlist_from_url(url) is None:
             QMessageBox.critical(
                 self.main_app,
                 "Error",
@@ -111,561 +391,771 @@ class DownloadManager:
                 "Playlist URLs should contain 'list=' parameter.",
             )
             return
+        force_refresh = self.main_app.refresh_listing_check.isChecked()
         threading.Thread(
-            target=self.process_playlist, args=(url, save_path, mode), daemon=True
+            target=self.process_playlist,
+            args=(url, save_path, mode, force_refresh),
+            daemon=True,
         ).start()
 
     def _handle_channel_download(self, url: str, save_path: str, mode: str) -> None:
         """Handle channel download mode."""
-        if "youtube.com/@" not in url and "/channel/" not in url:
+        imported = classify_url(url)
+        if imported is None or imported.url_type != URL_CHANNEL:
             QMessageBox.critical(
                 self.main_app,
                 "Error",
                 "The URL does not appear to be a channel URL.\n"
-                "Channel URLs should contain '@' or '/channel/'.",
-            )
-            return
-        if "?" in url:
-            QMessageBox.critical(
-                self.main_app,
-                "Error",
-                "Please use a clean channel URL without query parameters.\n"
                 "Example: https://www.youtube.com/@channelname",
             )
             return
+        # Tabs and query parameters are dropped, the mode selects the tab
+        url = imported.url
+        if self.main_app.sync_channel_check.isChecked():
+            threading.Thread(
+                target=self.sync_channel, args=(url, save_path, mode), daemon=True
+            ).start()
+            return
+
+        force_refresh = self.main_app.refresh_listing_check.isChecked()
         threading.Thread(
-            target=self.process_channel, args=(url, save_path, mode), daemon=True
+            target=self.process_channel,
+            args=(url, save_path, mode, force_refresh),
+            daemon=True,
         ).start()
 
     def _handle_single_download(self, url: str, save_path: str, mode: str) -> None:
         """Handle single video or MP3-only download."""
-        # Create download task
-        task = {
-            "url": url,
-            "save_path": save_path,
-            "mode": mode,
-            "audio_quality": (
-                self.main_app.audio_quality_default if "MP3" in mode else None
-            ),
-            "video_quality": (
-                self.main_app.video_quality_combo.currentText()
-                if "MP3" not in mode
-                else "Best Available"
-            ),
-        }
+        # Create download task; widgets are only read in the main thread
+        task = DownloadTask.create(
+            url,
+            save_path,
+            mode,
+            video_quality=self.main_app.video_quality_combo.currentText(),
+            audio_quality=self.main_app.audio_quality_default,
+            **self._task_settings(),
+        )
 
-        self.main_app.download_queue.append(task)
-        self.main_app.log_message(f"Task added to queue: {mode}")
+        # Scanning a large folder takes a while, so it runs in the background
+        threading.Thread(
+            target=self._check_single_download, args=(task,), daemon=True
+        ).start()
+
+    def _check_single_download(self, task: DownloadTask) -> None:
+        """
+        Look up whether a single video is already in its folder.
+
+        Runs in a background thread; the result goes to _on_single_checked().
+
+        Args:
+            task: Download task of the video
+        """
+        self._scan_folder(task.save_path)
+        existing = self.main_app.download_index.find(
+            task.save_path, media_kind(task.mode), task.url
+        )
+        self.signals.single_checked.emit((task, existing))
+
+    def _on_single_checked(self, result: tuple) -> None:
+        """
+        Queue a single video, asking first if it was downloaded before.
+
+        Args:
+            result: Tuple of (task, path of the existing file or None)
+        """
+        task, existing = result
+        if existing is not None:
+            answer = QMessageBox.question(
+                self.main_app,
+                "Already Downloaded",
+                f"This video has already been downloaded:\n{existing}\n\n"
+                "Download it again?",
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                self.main_app.log_message(f"Skipped, already downloaded: {existing}")
+                return
+
+        self.main_app.download_queue.append(task.to_dict())
+        self.main_app.log_message(f"Task added to queue: {task.mode}")
         self.process_queue()
 
-    def process_playlist(self, url: str, save_path: str, mode: str) -> None:
+    def process_playlist(
+        self, url: str, save_path: str, mode: str, force_refresh: bool = False
+    ) -> None:
         """
-        Process playlist URL and show video selection dialog.
+        Process playlist URL and stream its videos into a selection dialog.
 
         Args:
             url: Playlist URL
             save_path: Download destination path
             mode: Download mode (Playlist Video/MP3)
+            force_refresh: Ignore a cached listing and extract again
         """
-        try:
-            # Use yt-dlp.exe to extract playlist information
-            yt_dlp_path = os.path.join(self.main_app.base_dir, "bin", "yt-dlp.exe")
-            cmd = [yt_dlp_path, "--quiet", "--flat-playlist", "--dump-json", url]
-
-            creationflags = 0
-            if sys.platform == "win32":
-                creationflags = subprocess.CREATE_NO_WINDOW
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                creationflags=creationflags,
-            )
+        job = ExtractionJob(
+            save_path,
+            mode,
+            "Select Videos from Playlist",
+            "No videos found in the playlist.",
+        )
 
-            entries = []
-            for line in result.stdout.strip().split("\n"):
-                if line.strip():
-                    try:
-                        entry = json.loads(line)
-                        entries.append(entry)
-                    except json.JSONDecodeError:
-                        continue
-
-            if not entries:
-                QMessageBox.warning(
-                    self.main_app, "Warning", "No videos found in the playlist."
-                )
-                return
+        # Open the selection dialog straight away, entries follow in batches
+        self.signals.result.emit(job)
+        self._stream_entries(job, url, force_refresh=force_refresh)
 
-        except Exception as e:
-            QMessageBox.critical(
-                self.main_app, "Error", f"Failed to extract playlist information: {e}"
-            )
-            return
+    def process_channel(
+        self, url: str, save_path: str, mode: str, force_refresh: bool = False
+    ) -> None:
+        """
+        Process channel URL and stream its videos into a selection dialog.
 
-        # Show video selection dialog
-        self.signals.result.emit(
-            (entries, save_path, mode, "Select Videos from Playlist")
+        Args:
+            url: Channel URL
+            save_path: Download destination path
+            mode: Download mode (Channel Videos/MP3 or Channel Shorts/MP3)
+            force_refresh: Ignore a cached listing and extract again
+        """
+        url = channel_listing_url(url, mode)
+        shorts = "Shorts" in mode
+        content_type = "shorts" if shorts else "videos"
+        job = ExtractionJob(
+            save_path,
+            mode,
+            "Select Shorts from Channel" if shorts else "Select Videos from Channel",
+            f"No {content_type} found in the channel.",
         )
+        job.archive = get_archive_path(self.main_app.base_dir, url)
+
+        # Open the selection dialog straight away, entries follow in batches
+        self.signals.result.emit(job)
+        self._stream_entries(job, url, channel_entry_filter(mode), force_refresh)
 
-    def process_channel(self, url: str, save_path: str, mode: str) -> None:
+    def sync_channel(self, url: str, save_path: str, mode: str) -> None:
         """
-        Process channel URL and show video selection dialog.
+        Queue only the channel uploads that have not been downloaded yet.
+
+        Downloaded video IDs are kept in a per-channel yt-dlp download
+        archive. The listing is newest first, so extraction stops once
+        SYNC_KNOWN_THRESHOLD archived videos are seen in a row.
 
         Args:
             url: Channel URL
             save_path: Download destination path
             mode: Download mode (Channel Videos/MP3 or Channel Shorts/MP3)
         """
-        # Append appropriate suffix based on content type
-        suffix = "/videos" if "Videos" in mode else "/shorts"
-        if not url.lower().endswith(suffix):
-            url = url.rstrip("/") + suffix
+        url = channel_listing_url(url, mode)
+        job = ExtractionJob(save_path, mode, "Sync Channel", "")
+        job.archive = get_archive_path(self.main_app.base_dir, url)
 
-        try:
-            # Use yt-dlp.exe to extract channel information
-            yt_dlp_path = os.path.join(self.main_app.base_dir, "bin", "yt-dlp.exe")
-            cmd = [yt_dlp_path, "--quiet", "--flat-playlist", "--dump-json", url]
-
-            creationflags = 0
-            if sys.platform == "win32":
-                creationflags = subprocess.CREATE_NO_WINDOW
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                creationflags=creationflags,
-            )
+        keep = channel_entry_filter(mode)
+        known = read_archive_ids(job.archive)
+        new_entries: List[Tuple[str, str]] = []
+        known_in_a_row = 0
 
-            entries = []
-            for line in result.stdout.strip().split("\n"):
-                if line.strip():
-                    try:
-                        entry = json.loads(line)
-                        entries.append(entry)
-                    except json.JSONDecodeError:
-                        continue
-
-            # Filter entries based on content type
-            if "Shorts" in mode:
-                # Filter for shorts content
-                entries = [e for e in entries if "shorts" in e.get("url", "").lower()]
-            else:
-                # Filter out shorts for regular videos
-                entries = [
-                    e for e in entries if "shorts" not in e.get("url", "").lower()
-                ]
-
-            if not entries:
-                content_type = "shorts" if "Shorts" in mode else "videos"
-                QMessageBox.warning(
-                    self.main_app, "Warning", f"No {content_type} found in the channel."
-                )
-                return
+        self.main_app.log_message(
+            f"Syncing channel {url} ({len(known)} videos already downloaded)"
+        )
 
+        try:
+            for entry in iter_flat_entries(self.main_app.base_dir, url):
+                if not keep(entry):
+                    continue
+
+                if entry.video_id in known:
+                    known_in_a_row += 1
+                    if known_in_a_row >= SYNC_KNOWN_THRESHOLD:
+                        break
+                    continue
+                known_in_a_row = 0
+
+                new_entries.append((entry.url, entry.title))
         except Exception as e:
-            QMessageBox.critical(
-                self.main_app, "Error", f"Failed to extract channel information: {e}"
-            )
+            self.signals.error.emit((job, e))
             return
 
-        # Show video selection dialog
-        dialog_title = (
-            "Select Videos from Channel"
-            if "Videos" in mode
-            else "Select Shorts from Channel"
+        # Videos downloaded without the archive may still be in the folder
+        self._scan_folder(save_path)
+        downloaded = self.main_app.download_index.lookup(
+            save_path, media_kind(mode), new_entries
         )
-        self.signals.result.emit((entries, save_path, mode, dialog_title))
+        if downloaded:
+            self.main_app.log_message(
+                f"Skipping {len(downloaded)} videos already in {save_path}"
+            )
+            new_entries = [item for item in new_entries if item[0] not in downloaded]
 
-    def _show_video_selection_dialog(
-        self, entries: List[Dict], save_path: str, mode: str, title: str
-    ) -> None:
+        # Download the oldest new upload first
+        new_entries.reverse()
+        self.signals.sync_finished.emit((job, new_entries))
+
+    def open_import_dialog(self, text: str = "") -> None:
         """
-        Show dialog for selecting videos from playlist or channel.
+        Let the user paste, load or drop many URLs and queue them all.
 
         Args:
-            entries: List of video entries
-            save_path: Download destination path
-            mode: Download mode
-            title: Dialog window title
+            text: Text to start with, e.g. dropped on the main window
         """
-        dialog = QDialog(self.main_app)
-        dialog.setWindowTitle(title)
-        dialog.resize(600, 400)
+        from .import_dialog import UrlImportDialog
 
-        # Main layout
-        dlg_layout = QVBoxLayout(dialog)
+        dialog = UrlImportDialog(self.main_app)
+        if text:
+            dialog.append_text(text)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.import_urls(dialog.text())
 
-        # Info label
-        info_label = QLabel(f"Found {len(entries)} videos. Select videos to download:")
-        info_label.setStyleSheet("font-weight: bold; margin-bottom: 10px;")
-        dlg_layout.addWidget(info_label)
+    def import_urls(self, text: str) -> None:
+        """
+        Queue every video, playlist and channel URL found in a text.
 
-        # Scrollable area for video list
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        dlg_layout.addWidget(scroll)
+        Uses the save path, mode and settings of the Download page. The
+        URLs are normalized, deduplicated and expanded in a background
+        thread.
 
-        container = QWidget()
-        scroll.setWidget(container)
-        scroll_layout = QVBoxLayout(container)
+        Args:
+            text: Pasted text or file contents with one or more URLs
+        """
+        save_path = self.main_app.path_entry.text().strip()
+        if not save_path:
+            QMessageBox.critical(
+                self.main_app, "Error", "Please select a save path first."
+            )
+            return
 
-        # Create checkboxes for each video
-        checkboxes = []
-        for entry in entries:
-            video_url = entry.get("url")
+        # Widgets are read here, the import thread only gets plain values
+        mode = self.main_app.mode_combo.currentText()
+        settings = dict(
+            self._task_settings(),
+            video_quality=self.main_app.video_quality_combo.currentText(),
+            audio_quality=self.main_app.audio_quality_default,
+        )
+        threading.Thread(
+            target=self._run_import, args=(text, save_path, mode, settings), daemon=True
+        ).start()
 
-            # Ensure URL is absolute
-            if video_url and not video_url.startswith("http"):
-                base_url = entry.get("webpage_url", "https://www.youtube.com")
-                video_url = base_url.rstrip("/") + "/" + video_url.lstrip("/")
+    def _import_listing(
+        self, imported: ImportedUrl, mode: str
+    ) -> Tuple[str, Optional[Callable[[PlaylistEntry], bool]], Optional[str]]:
+        """
+        Decide how an imported playlist or channel is listed.
 
-            # Create checkbox with video title
-            title = entry.get("title", "Unknown Title")
-            cb = QCheckBox(title)
+        Channels are listed on the tab of a channel mode, or on their videos
+        tab for other modes, and keep their download archive.
 
-            # Add video favicon if available
-            if self.main_app.video_favicon_pixmap:
-                cb.setIcon(QIcon(self.main_app.video_favicon_pixmap))
+        Returns:
+            Tuple of (listing URL, entry filter, download archive)
+        """
+        if imported.url_type != URL_CHANNEL:
+            return imported.url, None, None
+        channel_mode = mode if mode in CHANNEL_MODES else "Channel Videos"
+        url = channel_listing_url(imported.url, channel_mode)
+        archive = get_archive_path(self.main_app.base_dir, url)
+        return url, channel_entry_filter(channel_mode), archive
+
+    def _list_entries(
+        self, url: str, keep: Optional[Callable[[PlaylistEntry], bool]] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        List a playlist or channel tab, using the extraction cache.
 
-            # Default to checked
-            cb.setChecked(True)
+        Args:
+            url: Playlist or channel tab URL
+            keep: Optional filter deciding which entries are listed
 
-            scroll_layout.addWidget(cb)
-            checkboxes.append((video_url, cb))
+        Returns:
+            List of (video_url, title) tuples
+        """
+        cache_key = listing_cache_key(url)
+        cached = self.extraction_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        listing = [
+            (entry.url, entry.title)
+            for entry in iter_flat_entries(self.main_app.base_dir, url)
+            if keep is None or keep(entry)
+        ]
+        self.extraction_cache.put(cache_key, listing)
+        return listing
 
-        # Button layout
-        button_layout = QHBoxLayout()
+    def _run_import(
+        self, text: str, save_path: str, mode: str, settings: Dict[str, Any]
+    ) -> None:
+        """
+        Normalize, deduplicate, expand and queue imported URLs.
 
-        # Select All / Deselect All buttons
-        select_all_btn = QPushButton("Select All")
-        select_all_btn.clicked.connect(
-            lambda: [cb.setChecked(True) for _, cb in checkboxes]
-        )
-        button_layout.addWidget(select_all_btn)
+        Runs in a background thread. Playlists and channels are listed
+        concurrently (at most url_import.EXPANSION_WORKERS at once); videos
+        that appear more than once, also across listings, are queued once.
+        Everything is stored in the queue in a single transaction.
 
-        deselect_all_btn = QPushButton("Deselect All")
-        deselect_all_btn.clicked.connect(
-            lambda: [cb.setChecked(False) for _, cb in checkboxes]
+        Args:
+            text: Pasted text or file contents
+            save_path: Download destination path
+            mode: Download mode of the new tasks
+            settings: Keyword arguments for DownloadTask.create()
+        """
+        urls, duplicates, invalid = collect_urls(split_urls(text))
+        counts = count_types(urls)
+        self.main_app.log_message(
+            f"Importing {len(urls)} URLs: {counts[URL_VIDEO]} videos, "
+            f"{counts[URL_PLAYLIST]} playlists, {counts[URL_CHANNEL]} channels "
+            f"({duplicates} duplicates and {len(invalid)} invalid skipped)"
         )
-        button_layout.addWidget(deselect_all_btn)
-
-        button_layout.addStretch()
-
-        # Cancel button
-        cancel_btn = QPushButton("Cancel")
-        cancel_btn.clicked.connect(dialog.reject)
-        button_layout.addWidget(cancel_btn)
+        for candidate in invalid[:10]:
+            self.main_app.log_message(f"Not a YouTube URL: {candidate}")
+
+        # (video_url, title, archive) of every video, keyed by video ID
+        videos: Dict[str, Tuple[str, str, Optional[str]]] = {}
+
+        def add(video_url: str, title: str, archive: Optional[str]) -> None:
+            video_id = video_id_from_url(video_url) or video_url
+            if video_id not in videos:
+                videos[video_id] = (video_url, title, archive)
+
+        for imported in urls:
+            if imported.url_type == URL_VIDEO:
+                add(imported.url, "", None)
+
+        # Listing URL, entry filter and archive of every playlist and channel
+        plans = {
+            imported: self._import_listing(imported, mode)
+            for imported in urls
+            if imported.url_type != URL_VIDEO
+        }
 
-        # Download Selected button
-        download_btn = QPushButton("Download Selected")
-        download_btn.setStyleSheet("font-weight: bold;")
-        download_btn.clicked.connect(
-            lambda: self._process_selected_videos(checkboxes, save_path, mode, dialog)
+        def expand(imported: ImportedUrl) -> List[Tuple[str, str]]:
+            url, keep, _ = plans[imported]
+            return self._list_entries(url, keep)
+
+        failed = 0
+        for imported, result in expand_concurrently(list(plans), expand):
+            if isinstance(result, Exception):
+                failed += 1
+                self.main_app.log_message(f"Failed to list {imported.url}: {result}")
+                continue
+            archive = plans[imported][2]
+            for video_url, title in result:
+                add(video_url, title, archive)
+            self.main_app.log_message(f"Listed {imported.url}: {len(result)} videos")
+
+        # Videos already in the download folder are not queued again
+        self._scan_folder(save_path)
+        downloaded = self.main_app.download_index.lookup(
+            save_path,
+            media_kind(mode),
+            [(video_url, title) for video_url, title, _ in videos.values()],
         )
-        button_layout.addWidget(download_btn)
-
-        dlg_layout.addLayout(button_layout)
+        tasks = [
+            DownloadTask.create(
+                video_url,
+                save_path,
+                mode,
+                title=title or None,
+                archive=archive,
+                **settings,
+            ).to_dict()
+            for video_url, title, archive in videos.values()
+            if video_url not in downloaded
+        ]
+        self.main_app.download_queue.extend(tasks)
 
-        # Show dialog
-        dialog.exec()
+        summary = f"Import finished: {len(tasks)} downloads queued"
+        if downloaded:
+            summary += f", {len(downloaded)} already downloaded"
+        if failed:
+            summary += f", {failed} playlists or channels could not be listed"
+        self.main_app.log_message(summary)
+        self.signals.import_finished.emit(len(tasks))
 
-    def _process_selected_videos(
-        self, checkboxes: List[Tuple], save_path: str, mode: str, dialog: QDialog
+    def _stream_entries(
+        self,
+        job: ExtractionJob,
+        url: str,
+        keep: Optional[Callable[[PlaylistEntry], bool]] = None,
+        force_refresh: bool = False,
     ) -> None:
         """
-        Process selected videos and add them to download queue.
+        Send extracted entries to the selection dialog in batches.
+
+        Runs in a background thread. A batch is sent when it is full or
+        when ENTRY_BATCH_INTERVAL seconds have passed since the last one.
+        A complete listing is cached and reused for repeated URLs. Videos
+        already in the download folder are flagged in every batch.
 
         Args:
-            checkboxes: List of (video_url, checkbox) tuples
-            save_path: Download destination path
-            mode: Download mode
-            dialog: Parent dialog to close
+            job: Extraction job the entries belong to
+            url: Playlist or channel URL
+            keep: Optional filter deciding which entries are listed
+            force_refresh: Ignore a cached listing and extract again
         """
-        selected_count = 0
+        self._scan_folder(job.save_path)
+        cache_key = listing_cache_key(url)
+        if not force_refresh:
+            cached = self.extraction_cache.get(cache_key)
+            if cached is not None:
+                self.main_app.log_message(f"Using cached listing for {url}")
+                if cached:
+                    self._emit_entries(job, cached)
+                self.signals.extraction_finished.emit((job, len(cached)))
+                return
 
-        # Add selected videos to download queue
-        for video_url, cb in checkboxes:
-            if cb.isChecked() and video_url:
-                task = {
-                    "url": video_url,
-                    "save_path": save_path,
-                    "mode": mode,
-                    "audio_quality": (
-                        self.main_app.audio_quality_default if "MP3" in mode else None
-                    ),
-                    "video_quality": (
-                        self.main_app.video_quality_combo.currentText()
-                        if "MP3" not in mode
-                        else "Best Available"
-                    ),
-                }
-                self.main_app.download_queue.append(task)
-                selected_count += 1
-
-        if selected_count == 0:
-            QMessageBox.warning(dialog, "Warning", "No videos selected for download.")
+        listing: List[Tuple[str, str]] = []
+        batch: List[Tuple[str, str]] = []
+        count = 0
+        last_emit = time.monotonic()
+
+        try:
+            for entry in iter_flat_entries(self.main_app.base_dir, url):
+                if job.cancelled.is_set():
+                    break
+                if keep is not None and not keep(entry):
+                    continue
+
+                item = (entry.url, entry.title)
+                listing.append(item)
+                batch.append(item)
+                count += 1
+
+                now = time.monotonic()
+                if (
+                    len(batch) >= ENTRY_BATCH_SIZE
+                    or now - last_emit >= ENTRY_BATCH_INTERVAL
+                ):
+                    self._emit_entries(job, batch)
+                    batch = []
+                    last_emit = now
+        except Exception as e:
+            if batch:
+                self._emit_entries(job, batch)
+            self.signals.error.emit((job, e))
             return
 
-        # Log and start processing
-        self.main_app.log_message(f"Added {selected_count} videos to download queue")
-        dialog.accept()
+        if batch:
+            self._emit_entries(job, batch)
 
-        # Switch to activity page and start downloads
-        self.main_app.ui_manager.switch_page("Activity")
-        self.process_queue()
+        # Only cache listings that were extracted completely
+        if not job.cancelled.is_set():
+            self.extraction_cache.put(cache_key, listing)
+        self.signals.extraction_finished.emit((job, count))
 
-    def process_queue(self) -> None:
+    def _emit_entries(self, job: ExtractionJob, batch: List[Tuple[str, str]]) -> None:
         """
-        Process the download queue by starting the next download.
+        Send a batch of entries to the dialog with the already downloaded ones.
 
-        This method ensures only one download runs at a time and automatically
-        processes the next item in the queue when the current download completes.
+        Args:
+            job: Extraction job the entries belong to
+            batch: List of (video_url, title) tuples
         """
-        # Update queue status
-        if hasattr(self.main_app, "queue_status_label"):
-            self.main_app.queue_status_label.setText(
-                f"Queue: {len(self.main_app.download_queue)} pending"
-            )
+        downloaded = self.main_app.download_index.lookup(
+            job.save_path, media_kind(job.mode), batch
+        )
+        self.signals.entries.emit((job, batch, downloaded))
 
-        # Start next download if not already downloading and queue has items
-        if not self.main_app.downloading and self.main_app.download_queue:
-            task = self.main_app.download_queue.pop(0)
-            self.main_app.downloading = True
+    def _scan_folder(self, folder: str) -> None:
+        """Index the files of a download folder once per session."""
+        if folder in self._scanned_folders:
+            return
+        self._scanned_folders.add(folder)
+        self.main_app.download_index.rebuild([folder])
 
-            # Start download in background thread
-            threading.Thread(
-                target=self.download_video, args=(task,), daemon=True
-            ).start()
+    def rebuild_download_index(self) -> None:
+        """Rescan every known download folder in a background thread."""
+        index = self.main_app.download_index
+        folders = set(index.folders())
+        save_path = self.main_app.path_entry.text().strip()
+        if save_path:
+            folders.add(save_path)
+
+        def rebuild() -> None:
+            count = index.rebuild(folders)
+            self._scanned_folders.update(folders)
+            self.main_app.log_message(
+                f"Download index rebuilt: {count} files in {len(folders)} folders"
+            )
 
-    def download_video(self, task: Dict[str, Any]) -> None:
+        threading.Thread(target=rebuild, daemon=True).start()
+
+    def _show_video_selection_dialog(self, job: ExtractionJob) -> None:
         """
-        Download video/audio based on task configuration using yt-dlp.exe.
+        Show dialog for selecting videos from playlist or channel.
 
-        Args:
-            task: Dictionary containing download configuration
-                - url: Video URL
-                - save_path: Download destination
-                - mode: Download mode
-                - audio_quality: Audio quality for MP3 extraction
-                - video_quality: Video quality preference
+        The dialog is non-modal and fills in while extraction is running.
+        Closing it cancels the extraction.
 
-        This method runs in a background thread to avoid blocking the UI.
+        Args:
+            job: Extraction job whose entries the dialog lists
         """
-        url = task["url"]
-        save_path = task["save_path"]
-        mode = task["mode"]
-        video_quality = task.get("video_quality", "Best Available")
-
-        self.main_app.update_status(f"Starting download: {os.path.basename(url)}")
+        # The dialog module and its icon are only loaded when first needed
+        from .selection_dialog import VideoSelectionDialog
 
-        try:
-            # Get yt-dlp.exe path
-            yt_dlp_path = os.path.join(self.main_app.base_dir, "bin", "yt-dlp.exe")
-            ffmpeg_path = os.path.join(self.main_app.base_dir, "bin", "ffmpeg.exe")
-
-            # Build command based on mode
-            if "Video" in mode and "MP3" not in mode:
-                # Video download
-                cmd = self._build_video_download_command(
-                    yt_dlp_path, ffmpeg_path, url, save_path, video_quality
-                )
-            else:
-                # Audio extraction
-                cmd = self._build_audio_download_command(
-                    yt_dlp_path,
-                    ffmpeg_path,
-                    url,
-                    save_path,
-                    task.get("audio_quality", "320"),
-                )
+        video_icon = None
+        pixmap = self.main_app.ui_manager.video_favicon_pixmap()
+        if pixmap:
+            video_icon = QIcon(pixmap)
 
-            # Add cookie support if enabled
-            if self.main_app.use_cookies and self.main_app.cookie_file:
-                cmd.extend(["--cookies", self.main_app.cookie_file])
-                self.main_app.log_message("Using cookie file for authentication")
-
-            # Get video info first for logging
-            info_cmd = [yt_dlp_path, "--quiet", "--dump-json", "--no-playlist", url]
-            if self.main_app.use_cookies and self.main_app.cookie_file:
-                info_cmd.extend(["--cookies", self.main_app.cookie_file])
-
-            try:
-                creationflags = 0
-                if sys.platform == "win32":
-                    creationflags = subprocess.CREATE_NO_WINDOW
-                info_result = subprocess.run(
-                    info_cmd,
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                    creationflags=creationflags,
-                )
-                info = json.loads(info_result.stdout)
-                title = info.get("title", "Unknown Title")
-            except:
-                title = "Unknown Title"
-
-            self.main_app.log_message(f"Starting download: {title}")
-
-            # Execute download command
-            creationflags = 0
-            if sys.platform == "win32":
-                creationflags = subprocess.CREATE_NO_WINDOW
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                universal_newlines=True,
-                creationflags=creationflags,
-            )
+        dialog = VideoSelectionDialog(job.title, video_icon, self.main_app)
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.downloadRequested.connect(lambda: self._process_selected_videos(job))
+        dialog.finished.connect(lambda _: self._close_extraction(job))
+        job.dialog = dialog
 
-            # Read output line by line for progress updates
-            if process.stdout:
-                for line in iter(process.stdout.readline, ""):
-                    line = line.strip()
-                    if line:
-                        self.main_app.log_message(line)
-                        progress = self._parse_progress(line)
-                        if progress is not None:
-                            self.main_app.updateProgressSignal.emit(progress)
+        # Show dialog
+        dialog.show()
 
-            process.wait()
+    def _close_extraction(self, job: ExtractionJob) -> None:
+        """Stop extraction once its selection dialog has been closed."""
+        job.cancelled.set()
+        job.dialog = None
 
-            # Check if download was successful
-            if process.returncode == 0:
-                self.main_app.log_message(f"Download completed: {title}")
-            else:
-                raise subprocess.CalledProcessError(process.returncode, cmd)
+    def _process_selected_videos(self, job: ExtractionJob) -> None:
+        """
+        Process selected videos and add them to download queue.
 
-        except Exception as e:
-            error_msg = f"Download failed for {url}: {str(e)}"
-            self.main_app.log_message(error_msg)
+        If extraction is still running, the queued videos are disabled and
+        the dialog stays open for the entries that are still coming in.
 
-            # Show detailed error dialog in main thread
-            # Use a signal to safely call across threads
-            self.main_app.downloadErrorSignal.emit(e)
+        Args:
+            job: Extraction job whose dialog holds the selection
+        """
+        dialog = job.dialog
+        if dialog is None:
+            return
 
-        finally:
-            # Mark download as complete and process next in queue using signal
-            self.signals.download_complete.emit()
+        selected = dialog.selected_videos()
+        if not selected:
+            QMessageBox.warning(dialog, "Warning", "No videos selected for download.")
+            return
 
-    def _parse_progress(self, line: str) -> Optional[int]:
-        """
-        Parse download progress from yt-dlp output line.
+        # Add selected videos to download queue
+        self._queue_videos(selected, job.save_path, job.mode, job.archive)
 
-        Args:
-            line: A single line of output from yt-dlp.
+        # Log and start processing
+        self.main_app.log_message(f"Added {len(selected)} videos to download queue")
+        if job.finished:
+            dialog.accept()
+        else:
+            dialog.mark_selected_queued()
 
-        Returns:
-            The progress percentage as an integer, or None if not found.
-        """
-        # Look for percentage values (e.g., "  1.5% of ...")
-        match = re.search(r"\[download\]\s+([0-9.]+)%", line)
-        if match:
-            try:
-                return int(float(match.group(1)))
-            except (ValueError, IndexError):
-                pass
-        return None
+        # Switch to activity page and start downloads
+        self.main_app.ui_manager.switch_page("Activity")
+        self.process_queue()
 
-    def _build_video_download_command(
+    def _queue_videos(
         self,
-        yt_dlp_path: str,
-        ffmpeg_path: str,
-        url: str,
+        videos: List[Tuple[str, str]],
         save_path: str,
-        video_quality: str,
-    ) -> List[str]:
+        mode: str,
+        archive: Optional[str] = None,
+    ) -> None:
         """
-        Build yt-dlp.exe command for video download.
+        Add playlist or channel videos to the download queue.
 
         Args:
-            yt_dlp_path: Path to yt-dlp.exe
-            ffmpeg_path: Path to ffmpeg.exe
-            url: Video URL
+            videos: List of (video_url, title) tuples
             save_path: Download destination path
-            video_quality: Preferred video quality
+            mode: Download mode
+            archive: Optional yt-dlp download archive recording finished videos
+        """
+        video_quality = self.main_app.video_quality_combo.currentText()
+        settings = self._task_settings()
+        tasks = [
+            DownloadTask.create(
+                video_url,
+                save_path,
+                mode,
+                video_quality=video_quality,
+                audio_quality=self.main_app.audio_quality_default,
+                title=title,
+                archive=archive,
+                **settings,
+            ).to_dict()
+            for video_url, title in videos
+        ]
+
+        # Store the whole batch in one transaction
+        self.main_app.download_queue.extend(tasks)
+
+    def _task_settings(self) -> Dict[str, Any]:
+        """
+        Read the transfer and format settings stored with every new task.
 
         Returns:
-            List of command arguments
-        """
-        cmd = [
-            yt_dlp_path,
-            "--ffmpeg-location",
-            ffmpeg_path,
-            "--no-playlist",
-            "--output",
-            os.path.join(save_path, "%(title)s.%(ext)s"),
-            "--format",
-            "bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4",
-            "--merge-output-format",
-            "mp4",
-            url,
-        ]
+            Keyword arguments for DownloadTask.create()
+        """
+        return {
+            "concurrent_fragments": self.main_app.fragments_spin.value(),
+            "http_chunk_size": self.main_app.chunk_size_combo.currentData(),
+            "downloader": "aria2c" if self.main_app.aria2c_check.isChecked() else None,
+            "audio_format": self.main_app.audio_format_combo.currentData(),
+        }
 
-        # Apply quality filter if not "Best Available"
-        if video_quality != "Best Available":
-            height = video_quality.split("p")[0]
-            cmd[cmd.index("--format") + 1] = (
-                f"bestvideo[height<={height}]+bestaudio/merge"
+    def process_queue(self) -> None:
+        """
+        Process the download queue by filling free worker slots.
+
+        Up to ``concurrency.limit`` tasks run at the same time; the limit is
+        fixed at ``max_concurrent_downloads`` unless adaptive concurrency is
+        enabled. Each finished download frees its slot and calls back into
+        this method so the next queued task is started automatically.
+        """
+        # Start downloads while there are free slots and queued tasks; an
+        # update of yt-dlp starts the queue again when it has finished
+        while self.main_app.download_queue and not self.main_app.update_running:
+            slot = self._next_free_slot()
+            if slot is None:
+                break
+
+            data = self.main_app.download_queue.pop_next()
+            if data is None:
+                break
+            task = DownloadTask.from_dict(data)
+            task.rate_limit = self.concurrency.job_rate_limit()
+            self.main_app.active_downloads[slot] = task
+            self.concurrency.started(task.queue_id)
+            self._start_download(task, slot)
+
+        self.update_queue_status()
+
+    def update_queue_status(self) -> None:
+        """Show the number of pending, active and post-processing downloads."""
+        if hasattr(self.main_app, "queue_status_label"):
+            status = (
+                f"Queue: {len(self.main_app.download_queue)} pending, "
+                f"{len(self.main_app.active_downloads)} active"
             )
+            if self.post_processing:
+                status += f", {len(self.post_processing)} post-processing"
+            self.main_app.queue_status_label.setText(status)
 
-        return cmd
+    def _start_download(self, task: DownloadTask, slot: int) -> None:
+        """
+        Hand a task to the download engine.
 
-    def _build_audio_download_command(
-        self,
-        yt_dlp_path: str,
-        ffmpeg_path: str,
-        url: str,
-        save_path: str,
-        audio_quality: str,
-    ) -> List[str]:
+        Args:
+            task: Download task
+            slot: Worker slot the download is running in
+        """
+        self.main_app.update_status(f"Starting download: {os.path.basename(task.url)}")
+
+        # Title from playlist/channel extraction, if the task has one
+        self.main_app.updateSlotLabelSignal.emit(slot, task.title or "Unknown Title")
+
+        # yt-dlp continues the partial files of an interrupted download
+        resumed = partial_bytes(task)
+        if resumed:
+            self.main_app.log_message(
+                f"Resuming {task.title or task.url}: "
+                f"{format_bytes(resumed)} already downloaded",
+                slot,
+            )
+
+        # Add cookie support if enabled
+        cookie_file = None
+        if self.main_app.use_cookies and self.main_app.cookie_file:
+            cookie_file = self.main_app.cookie_file
+            self.main_app.log_message("Using cookie file for authentication")
+
+        self._slots[task.queue_id] = slot
+        self.engine.submit(task, task.queue_id, cookie_file)
+
+    def _on_engine_event(self, event: EngineEvent) -> None:
         """
-        Build yt-dlp.exe command for audio extraction.
+        Handle an event from the download engine in the main thread.
 
         Args:
-            yt_dlp_path: Path to yt-dlp.exe
-            ffmpeg_path: Path to ffmpeg.exe
-            url: Video URL
-            save_path: Download destination path
-            audio_quality: Audio quality in kbps
+            event: Engine event whose key is the queue ID of the task
+        """
+        key = event.key
+        slot = self._slots.get(key)
+        if slot is not None:
+            task = self.main_app.active_downloads.get(slot)
+        else:
+            task = self.post_processing.get(key)
+        if task is None:
+            return
 
-        Returns:
-            List of command arguments
-        """
-        cmd = [
-            yt_dlp_path,
-            "--ffmpeg-location",
-            ffmpeg_path,
-            "--no-playlist",
-            "--output",
-            os.path.join(save_path, "%(title)s.%(ext)s"),
-            "--format",
-            "bestaudio/best",
-            "--extract-audio",
-            "--audio-format",
-            "mp3",
-            "--audio-quality",
-            audio_quality,
-            url,
-        ]
+        if event.kind == EVENT_OUTPUT:
+            self.main_app.log_message(event.data, slot)
+        elif event.kind == EVENT_METADATA:
+            task.apply_metadata(event.data)
+
+            # Remember the files being written so a restart can resume them
+            if task.queue_id is not None:
+                self.main_app.download_queue.update(task.queue_id, task.to_dict())
+
+            # Reported for every stream, the first one starts the download
+            filename = event.data.get("filename")
+            if not filename or task.destinations.index(filename) == 0:
+                title = task.title or "Unknown Title"
+                self.main_app.log_message(f"Starting download: {title}", slot)
+                self.main_app.updateSlotLabelSignal.emit(slot, title)
+        elif event.kind == EVENT_PROGRESS and slot is None:
+            # Post-processing has no slot, its progress goes to the status bar
+            title = task.title or "Unknown Title"
+            if event.data.stage == STAGE_MERGE:
+                action = "Merging video and audio"
+            else:
+                action = "Converting to MP3"
+            if event.data.status == "started":
+                self.main_app.log_message(f"{action}: {title}")
+            elif event.data.status == "processing":
+                percent = event.data.percent or 0.0
+                self.main_app.update_status(f"{action}: {title} ({percent:.0f}%)")
+        elif event.kind == EVENT_PROGRESS:
+            self.main_app.log_message(event.data.describe(), slot)
+            self.main_app.progressEventSignal.emit(slot, event.data)
+            downloading = event.data.stage == STAGE_DOWNLOAD
+            self.concurrency.progress(key, event.data.speed if downloading else None)
+            self._adjust_concurrency()
+        elif event.kind == EVENT_DOWNLOADED:
+            task.error = event.data.error
+            task.filepath = event.data.filepath
+
+            # The slot is free, post-processing continues without it
+            del self._slots[key]
+            self.post_processing[key] = task
+            self.concurrency.finished(key, task.error)
+            self._adjust_concurrency()
+            self._on_download_complete(slot)
+        elif event.kind == EVENT_METRICS:
+            self.main_app.update_metrics_summary(self.metrics_log.summary())
+        elif event.kind == EVENT_FINISHED:
+            del self.post_processing[key]
+            task.error = event.data.error
+            task.filepath = event.data.filepath
+            if task.error:
+                self.main_app.log_message(
+                    f"Download failed for {task.url}: {task.error}"
+                )
+                self.main_app.downloadErrorSignal.emit(task.error)
+            else:
+                title = task.title or "Unknown Title"
+                self.main_app.log_message(f"Download completed: {title}")
+            self._on_task_finished(task)
+
+    def _adjust_concurrency(self) -> None:
+        """Let the controller adapt the limit and fill newly allowed slots."""
+        if not self.concurrency.update():
+            return
+
+        throughput = self.concurrency.throughput
+        speed = f" at {format_bytes(throughput)}/s" if throughput else ""
+        self.main_app.log_message(
+            f"Adaptive concurrency: {self.concurrency.limit} downloads{speed}"
+        )
+        self.process_queue()
 
-        return cmd
+    def shutdown(self) -> None:
+        """Stop running downloads; they are resumed on the next start."""
+        self.engine.shutdown(wait=False)
 
-    def _show_download_error(self, error: Exception) -> None:
+    def _show_download_error(self, error: str) -> None:
         """
         Show detailed download error dialog.
 
         Args:
-            error: Exception that occurred during download
+            error: Error message of the failed download
         """
-        error_text = str(error)
+        error_text = error
 
         # Add helpful hints for common errors
         if "Failed to decrypt with DPAPI" in error_text:
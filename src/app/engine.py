@@ -0,0 +1,1479 @@
+"""
+Qt-free download engine shared by the GUI and the command-line mode.
+
+Everything in this module only depends on the standard library, so it can
+be imported without PyQt6 (for example from cron jobs or on a server).
+"""
+
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from . import ytdlp_api
+from .download_index import DownloadIndex
+from .extraction_cache import listing_cache_key
+from .metrics import (
+    PHASE_DOWNLOAD_DONE,
+    PHASE_METADATA,
+    PHASE_SPAWN,
+    MetricsLog,
+    ProcessSampler,
+    TaskMetrics,
+)
+from .tasks import (
+    AUDIO_FORMAT_MP3,
+    AUDIO_FORMAT_ORIGINAL,
+    DownloadTask,
+    PlaylistEntry,
+    is_audio_mode,
+)
+from .progress import (
+    DOWNLOAD_PROGRESS_TEMPLATE,
+    POSTPROCESS_PROGRESS_TEMPLATE,
+    STAGE_DOWNLOAD,
+    STAGE_EXTRACT_AUDIO,
+    STAGE_MERGE,
+    ProgressEvent,
+    parse_progress_line,
+)
+
+# Download modes offered by the application
+DOWNLOAD_MODES = [
+    "Single Video",
+    "MP3 Only",
+    "Playlist Video",
+    "Playlist MP3",
+    "Channel Videos",
+    "Channel Videos MP3",
+    "Channel Shorts",
+    "Channel Shorts MP3",
+]
+PLAYLIST_MODES = ["Playlist Video", "Playlist MP3"]
+CHANNEL_MODES = [
+    "Channel Videos",
+    "Channel Videos MP3",
+    "Channel Shorts",
+    "Channel Shorts MP3",
+]
+
+# Marker for metadata lines printed by the download process itself, once
+# per stream together with the file it is downloaded to
+METADATA_PREFIX = "[ytdgui-meta] "
+METADATA_TEMPLATE = "before_dl:" + METADATA_PREFIX + "%(.{id,title,duration,filename})j"
+
+# Marker for the final path of the downloaded file
+FILEPATH_PREFIX = "[ytdgui-file] "
+FILEPATH_TEMPLATE = "after_move:" + FILEPATH_PREFIX + "%(filepath)s"
+
+# Video and audio streams are downloaded to separate files named after the
+# format and merged by the post-processing stage
+STREAM_OUTPUT_TEMPLATE = "%(title)s.f%(format_id)s.%(ext)s"
+MERGE_OUTPUT_FORMAT = "mp4"
+_STREAM_SUFFIX_RE = re.compile(r"\.f[\w-]+$")
+
+# Options of every ffmpeg post-processing run; progress goes to stdout
+FFMPEG_OPTIONS = [
+    "-y",
+    "-hide_banner",
+    "-loglevel",
+    "error",
+    "-nostats",
+    "-progress",
+    "pipe:1",
+]
+
+# Largest difference in seconds between the duration reported by yt-dlp
+# and the duration of the finished file, at least DURATION_TOLERANCE or
+# DURATION_TOLERANCE_RATIO of the duration
+DURATION_TOLERANCE = 2.0
+DURATION_TOLERANCE_RATIO = 0.01
+_DURATION_RE = re.compile(r"Duration: (N/A|(\d+):(\d+):(\d+(?:\.\d+)?))")
+
+# Fields printed per flat-playlist entry instead of the full --dump-json
+FLAT_ENTRY_TEMPLATE = "%(.{id,url,title,duration})j"
+
+# Minimum delay in seconds between forwarded progress updates per download
+PROGRESS_INTERVAL = 0.1
+
+# Default number of DASH/HLS fragments downloaded in parallel per video
+DEFAULT_CONCURRENT_FRAGMENTS = 4
+
+# Default number of post-processing jobs (merges and MP3 transcodes)
+DEFAULT_CPU_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# Ways of running yt-dlp: the bundled executable per download, or the
+# optional yt_dlp package in worker processes that stay loaded
+BACKEND_SUBPROCESS = "subprocess"
+BACKEND_API = "api"
+BACKENDS = [BACKEND_SUBPROCESS, BACKEND_API]
+
+# Kinds of events reported by DownloadEngine
+EVENT_OUTPUT = "output"
+EVENT_METADATA = "metadata"
+EVENT_PROGRESS = "progress"
+EVENT_DOWNLOADED = "downloaded"
+EVENT_METRICS = "metrics"
+EVENT_FINISHED = "finished"
+
+# yt-dlp and ffmpeg processes started by the engine in this process
+_running_processes: Set[subprocess.Popen] = set()
+_running_lock = threading.Lock()
+
+# Cancel event of the engine owning this worker process, if it is one
+_worker_cancel: Optional[Any] = None
+
+# Interval in seconds at which a worker process checks for cancellation
+CANCEL_POLL_INTERVAL = 0.2
+
+
+def resolve_backend(backend: str) -> str:
+    """
+    Return the backend to use for a requested one.
+
+    Args:
+        backend: One of BACKENDS
+
+    Returns:
+        ``backend``, or BACKEND_SUBPROCESS if the yt_dlp package needed by
+        BACKEND_API is not installed
+    """
+    if backend == BACKEND_API and not ytdlp_api.is_available():
+        return BACKEND_SUBPROCESS
+    return backend
+
+
+def get_yt_dlp_path(base_dir: str) -> str:
+    """Return the path of the bundled yt-dlp executable."""
+    return os.path.join(base_dir, "bin", "yt-dlp.exe")
+
+
+def get_ffmpeg_path(base_dir: str) -> str:
+    """Return the path of the bundled ffmpeg executable."""
+    return os.path.join(base_dir, "bin", "ffmpeg.exe")
+
+
+def find_aria2c(base_dir: str) -> Optional[str]:
+    """
+    Locate aria2c, preferring a copy bundled next to yt-dlp.
+
+    Args:
+        base_dir: Application base directory containing bin/
+
+    Returns:
+        Path of the aria2c executable, or None if it is not installed
+    """
+    bundled = os.path.join(base_dir, "bin", "aria2c.exe")
+    if os.path.exists(bundled):
+        return bundled
+    return shutil.which("aria2c")
+
+
+def creation_flags() -> int:
+    """Return subprocess creation flags that hide console windows on Windows."""
+    if sys.platform == "win32":
+        return subprocess.CREATE_NO_WINDOW
+    return 0
+
+
+def build_video_download_command(
+    yt_dlp_path: str,
+    ffmpeg_path: str,
+    url: str,
+    save_path: str,
+    video_quality: str,
+    concurrent_fragments: int = 1,
+    http_chunk_size: Optional[int] = None,
+    aria2c_path: Optional[str] = None,
+) -> List[str]:
+    """
+    Build yt-dlp.exe command for video download.
+
+    The video and audio streams are saved as separate files; merging them
+    is left to merge_streams() so the download slot is not held by ffmpeg.
+
+    Args:
+        yt_dlp_path: Path to yt-dlp.exe
+        ffmpeg_path: Path to ffmpeg.exe
+        url: Video URL
+        save_path: Download destination path
+        video_quality: Preferred video quality
+        concurrent_fragments: Number of DASH/HLS fragments fetched in parallel
+        http_chunk_size: Optional size in bytes of ranged HTTP requests
+        aria2c_path: Optional aria2c executable used as external downloader
+
+    Returns:
+        List of command arguments
+    """
+    cmd = [
+        yt_dlp_path,
+        "--ffmpeg-location",
+        ffmpeg_path,
+        "--no-playlist",
+        "--output",
+        os.path.join(save_path, STREAM_OUTPUT_TEMPLATE),
+        "--format",
+        "bestvideo[ext=mp4]/best[ext=mp4]/best,bestaudio[ext=m4a]/bestaudio",
+        url,
+    ]
+
+    # Apply quality filter if not "Best Available"; mp4/m4a streams are
+    # still preferred, merge_streams() copies them into an mp4 file
+    if video_quality != "Best Available":
+        limit = f"[height<={video_quality.split('p')[0]}]"
+        cmd[cmd.index("--format") + 1] = (
+            f"bestvideo{limit}[ext=mp4]/best{limit}[ext=mp4]/"
+            f"bestvideo{limit}/best{limit}/best,bestaudio[ext=m4a]/bestaudio"
+        )
+
+    cmd.extend(
+        build_transfer_options(concurrent_fragments, http_chunk_size, aria2c_path)
+    )
+    return cmd
+
+
+def build_audio_download_command(
+    yt_dlp_path: str,
+    ffmpeg_path: str,
+    url: str,
+    save_path: str,
+    audio_quality: str,
+    concurrent_fragments: int = 1,
+    http_chunk_size: Optional[int] = None,
+    aria2c_path: Optional[str] = None,
+    audio_format: str = AUDIO_FORMAT_MP3,
+) -> List[str]:
+    """
+    Build yt-dlp.exe command for audio extraction.
+
+    Args:
+        yt_dlp_path: Path to yt-dlp.exe
+        ffmpeg_path: Path to ffmpeg.exe
+        url: Video URL
+        save_path: Download destination path
+        audio_quality: Audio quality in kbps (MP3 only)
+        concurrent_fragments: Number of DASH/HLS fragments fetched in parallel
+        http_chunk_size: Optional size in bytes of ranged HTTP requests
+        aria2c_path: Optional aria2c executable used as external downloader
+        audio_format: AUDIO_FORMAT_MP3 to transcode, or AUDIO_FORMAT_ORIGINAL
+            to stream-copy the AAC/Opus track into an .m4a/.opus file
+
+    Returns:
+        List of command arguments
+    """
+    cmd = [
+        yt_dlp_path,
+        "--ffmpeg-location",
+        ffmpeg_path,
+        "--no-playlist",
+        "--output",
+        os.path.join(save_path, "%(title)s.%(ext)s"),
+        "--format",
+        "bestaudio/best",
+        "--extract-audio",
+        "--audio-format",
+    ]
+    if audio_format == AUDIO_FORMAT_ORIGINAL:
+        # "best" keeps the codec of the stream, ffmpeg only remuxes it
+        cmd.append("best")
+    else:
+        cmd.extend(["mp3", "--audio-quality", audio_quality])
+    cmd.append(url)
+
+    cmd.extend(
+        build_transfer_options(concurrent_fragments, http_chunk_size, aria2c_path)
+    )
+    return cmd
+
+
+def build_transfer_options(
+    concurrent_fragments: int = 1,
+    http_chunk_size: Optional[int] = None,
+    aria2c_path: Optional[str] = None,
+) -> List[str]:
+    """
+    Build the yt-dlp options controlling how media data is transferred.
+
+    Args:
+        concurrent_fragments: Number of DASH/HLS fragments fetched in parallel
+        http_chunk_size: Optional size in bytes of ranged HTTP requests, which
+            avoids the per-connection throttling of large single requests
+        aria2c_path: Optional aria2c executable; when given, aria2c opens
+            ``concurrent_fragments`` connections per file instead
+
+    Returns:
+        List of command arguments (empty for yt-dlp's defaults)
+    """
+    options: List[str] = []
+    if aria2c_path:
+        connections = max(1, concurrent_fragments)
+        aria2c_args = f"-x {connections} -s {connections} -k 1M"
+        options.extend(
+            [
+                "--external-downloader",
+                aria2c_path,
+                "--external-downloader-args",
+                f"aria2c:{aria2c_args}",
+            ]
+        )
+    elif concurrent_fragments > 1:
+        options.extend(["--concurrent-fragments", str(concurrent_fragments)])
+
+    # Chunked requests only apply to yt-dlp's own HTTP downloader
+    if http_chunk_size and not aria2c_path:
+        options.extend(["--http-chunk-size", str(http_chunk_size)])
+    return options
+
+
+def build_download_command(
+    task: DownloadTask, base_dir: str, cookie_file: Optional[str] = None
+) -> List[str]:
+    """
+    Build the complete yt-dlp command for a download task.
+
+    Args:
+        task: Download task
+        base_dir: Application base directory containing bin/
+        cookie_file: Optional cookie file for authentication
+
+    Returns:
+        List of command arguments
+    """
+    yt_dlp_path = get_yt_dlp_path(base_dir)
+    ffmpeg_path = get_ffmpeg_path(base_dir)
+
+    # aria2c is optional; without it yt-dlp's native downloader is used
+    aria2c_path = find_aria2c(base_dir) if task.downloader == "aria2c" else None
+    transfer = {
+        "concurrent_fragments": task.concurrent_fragments or 1,
+        "http_chunk_size": task.http_chunk_size,
+        "aria2c_path": aria2c_path,
+    }
+
+    # Build command based on mode. yt-dlp neither merges nor produces MP3:
+    # the streams are downloaded as they are and merged or transcoded by the
+    # engine's post-processing pool, so the download slot is free while
+    # ffmpeg is running.
+    if is_audio_mode(task.mode):
+        cmd = build_audio_download_command(
+            yt_dlp_path,
+            ffmpeg_path,
+            task.url,
+            task.save_path,
+            task.audio_quality or "320",
+            audio_format=AUDIO_FORMAT_ORIGINAL,
+            **transfer,
+        )
+    else:
+        cmd = build_video_download_command(
+            yt_dlp_path,
+            ffmpeg_path,
+            task.url,
+            task.save_path,
+            task.video_quality,
+            **transfer,
+        )
+
+    # Add cookie support if enabled
+    if cookie_file:
+        cmd.extend(["--cookies", cookie_file])
+
+    # Share of the global speed limit assigned by the scheduler
+    if task.rate_limit:
+        cmd.extend(["--limit-rate", str(task.rate_limit)])
+
+    # Record finished channel videos for incremental sync
+    if task.archive:
+        cmd.extend(["--download-archive", task.archive])
+
+    # Pick up .part files left by an interrupted download
+    cmd.append("--continue")
+
+    # Have yt-dlp print the video metadata right before downloading
+    # instead of probing it with a separate --dump-json process.
+    # --print implies --quiet, so progress output is re-enabled.
+    cmd.extend(["--print", METADATA_TEMPLATE, "--progress", "--newline"])
+
+    # Report where the finished file ended up
+    cmd.extend(["--print", FILEPATH_TEMPLATE])
+
+    # Machine-readable progress for download and post-processing
+    cmd.extend(
+        [
+            "--progress-template",
+            DOWNLOAD_PROGRESS_TEMPLATE,
+            "--progress-template",
+            POSTPROCESS_PROGRESS_TEMPLATE,
+        ]
+    )
+
+    return cmd
+
+
+def parse_metadata(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the metadata line printed by the download process.
+
+    Args:
+        line: A single line of output from yt-dlp.
+
+    Returns:
+        Dictionary with id, title and duration, or None if the line
+        is not a metadata line.
+    """
+    if not line.startswith(METADATA_PREFIX):
+        return None
+    try:
+        metadata = json.loads(line[len(METADATA_PREFIX) :])
+    except json.JSONDecodeError:
+        return None
+    return metadata if isinstance(metadata, dict) else None
+
+
+class _DownloadOutput:
+    """
+    Parse the output lines of a download and report them.
+
+    Shared by both backends, which print the same lines. Download
+    progress is forwarded at most once per PROGRESS_INTERVAL; stage
+    changes and the final update are always forwarded.
+    """
+
+    def __init__(
+        self,
+        task: DownloadTask,
+        on_output: Optional[Callable[[str], None]] = None,
+        on_metadata: Optional[Callable[[Dict[str, Any]], None]] = None,
+        on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+        metrics: Optional[TaskMetrics] = None,
+    ):
+        """
+        Initialize the parser.
+
+        Args:
+            task: Download task, updated with the printed metadata and the
+                paths of the downloaded files
+            on_output: Called with every plain output line
+            on_metadata: Called with the metadata printed before downloading
+                each stream
+            on_progress: Called with parsed progress events
+            metrics: Optional metrics receiving phase timings and bytes
+        """
+        self.task = task
+        self.on_output = on_output
+        self.on_metadata = on_metadata
+        self.on_progress = on_progress
+        self.metrics = metrics
+        self._last_progress = 0.0
+
+    def feed(self, line: str) -> None:
+        """Handle one line of output."""
+        line = line.strip()
+        if not line:
+            return
+
+        if line.startswith(FILEPATH_PREFIX):
+            # One path per downloaded stream, the last one is final
+            self.task.filepath = line[len(FILEPATH_PREFIX) :]
+            self.task.parts = (self.task.parts or []) + [self.task.filepath]
+            return
+
+        metadata = parse_metadata(line)
+        if metadata is not None:
+            # Printed again for every stream with its file name
+            if self.metrics is not None:
+                self.metrics.mark(PHASE_METADATA)
+            self.task.apply_metadata(metadata)
+            if self.on_metadata:
+                self.on_metadata(metadata)
+            return
+
+        event = parse_progress_line(line)
+        if event is None:
+            if self.on_output:
+                self.on_output(line)
+            return
+        if self.metrics is not None:
+            self.metrics.on_progress(event)
+
+        # Forward at most one download update per interval
+        now = time.monotonic()
+        if (
+            event.stage == STAGE_DOWNLOAD
+            and event.status == "downloading"
+            and now - self._last_progress < PROGRESS_INTERVAL
+        ):
+            return
+        self._last_progress = now
+
+        if self.on_progress:
+            self.on_progress(event)
+
+
+def _prepare_download(task: DownloadTask) -> None:
+    """Create the archive folder and forget the paths of an earlier run."""
+    if task.archive:
+        os.makedirs(os.path.dirname(task.archive), exist_ok=True)
+
+    # Paths are reported again when a resumed download completes
+    task.filepath = None
+    task.parts = None
+
+
+def run_download(
+    task: DownloadTask,
+    base_dir: str,
+    cookie_file: Optional[str] = None,
+    on_output: Optional[Callable[[str], None]] = None,
+    on_metadata: Optional[Callable[[Dict[str, Any]], None]] = None,
+    on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+    metrics: Optional[TaskMetrics] = None,
+) -> None:
+    """
+    Run one download task with yt-dlp and report its output.
+
+    Download progress is forwarded at most once per PROGRESS_INTERVAL;
+    stage changes and the final update are always forwarded.
+
+    Args:
+        task: Download task, updated with the printed metadata and the
+            paths of the downloaded files
+        base_dir: Application base directory containing bin/
+        cookie_file: Optional cookie file for authentication
+        on_output: Called with every plain output line
+        on_metadata: Called with the metadata printed before downloading
+            each stream
+        on_progress: Called with parsed progress events
+        metrics: Optional metrics receiving phase timings, bytes and
+            CPU/RSS samples of the yt-dlp process tree
+
+    Raises:
+        subprocess.CalledProcessError: If yt-dlp exits with an error
+    """
+    cmd = build_download_command(task, base_dir, cookie_file)
+    _prepare_download(task)
+    output = _DownloadOutput(task, on_output, on_metadata, on_progress, metrics)
+
+    # Execute download command
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        universal_newlines=True,
+        creationflags=creation_flags(),
+    )
+
+    with _running_lock:
+        _running_processes.add(process)
+    sampler = None
+    if metrics is not None:
+        metrics.mark(PHASE_SPAWN)
+        sampler = ProcessSampler(process.pid, metrics)
+    try:
+        # Read output line by line for progress updates
+        if process.stdout:
+            for line in iter(process.stdout.readline, ""):
+                output.feed(line)
+        process.wait()
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        with _running_lock:
+            _running_processes.discard(process)
+
+    # Check if download was successful
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd)
+
+
+def run_download_api(
+    task: DownloadTask,
+    base_dir: str,
+    cookie_file: Optional[str] = None,
+    on_output: Optional[Callable[[str], None]] = None,
+    on_metadata: Optional[Callable[[Dict[str, Any]], None]] = None,
+    on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+    metrics: Optional[TaskMetrics] = None,
+) -> None:
+    """
+    Run one download task with the yt_dlp package in this process.
+
+    Same contract as run_download(); the command line is the same and is
+    parsed by yt-dlp itself, so both backends download alike. Meant for
+    the warm worker processes of a DownloadEngine with BACKEND_API.
+
+    Args:
+        task: Download task, updated like by run_download()
+        base_dir: Application base directory containing bin/
+        cookie_file: Optional cookie file for authentication
+        on_output: Called with every plain output line
+        on_metadata: Called with the metadata printed before downloading
+            each stream
+        on_progress: Called with parsed progress events
+        metrics: Optional metrics receiving phase timings and bytes
+
+    Raises:
+        subprocess.CalledProcessError: If yt-dlp reports an error
+    """
+    cmd = build_download_command(task, base_dir, cookie_file)
+    _prepare_download(task)
+    output = _DownloadOutput(task, on_output, on_metadata, on_progress, metrics)
+
+    # Nothing is spawned, yt-dlp is already loaded in this worker
+    if metrics is not None:
+        metrics.mark(PHASE_SPAWN)
+    ytdlp_api.download(cmd[1:], output.feed)
+
+
+def run_ffmpeg(
+    cmd: List[str],
+    stage: str,
+    duration: Optional[float] = None,
+    on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+    metrics: Optional[TaskMetrics] = None,
+) -> None:
+    """
+    Run an ffmpeg command that includes FFMPEG_OPTIONS and report progress.
+
+    Progress is derived from the ``out_time_ms`` values ffmpeg writes to
+    stdout and forwarded at most once per PROGRESS_INTERVAL.
+
+    Args:
+        cmd: ffmpeg command
+        stage: Progress stage reported in the events
+        duration: Media duration in seconds; progress needs it for percent
+        on_progress: Called with ProgressEvents of status "processing"
+        metrics: Optional metrics receiving CPU/RSS samples of ffmpeg
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg exits with an error
+    """
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        creationflags=creation_flags(),
+    )
+    with _running_lock:
+        _running_processes.add(process)
+    sampler = ProcessSampler(process.pid, metrics) if metrics is not None else None
+    errors: List[str] = []
+    try:
+        last_progress = 0.0
+        if process.stdout:
+            for line in iter(process.stdout.readline, ""):
+                key, separator, value = line.strip().partition("=")
+                if not separator:
+                    if key:
+                        errors.append(key)
+                    continue
+                # Despite its name, out_time_ms is in microseconds
+                if key != "out_time_ms" or not duration or not on_progress:
+                    continue
+                try:
+                    seconds = int(value) / 1000000
+                except ValueError:
+                    continue
+
+                now = time.monotonic()
+                if now - last_progress < PROGRESS_INTERVAL:
+                    continue
+                last_progress = now
+                percent = min(100.0, max(0.0, seconds * 100 / duration))
+                on_progress(
+                    ProgressEvent(stage=stage, status="processing", percent=percent)
+                )
+        process.wait()
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        with _running_lock:
+            _running_processes.discard(process)
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(
+            process.returncode, cmd, output="\n".join(errors)
+        )
+
+
+def transcode_audio(
+    source: str,
+    ffmpeg_path: str,
+    audio_quality: str,
+    duration: Optional[float] = None,
+    on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+    metrics: Optional[TaskMetrics] = None,
+) -> str:
+    """
+    Convert a downloaded audio file to MP3 and remove the original.
+
+    Args:
+        source: Path of the downloaded .m4a/.opus file
+        ffmpeg_path: Path to ffmpeg.exe
+        audio_quality: MP3 bitrate in kbps
+        duration: Audio duration in seconds, for progress
+        on_progress: Called with conversion progress
+        metrics: Optional metrics receiving CPU/RSS samples of ffmpeg
+
+    Returns:
+        Path of the MP3 file
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg exits with an error
+    """
+    root, ext = os.path.splitext(source)
+    if ext.lower() == ".mp3":
+        # Already MP3, re-encoding would only lose quality
+        return source
+
+    target = root + ".mp3"
+    cmd = [ffmpeg_path] + FFMPEG_OPTIONS
+    cmd += [
+        "-i",
+        source,
+        "-vn",
+        "-map_metadata",
+        "0",
+        "-codec:a",
+        "libmp3lame",
+        "-b:a",
+        f"{audio_quality}k",
+        target,
+    ]
+    run_ffmpeg(cmd, STAGE_EXTRACT_AUDIO, duration, on_progress, metrics)
+    os.remove(source)
+    return target
+
+
+def merged_path(parts: List[str]) -> str:
+    """
+    Return the path of the file merged from separately downloaded streams.
+
+    Args:
+        parts: Stream files named with STREAM_OUTPUT_TEMPLATE
+
+    Returns:
+        Path without the format ID, with the MERGE_OUTPUT_FORMAT extension
+    """
+    root = _STREAM_SUFFIX_RE.sub("", os.path.splitext(parts[0])[0])
+    return f"{root}.{MERGE_OUTPUT_FORMAT}"
+
+
+def rename_single_stream(path: str) -> str:
+    """
+    Remove the format ID from a video that was downloaded as one stream.
+
+    When no separate audio stream is available, yt-dlp downloads a single
+    file with audio, still named with STREAM_OUTPUT_TEMPLATE.
+
+    Args:
+        path: Downloaded file, e.g. "Title.f18.mp4"
+
+    Returns:
+        Path of the renamed file, e.g. "Title.mp4"
+    """
+    root, ext = os.path.splitext(path)
+    target = _STREAM_SUFFIX_RE.sub("", root) + ext
+    if target != path:
+        os.replace(path, target)
+    return target
+
+
+def merge_streams(
+    parts: List[str],
+    ffmpeg_path: str,
+    duration: Optional[float] = None,
+    on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+    metrics: Optional[TaskMetrics] = None,
+) -> str:
+    """
+    Merge a video and an audio stream into one file and remove the streams.
+
+    The streams are copied without re-encoding.
+
+    Args:
+        parts: Paths of the video stream followed by the audio stream
+        ffmpeg_path: Path to ffmpeg.exe
+        duration: Video duration in seconds, for progress
+        on_progress: Called with merge progress
+        metrics: Optional metrics receiving CPU/RSS samples of ffmpeg
+
+    Returns:
+        Path of the merged file
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg exits with an error
+    """
+    target = merged_path(parts)
+    cmd = [ffmpeg_path] + FFMPEG_OPTIONS
+    for part in parts:
+        cmd += ["-i", part]
+    cmd += [
+        "-map",
+        "0:v:0",
+        "-map",
+        "1:a:0",
+        "-codec",
+        "copy",
+        "-movflags",
+        "+faststart",
+        target,
+    ]
+    run_ffmpeg(cmd, STAGE_MERGE, duration, on_progress, metrics)
+    for part in parts:
+        os.remove(part)
+    return target
+
+
+def partial_files(task: DownloadTask) -> List[str]:
+    """
+    Find the files an interrupted download of a task left behind.
+
+    Args:
+        task: Task with ``destinations`` recorded by an earlier run
+
+    Returns:
+        Paths of the .part, .part-FragN and .ytdl files that exist
+    """
+    found: Set[str] = set()
+    for destination in task.destinations or []:
+        found.update(glob.glob(glob.escape(destination) + ".part*"))
+        if os.path.exists(destination + ".ytdl"):
+            found.add(destination + ".ytdl")
+    return sorted(found)
+
+
+def partial_bytes(task: DownloadTask) -> int:
+    """Return the number of bytes a resumed download of a task can keep."""
+    total = 0
+    for path in partial_files(task):
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def probe_duration(path: str, ffmpeg_path: str) -> Optional[float]:
+    """
+    Read the duration of a media file from ffmpeg's description of it.
+
+    Args:
+        path: Media file
+        ffmpeg_path: Path to ffmpeg.exe
+
+    Returns:
+        Duration in seconds, or None if the container does not store one
+
+    Raises:
+        OSError: If ffmpeg cannot be started
+        ValueError: If ffmpeg cannot read the file
+    """
+    # Without an output file ffmpeg only describes the input and exits
+    # with an error, so the exit code is ignored
+    result = subprocess.run(
+        [ffmpeg_path, "-hide_banner", "-i", path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        creationflags=creation_flags(),
+    )
+    match = _DURATION_RE.search(result.stdout or "")
+    if match is None:
+        raise ValueError(f"ffmpeg cannot read {os.path.basename(path)}")
+    if match.group(1) == "N/A":
+        return None
+    hours, minutes, seconds = match.group(2, 3, 4)
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def verify_output(task: DownloadTask, ffmpeg_path: str) -> Optional[str]:
+    """
+    Check the finished file of a task before it is marked as complete.
+
+    The file must exist and not be empty, and its duration must match the
+    one reported by yt-dlp, which catches truncated streams and merges.
+    The duration is not checked when it is unknown or ffmpeg is
+    unavailable.
+
+    Args:
+        task: Task with ``filepath`` set
+        ffmpeg_path: Path to ffmpeg.exe
+
+    Returns:
+        Description of the problem, or None if the file is complete
+    """
+    name = os.path.basename(task.filepath or "")
+    try:
+        size = os.path.getsize(task.filepath or "")
+    except OSError:
+        return f"Downloaded file is missing: {name}"
+    if size == 0:
+        return f"Downloaded file is empty: {name}"
+
+    if not task.duration:
+        return None
+    try:
+        actual = probe_duration(task.filepath, ffmpeg_path)
+    except OSError:
+        return None
+    except ValueError as e:
+        return str(e)
+    if actual is None:
+        return None
+
+    tolerance = max(DURATION_TOLERANCE, task.duration * DURATION_TOLERANCE_RATIO)
+    if abs(actual - task.duration) > tolerance:
+        return f"Duration of {name} is {actual:.0f}s instead of {task.duration:.0f}s"
+    return None
+
+
+@dataclass
+class EngineEvent:
+    """
+    Event reported by a running download.
+
+    ``data`` depends on ``kind``: the output line (EVENT_OUTPUT), the
+    metadata dictionary (EVENT_METADATA), a ProgressEvent (EVENT_PROGRESS),
+    the DownloadTask once the network transfer is over (EVENT_DOWNLOADED),
+    the TaskMetrics of the download (EVENT_METRICS) or the finished
+    DownloadTask with ``error`` set on failure (EVENT_FINISHED).
+    """
+
+    kind: str
+    key: int
+    data: Any = None
+
+
+def download_stage(
+    task: DownloadTask,
+    base_dir: str,
+    cookie_file: Optional[str],
+    key: int,
+    events: "queue.Queue",
+    backend: str = BACKEND_SUBPROCESS,
+) -> Tuple[DownloadTask, TaskMetrics]:
+    """
+    Run the network part of a task and put its events on a queue.
+
+    This is a module-level function so it can run in a worker process.
+    It never raises; a failure is reported through ``task.error``.
+
+    Args:
+        task: Download task
+        base_dir: Application base directory containing bin/
+        cookie_file: Optional cookie file for authentication
+        key: Caller-defined identifier included in every event
+        events: Queue receiving EngineEvent objects
+        backend: One of BACKENDS, BACKEND_API only in a worker process
+
+    Returns:
+        The downloaded task and its metrics, for post_process_stage()
+    """
+    metrics = TaskMetrics(task.url, task.mode, task.title)
+    download = run_download_api if backend == BACKEND_API else run_download
+    cancel = _worker_cancel
+    finished = threading.Event()
+    if cancel is not None:
+        # The engine cannot reach the processes of a worker, so the worker
+        # kills them itself once the engine is cancelled
+        threading.Thread(
+            target=_kill_on_cancel, args=(cancel, finished), daemon=True
+        ).start()
+    try:
+        if cancel is not None and cancel.is_set():
+            raise RuntimeError("Download cancelled")
+        download(
+            task,
+            base_dir,
+            cookie_file,
+            on_output=lambda line: events.put(EngineEvent(EVENT_OUTPUT, key, line)),
+            on_metadata=lambda data: events.put(EngineEvent(EVENT_METADATA, key, data)),
+            on_progress=lambda event: events.put(
+                EngineEvent(EVENT_PROGRESS, key, event)
+            ),
+            metrics=metrics,
+        )
+    except Exception as e:
+        task.error = str(e)
+    finally:
+        finished.set()
+
+    # Merging and converting are timed as post-processing
+    metrics.mark(PHASE_DOWNLOAD_DONE)
+    events.put(EngineEvent(EVENT_DOWNLOADED, key, task))
+    return task, metrics
+
+
+def _init_worker(cancel: Any, warm_up: bool) -> None:
+    """
+    Initialize a worker process of a DownloadEngine.
+
+    Args:
+        cancel: multiprocessing.Event set when the engine is cancelled
+        warm_up: Import yt-dlp for BACKEND_API
+    """
+    global _worker_cancel
+    _worker_cancel = cancel
+    if warm_up:
+        ytdlp_api.warm_up()
+
+
+def _kill_on_cancel(cancel: Any, finished: threading.Event) -> None:
+    """Kill the processes of this worker until its download has finished."""
+    while not finished.is_set():
+        if cancel.wait(CANCEL_POLL_INTERVAL):
+            terminate_downloads()
+            finished.wait(CANCEL_POLL_INTERVAL)
+
+
+def needs_post_processing(task: DownloadTask) -> bool:
+    """Return True if a downloaded task still has to be merged or converted."""
+    if task.error or not task.filepath:
+        return False
+    return task.merges_streams or task.transcodes_audio
+
+
+def post_process_stage(
+    task: DownloadTask,
+    metrics: TaskMetrics,
+    base_dir: str,
+    key: int,
+    events: "queue.Queue",
+) -> DownloadTask:
+    """
+    Merge or convert a downloaded task, verify the result and report that
+    it has finished.
+
+    It never raises; a failure, including a file that fails
+    verify_output(), is reported through ``task.error``.
+
+    Args:
+        task: Task returned by download_stage()
+        metrics: Metrics returned by download_stage()
+        base_dir: Application base directory containing bin/
+        key: Caller-defined identifier included in every event
+        events: Queue receiving EngineEvent objects
+
+    Returns:
+        The finished task
+    """
+    ffmpeg_path = get_ffmpeg_path(base_dir)
+    if needs_post_processing(task):
+        stage = STAGE_MERGE if task.merges_streams else STAGE_EXTRACT_AUDIO
+
+        def report(event: ProgressEvent) -> None:
+            events.put(EngineEvent(EVENT_PROGRESS, key, event))
+
+        report(ProgressEvent(stage=stage, status="started"))
+        try:
+            if task.merges_streams:
+                task.filepath = merge_streams(
+                    task.parts, ffmpeg_path, task.duration, report, metrics=metrics
+                )
+                task.parts = None
+            else:
+                task.filepath = transcode_audio(
+                    task.filepath,
+                    ffmpeg_path,
+                    task.audio_quality or "320",
+                    task.duration,
+                    report,
+                    metrics=metrics,
+                )
+            report(ProgressEvent(stage=stage, status="finished", percent=100.0))
+        except Exception as e:
+            task.error = str(e)
+    elif not task.error and task.filepath and not is_audio_mode(task.mode):
+        # Only one stream was downloaded, nothing to merge
+        try:
+            task.filepath = rename_single_stream(task.filepath)
+            task.parts = None
+        except OSError as e:
+            task.error = str(e)
+
+    if not task.error and task.filepath:
+        task.error = verify_output(task, ffmpeg_path)
+
+    metrics.title = task.title
+    metrics.finish(task.error)
+    events.put(EngineEvent(EVENT_METRICS, key, metrics))
+    events.put(EngineEvent(EVENT_FINISHED, key, task))
+    return task
+
+
+def execute_task(
+    task: DownloadTask,
+    base_dir: str,
+    cookie_file: Optional[str],
+    key: int,
+    events: "queue.Queue",
+) -> DownloadTask:
+    """
+    Run both stages of a task in the calling thread.
+
+    Args:
+        task: Download task
+        base_dir: Application base directory containing bin/
+        cookie_file: Optional cookie file for authentication
+        key: Caller-defined identifier included in every event
+        events: Queue receiving EngineEvent objects
+
+    Returns:
+        The finished task
+    """
+    task, metrics = download_stage(task, base_dir, cookie_file, key, events)
+    return post_process_stage(task, metrics, base_dir, key, events)
+
+
+class DownloadEngine:
+    """
+    Runs download tasks in a thread or process pool.
+
+    Every task has two stages. The download runs in the worker pool and
+    ends with EVENT_DOWNLOADED, which frees its network slot. Post-processing
+    (merging video and audio, MP3 transcodes) then runs in a separate,
+    smaller thread pool, so ffmpeg overlaps with the next downloads.
+
+    Events from all workers are collected on one queue and passed to the
+    listener from a single dispatcher thread, so the listener never runs
+    concurrently with itself. A GUI passes a listener that forwards the
+    events as Qt signals. Metrics of finished downloads are stored in the
+    optional MetricsLog and their files in the optional DownloadIndex
+    before they reach the listener.
+
+    With BACKEND_API, downloads run through the yt_dlp package in worker
+    processes that import it once and are reused for every download.
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        listener: Callable[[EngineEvent], None],
+        max_workers: int = 4,
+        use_processes: bool = False,
+        metrics_log: Optional[MetricsLog] = None,
+        cpu_workers: int = DEFAULT_CPU_WORKERS,
+        download_index: Optional[DownloadIndex] = None,
+        backend: str = BACKEND_SUBPROCESS,
+    ):
+        """
+        Start the worker pools and the event dispatcher.
+
+        Args:
+            base_dir: Application base directory containing bin/
+            listener: Called with every EngineEvent
+            max_workers: Maximum number of downloads running at once
+            use_processes: Use a ProcessPoolExecutor instead of threads
+            metrics_log: Optional log recording the metrics of every download
+            cpu_workers: Maximum number of post-processing jobs at once
+            download_index: Optional index recording every downloaded file
+            backend: One of BACKENDS; BACKEND_API always uses processes and
+                falls back to BACKEND_SUBPROCESS without the yt_dlp package
+        """
+        self.base_dir = base_dir
+        self.listener = listener
+        self.metrics_log = metrics_log
+        self.download_index = download_index
+        self.backend = resolve_backend(backend)
+        self._manager = None
+        self._cancel = None
+        self._executor: Executor
+        if use_processes or self.backend == BACKEND_API:
+            # Worker processes need a queue proxy they can pickle
+            self._manager = multiprocessing.Manager()
+            self._events = self._manager.Queue()
+            # Tells the workers to kill the yt-dlp processes they started
+            self._cancel = multiprocessing.Event()
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(self._cancel, self.backend == BACKEND_API),
+            )
+        else:
+            self._events = queue.Queue()
+            self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        # ffmpeg does the work, threads are enough to bound it
+        self._cpu_executor = ThreadPoolExecutor(
+            max_workers=max(1, cpu_workers), thread_name_prefix="post-process"
+        )
+
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def submit(
+        self, task: DownloadTask, key: int, cookie_file: Optional[str] = None
+    ) -> "Future[DownloadTask]":
+        """
+        Start a download.
+
+        Args:
+            task: Download task
+            key: Caller-defined identifier included in every event
+            cookie_file: Optional cookie file for authentication
+
+        Returns:
+            Future resolving to the finished task after post-processing
+        """
+        result: "Future[DownloadTask]" = Future()
+        download = self._executor.submit(
+            download_stage,
+            task,
+            self.base_dir,
+            cookie_file,
+            key,
+            self._events,
+            self.backend,
+        )
+        download.add_done_callback(
+            lambda future: self._post_process(future, key, result)
+        )
+        return result
+
+    def _post_process(
+        self, download: "Future", key: int, result: "Future[DownloadTask]"
+    ) -> None:
+        """
+        Start the second stage of a task whose download has ended.
+
+        Args:
+            download: Future of download_stage()
+            key: Caller-defined identifier included in every event
+            result: Future returned by submit()
+        """
+        # Runs on the pool's management thread with processes, so even
+        # verification alone (an ffmpeg probe) goes to the CPU pool
+        try:
+            task, metrics = download.result()
+            stage = self._cpu_executor.submit(
+                post_process_stage, task, metrics, self.base_dir, key, self._events
+            )
+        except BaseException as e:
+            # Cancelled, broken pool or engine shut down
+            result.set_exception(e)
+            return
+        stage.add_done_callback(lambda future: _copy_future(future, result))
+
+    def _dispatch(self) -> None:
+        """Pass queued events to the listener until shutdown."""
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            try:
+                if event.kind == EVENT_METRICS and self.metrics_log is not None:
+                    self.metrics_log.record(event.data)
+                if event.kind == EVENT_FINISHED and self.download_index is not None:
+                    self.download_index.record(event.data)
+                self.listener(event)
+            except Exception as e:
+                # A failing listener must not stop event delivery
+                print(f"Engine listener error: {e}", file=sys.stderr)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker pool and the dispatcher.
+
+        Args:
+            wait: Wait for running downloads to finish. Otherwise they are
+                killed and no further events are reported.
+        """
+        if not wait:
+            self._events.put(None)
+            terminate_downloads()
+            if self._cancel is not None:
+                self._cancel.set()
+            if self.backend == BACKEND_API:
+                # yt-dlp runs inside the workers, stop them instead
+                _terminate_workers(self._executor)
+        self._executor.shutdown(wait=wait)
+        self._cpu_executor.shutdown(wait=wait)
+        if wait:
+            self._events.put(None)
+            self._dispatcher.join()
+        if self._manager is not None:
+            self._manager.shutdown()
+
+
+def _terminate_workers(executor: Executor) -> None:
+    """Kill the worker processes of a ProcessPoolExecutor."""
+    processes = getattr(executor, "_processes", None) or {}
+    for process in list(processes.values()):
+        process.terminate()
+
+
+def _copy_future(source: "Future", target: "Future") -> None:
+    """Resolve ``target`` with the outcome of the finished ``source``."""
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def terminate_downloads() -> None:
+    """Kill the yt-dlp and ffmpeg processes running in this process."""
+    with _running_lock:
+        processes = list(_running_processes)
+    for process in processes:
+        if process.poll() is None:
+            process.kill()
+
+
+def iter_flat_entries(base_dir: str, url: str) -> Iterator[PlaylistEntry]:
+    """
+    Yield flat-playlist entries as yt-dlp.exe prints them.
+
+    yt-dlp prints only the fields of FLAT_ENTRY_TEMPLATE for each entry,
+    so there is little JSON to parse and nothing else is kept in memory.
+    Entries without a URL are skipped. The yt-dlp process is killed if
+    the caller stops iterating early.
+
+    Args:
+        base_dir: Application base directory containing bin/
+        url: Playlist or channel URL
+
+    Yields:
+        One entry per video
+
+    Raises:
+        subprocess.CalledProcessError: If yt-dlp exits with an error
+    """
+    cmd = [
+        get_yt_dlp_path(base_dir),
+        "--quiet",
+        "--flat-playlist",
+        "--lazy-playlist",
+        "--print",
+        FLAT_ENTRY_TEMPLATE,
+        url,
+    ]
+
+    # Collect stderr in a file so a chatty process cannot block on the pipe
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            text=True,
+            creationflags=creation_flags(),
+        )
+        try:
+            if process.stdout:
+                for line in process.stdout:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    entry = PlaylistEntry.from_json(data)
+                    if entry is not None:
+                        yield entry
+            process.wait()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+        if process.returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace")
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+
+
+def channel_listing_url(url: str, mode: str) -> str:
+    """
+    Append the /videos or /shorts tab to a channel URL.
+
+    Args:
+        url: Channel URL
+        mode: Download mode (Channel Videos/MP3 or Channel Shorts/MP3)
+
+    Returns:
+        URL of the channel tab to list
+    """
+    # Append appropriate suffix based on content type
+    suffix = "/videos" if "Videos" in mode else "/shorts"
+    if not url.lower().endswith(suffix):
+        url = url.rstrip("/") + suffix
+    return url
+
+
+def channel_entry_filter(mode: str) -> Callable[[PlaylistEntry], bool]:
+    """
+    Get the filter that keeps either shorts or regular videos.
+
+    Args:
+        mode: Download mode (Channel Videos/MP3 or Channel Shorts/MP3)
+
+    Returns:
+        Function returning True for entries matching the mode
+    """
+    shorts = "Shorts" in mode
+
+    # Filter entries based on content type
+    def keep(entry: PlaylistEntry) -> bool:
+        return entry.is_short == shorts
+
+    return keep
+
+
+def get_archive_path(base_dir: str, url: str) -> str:
+    """
+    Get the path of the download archive for a channel tab.
+
+    Args:
+        base_dir: Application base directory
+        url: Channel tab URL (ending in /videos or /shorts)
+
+    Returns:
+        Path of the yt-dlp download archive file
+    """
+    digest = hashlib.sha1(listing_cache_key(url).encode("utf-8")).hexdigest()
+    return os.path.join(base_dir, "data", "archives", f"{digest[:16]}.txt")
+
+
+def read_archive_ids(archive_path: str) -> Set[str]:
+    """
+    Read the video IDs recorded in a yt-dlp download archive.
+
+    Args:
+        archive_path: Path of the archive file
+
+    Returns:
+        Set of video IDs (empty if the archive does not exist yet)
+    """
+    ids: Set[str] = set()
+    try:
+        with open(archive_path, "r", encoding="utf-8") as f:
+            for line in f:
+                # Archive lines look like "youtube <video id>"
+                parts = line.split()
+                if len(parts) == 2:
+                    ids.add(parts[1])
+    except FileNotFoundError:
+        pass
+    return ids
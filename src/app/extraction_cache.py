@@ -0,0 +1,154 @@
+"""
+On-disk cache for playlist and channel listings.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+
+def listing_cache_key(url: str) -> str:
+    """
+    Build the cache key for a playlist or channel URL.
+
+    Playlists are keyed by their list ID so watch and playlist URLs share
+    an entry. Other URLs are normalized by lower-casing the scheme and host,
+    dropping the "www."/"m." prefix, the query string, the fragment and any
+    trailing slash.
+
+    Args:
+        url: Playlist or channel URL (channel URLs already end in
+            /videos or /shorts)
+
+    Returns:
+        Normalized cache key
+    """
+    parts = urlsplit(url.strip())
+
+    list_id = parse_qs(parts.query).get("list")
+    if list_id:
+        return f"playlist:{list_id[0]}"
+
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix) :]
+
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower() or "https", host, path, "", ""))
+
+
+class ExtractionCache:
+    """
+    Persistent cache of flat-extraction results with TTL and LRU eviction.
+
+    Listings are stored as (video_url, title) pairs in a small SQLite
+    database. Entries older than ``ttl`` seconds are ignored and removed,
+    and only the ``max_entries`` most recently used listings are kept.
+    """
+
+    def __init__(self, db_path: str, ttl: float = 3600, max_entries: int = 100):
+        """
+        Initialize the cache. The database is created on first use.
+
+        Args:
+            db_path: Path to the SQLite database file
+            ttl: Maximum age of a cached listing in seconds
+            max_entries: Maximum number of listings kept
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating it if needed."""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        if not self._initialized:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS listings ("
+                "key TEXT PRIMARY KEY, "
+                "created REAL NOT NULL, "
+                "accessed REAL NOT NULL, "
+                "entries TEXT NOT NULL)"
+            )
+            self._initialized = True
+        return conn
+
+    def get(self, key: str) -> Optional[List[Tuple[str, str]]]:
+        """
+        Look up a cached listing.
+
+        Args:
+            key: Cache key from listing_cache_key()
+
+        Returns:
+            List of (video_url, title) tuples, or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT created, entries FROM listings WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is None:
+                        return None
+                    if now - row[0] > self.ttl:
+                        conn.execute("DELETE FROM listings WHERE key = ?", (key,))
+                        return None
+                    conn.execute(
+                        "UPDATE listings SET accessed = ? WHERE key = ?", (now, key)
+                    )
+            finally:
+                conn.close()
+
+        return [(video_url, title) for video_url, title in json.loads(row[1])]
+
+    def put(self, key: str, entries: List[Tuple[str, str]]) -> None:
+        """
+        Store a listing, evicting the least recently used ones over the cap.
+
+        Args:
+            key: Cache key from listing_cache_key()
+            entries: List of (video_url, title) tuples
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?)",
+                        (key, now, now, json.dumps(entries)),
+                    )
+                    conn.execute(
+                        "DELETE FROM listings WHERE key NOT IN ("
+                        "SELECT key FROM listings ORDER BY accessed DESC LIMIT ?)",
+                        (self.max_entries,),
+                    )
+            finally:
+                conn.close()
+
+    def invalidate(self, key: str) -> None:
+        """
+        Remove a cached listing.
+
+        Args:
+            key: Cache key from listing_cache_key()
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM listings WHERE key = ?", (key,))
+            finally:
+                conn.close()
@@ -0,0 +1,249 @@
+"""
+Small HTTP client with persistent connections for the application's own
+requests (GitHub release checks and yt-dlp downloads).
+
+urllib.request opens a new connection, and for HTTPS a new TLS session,
+for every request. HttpClient keeps idle connections per host and reuses
+them, shares one SSL context, applies a timeout to every socket operation
+and follows redirects. Only the standard library is used.
+"""
+
+import http.client
+import json
+import ssl
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+# Seconds to wait for a connection or for data on it
+DEFAULT_TIMEOUT = 15.0
+
+# Idle connections kept per host
+MAX_IDLE_CONNECTIONS = 4
+
+# Redirects followed per request
+MAX_REDIRECTS = 5
+
+# Sent with every request; GitHub's API rejects requests without one
+USER_AGENT = "yt-downloader-gui/1.0.0"
+
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+# Errors of a kept-alive connection the server closed in the meantime
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+_HostKey = Tuple[str, str, Optional[int]]
+
+
+class HttpError(OSError):
+    """Raised for responses with an error status (400 and above)."""
+
+    def __init__(self, status: int, reason: str, url: str):
+        """
+        Initialize the error.
+
+        Args:
+            status: HTTP status code
+            reason: Reason phrase sent by the server
+            url: Requested URL
+        """
+        super().__init__(f"HTTP Error {status}: {reason} ({url})")
+        self.status = status
+        self.reason = reason
+        self.url = url
+
+
+class HttpResponse:
+    """
+    Response read from a pooled connection.
+
+    The connection goes back to the pool once the body has been read
+    completely and the response is closed; a response closed early closes
+    its connection instead. Use it as a context manager.
+    """
+
+    def __init__(
+        self,
+        client: "HttpClient",
+        key: _HostKey,
+        connection: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+        url: str,
+    ):
+        """
+        Initialize the response.
+
+        Args:
+            client: Client owning the connection pool
+            key: Pool key of the connection
+            connection: Connection the response is read from
+            response: Response of the last request on the connection
+            url: Final URL after redirects
+        """
+        self._client = client
+        self._key = key
+        self._connection: Optional[http.client.HTTPConnection] = connection
+        self._response = response
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        """Read up to ``amt`` bytes of the body, or all of it."""
+        return self._response.read(amt)
+
+    def json(self) -> Any:
+        """Read the body and decode it as JSON."""
+        return json.loads(self.read().decode("utf-8"))
+
+    def close(self) -> None:
+        """Release the connection, returning it to the pool if possible."""
+        if self._connection is None:
+            return
+        reusable = self._response.isclosed() and not self._response.will_close
+        if not reusable:
+            self._response.close()
+        self._client._release(self._key, self._connection, reusable)
+        self._connection = None
+
+    def __enter__(self) -> "HttpResponse":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class HttpClient:
+    """
+    Thread-safe HTTP/1.1 client reusing keep-alive connections.
+
+    Responses with status 400 and above raise HttpError; other statuses,
+    including 304 Not Modified for conditional requests, are returned.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Initialize the client.
+
+        Args:
+            timeout: Seconds to wait for a connection or for data on it
+        """
+        self.timeout = timeout
+        self._ssl_context = ssl.create_default_context()
+        self._lock = threading.Lock()
+        self._idle: Dict[_HostKey, List[http.client.HTTPConnection]] = {}
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        """
+        Send a GET request, following redirects.
+
+        Args:
+            url: Absolute http or https URL
+            headers: Additional request headers
+
+        Returns:
+            Response whose body has not been read yet
+
+        Raises:
+            HttpError: If the server answers with an error status
+            OSError: If the connection fails or times out
+        """
+        request_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "identity"}
+        request_headers.update(headers or {})
+
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send(url, request_headers)
+            location = response.headers.get("Location")
+            if response.status not in _REDIRECT_STATUSES or not location:
+                break
+            # Drain the redirect body so the connection can be reused
+            with response:
+                response.read()
+            url = urljoin(url, location)
+        else:
+            raise HttpError(response.status, "Too many redirects", url)
+
+        if response.status >= 400:
+            with response:
+                response.read()
+            raise HttpError(response.status, response.reason, url)
+        return response
+
+    def _send(self, url: str, headers: Dict[str, str]) -> HttpResponse:
+        """Send one request, retrying when a kept-alive connection went stale."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        while True:
+            connection, reused = self._acquire(key)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            return HttpResponse(self, key, connection, response, url)
+
+    def _acquire(self, key: _HostKey) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return an idle connection to a host or a new one, and if it is reused."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+
+        scheme, host, port = key
+        if scheme == "https":
+            connection: http.client.HTTPConnection = http.client.HTTPSConnection(
+                host, port, timeout=self.timeout, context=self._ssl_context
+            )
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        return connection, False
+
+    def _release(
+        self, key: _HostKey, connection: http.client.HTTPConnection, reusable: bool
+    ) -> None:
+        """Put a connection back into the pool or close it."""
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < MAX_IDLE_CONNECTIONS:
+                    idle.append(connection)
+                    return
+        connection.close()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+
+def shared_client() -> HttpClient:
+    """Return the client shared by all requests of the application."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
@@ -0,0 +1,192 @@
+"""
+Dialog for importing many URLs at once.
+"""
+
+import os
+from typing import List, Optional
+
+from PyQt6.QtCore import QMimeData, QTimer
+from PyQt6.QtGui import QDragEnterEvent, QDropEvent
+from PyQt6.QtWidgets import (
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QLabel,
+    QPlainTextEdit,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+from .url_import import (
+    URL_CHANNEL,
+    URL_PLAYLIST,
+    URL_VIDEO,
+    collect_urls,
+    count_types,
+    read_url_file,
+    split_urls,
+)
+
+# File types offered by "Load File..." and accepted by drag and drop
+URL_FILE_EXTENSIONS = (".txt", ".csv")
+
+# Delay in milliseconds before the URL count is updated after typing
+SUMMARY_DELAY_MS = 300
+
+
+def dropped_text(mime: QMimeData) -> str:
+    """
+    Get the URLs from dropped or pasted data.
+
+    Dropped .txt and .csv files are read, links dragged from a browser
+    are used as they are.
+
+    Args:
+        mime: Data of the drop event
+
+    Returns:
+        Text with one URL or file content per line
+    """
+    parts: List[str] = []
+    if mime.hasUrls():
+        for url in mime.urls():
+            if url.isLocalFile():
+                path = url.toLocalFile()
+                if path.lower().endswith(URL_FILE_EXTENSIONS):
+                    try:
+                        parts.append(read_url_file(path))
+                    except OSError:
+                        pass
+            else:
+                parts.append(url.toString())
+    elif mime.hasText():
+        parts.append(mime.text())
+    return "\n".join(parts)
+
+
+class UrlImportDialog(QDialog):
+    """
+    Dialog collecting URLs from pasted text, files and drag and drop.
+
+    Shows how many videos, playlists and channels were recognized while
+    the text changes; the import itself runs after the dialog is accepted.
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        """
+        Initialize the dialog.
+
+        Args:
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Import URLs")
+        self.resize(600, 400)
+        self.setAcceptDrops(True)
+
+        dlg_layout = QVBoxLayout(self)
+
+        info = QLabel(
+            "Paste video, playlist or channel URLs (one per line), load a "
+            ".txt or .csv file, or drop files or links here."
+        )
+        info.setWordWrap(True)
+        dlg_layout.addWidget(info)
+
+        # Drops are handled by the dialog, so dropped files are read
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setAcceptDrops(False)
+        self.text_edit.setPlaceholderText("https://www.youtube.com/watch?v=...")
+        dlg_layout.addWidget(self.text_edit)
+
+        self.summary_label = QLabel("No URLs yet")
+        self.summary_label.setStyleSheet("font-weight: bold;")
+        dlg_layout.addWidget(self.summary_label)
+
+        # Counting runs once typing or pasting pauses
+        self._summary_timer = QTimer(self)
+        self._summary_timer.setSingleShot(True)
+        self._summary_timer.setInterval(SUMMARY_DELAY_MS)
+        self._summary_timer.timeout.connect(self._update_summary)
+        self.text_edit.textChanged.connect(self._summary_timer.start)
+
+        button_layout = QHBoxLayout()
+
+        load_btn = QPushButton("Load File...")
+        load_btn.clicked.connect(self._load_file)
+        button_layout.addWidget(load_btn)
+
+        button_layout.addStretch()
+
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+
+        self.import_btn = QPushButton("Import")
+        self.import_btn.setStyleSheet("font-weight: bold;")
+        self.import_btn.setEnabled(False)
+        self.import_btn.clicked.connect(self.accept)
+        button_layout.addWidget(self.import_btn)
+
+        dlg_layout.addLayout(button_layout)
+
+    def text(self) -> str:
+        """Return the entered text."""
+        return self.text_edit.toPlainText()
+
+    def append_text(self, text: str) -> None:
+        """
+        Add text below the current contents.
+
+        Args:
+            text: URLs or file contents
+        """
+        if not text.strip():
+            return
+        current = self.text().rstrip("\n")
+        self.text_edit.setPlainText(f"{current}\n{text}" if current else text)
+        self._update_summary()
+
+    def _load_file(self) -> None:
+        """Ask for a .txt or .csv file and add its URLs."""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load URLs", "", "URL lists (*.txt *.csv);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            self.append_text(read_url_file(path))
+        except OSError as e:
+            self.summary_label.setText(f"Cannot read {os.path.basename(path)}: {e}")
+
+    def _update_summary(self) -> None:
+        """Show how many unique URLs of each type the text contains."""
+        self._summary_timer.stop()
+        urls, duplicates, invalid = collect_urls(split_urls(self.text()))
+        counts = count_types(urls)
+
+        if urls:
+            summary = (
+                f"{counts[URL_VIDEO]} videos, {counts[URL_PLAYLIST]} playlists, "
+                f"{counts[URL_CHANNEL]} channels"
+            )
+        else:
+            summary = "No URLs yet"
+        if duplicates:
+            summary += f" ({duplicates} duplicates)"
+        if invalid:
+            summary += f", {len(invalid)} not YouTube URLs"
+        self.summary_label.setText(summary)
+        self.import_btn.setEnabled(bool(urls))
+
+    def dragEnterEvent(self, event: QDragEnterEvent) -> None:
+        """Accept dropped files, links and text."""
+        mime = event.mimeData()
+        if mime.hasUrls() or mime.hasText():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event: QDropEvent) -> None:
+        """Add the URLs of dropped files, links or text."""
+        self.append_text(dropped_text(event.mimeData()))
+        event.acceptProposedAction()
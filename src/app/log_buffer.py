@@ -0,0 +1,90 @@
+"""
+Buffered, thread-safe log sink for the activity panel.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Maximum number of lines kept in the activity log
+MAX_LOG_LINES = 5000
+
+# Matches yt-dlp progress lines such as "[download]  42.1% of 10.00MiB"
+PROGRESS_LINE_RE = re.compile(r"^\[download\]\s+[0-9.]+%")
+
+
+class LogBuffer:
+    """
+    Collects log messages from any thread until the GUI flushes them.
+
+    Regular messages are queued in a bounded ring buffer. Progress lines
+    from the same worker slot replace each other, so only the latest
+    progress of every running download is shown as a "live" line.
+    """
+
+    def __init__(self, max_lines: int = MAX_LOG_LINES):
+        """
+        Initialize the buffer.
+
+        Args:
+            max_lines: Maximum number of pending lines kept between flushes
+        """
+        self._lock = threading.Lock()
+        self._lines: Deque[str] = deque(maxlen=max_lines)
+        self._live: Dict[int, str] = {}
+        self._changed = False
+
+    def push(self, msg: str, slot: Optional[int] = None) -> None:
+        """
+        Add a message to the buffer.
+
+        Args:
+            msg: Message to log
+            slot: Worker slot the message comes from, if any
+        """
+        line = f"[{time.strftime('%H:%M:%S')}] {msg}"
+        with self._lock:
+            if slot is not None and PROGRESS_LINE_RE.match(msg):
+                self._live[slot] = line
+            else:
+                # Any other output from a download ends its live progress line
+                if slot is not None:
+                    self._live.pop(slot, None)
+                self._lines.append(line)
+            self._changed = True
+
+    def end_progress(self, slot: int) -> None:
+        """
+        Drop the live progress line of a finished download.
+
+        Args:
+            slot: Worker slot whose download has finished
+        """
+        with self._lock:
+            if self._live.pop(slot, None) is not None:
+                self._changed = True
+
+    def drain(self) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        Take all pending messages.
+
+        Returns:
+            Tuple of (new_lines, live_lines), or None if nothing changed
+            since the last call. live_lines holds the current progress line
+            of each active slot, ordered by slot.
+        """
+        with self._lock:
+            if not self._changed:
+                return None
+            lines = list(self._lines)
+            self._lines.clear()
+            live = [self._live[slot] for slot in sorted(self._live)]
+            self._changed = False
+        return lines, live
+
+    @staticmethod
+    def is_progress_line(msg: str) -> bool:
+        """Return True if the message is a yt-dlp progress line."""
+        return PROGRESS_LINE_RE.match(msg) is not None
@@ -5,7 +5,7 @@ Main GUI application class for yt-downloader-gui YouTube downloader.
 import os
 import sys
 import threading
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from PyQt6.QtWidgets import (
     QMainWindow,
@@ -15,18 +15,41 @@ from PyQt6.QtWidgets import (
     QComboBox,
     QLabel,
     QProgressBar,
-    QTextEdit,
+    QPlainTextEdit,
     QWidget,
     QStackedWidget,
     QStatusBar,
+    QSpinBox,
+    QCheckBox,
 )
 from PyQt6.QtCore import pyqtSignal, QTimer
-from PyQt6.QtGui import QPixmap, QIcon
+from PyQt6.QtGui import (
+    QCloseEvent,
+    QDragEnterEvent,
+    QDropEvent,
+    QIcon,
+    QTextCursor,
+)
 
-from .updater import Updater
-from .login_manager import LoginManager
 from .ui_manager import UIManager
 from .download_manager import DownloadManager
+from .engine import BACKEND_SUBPROCESS
+from .tasks import DownloadTask
+from .queue_store import QueueStore
+from .download_index import DownloadIndex
+from .log_buffer import LogBuffer
+from .metrics import format_summary
+from .progress import ProgressEvent, STAGE_DOWNLOAD, format_bytes
+
+if TYPE_CHECKING:
+    from .login_manager import LoginManager
+    from .updater import Updater
+
+# Interval in milliseconds at which buffered log messages are displayed
+LOG_FLUSH_MS = 100
+
+# Delay in milliseconds before the background yt-dlp update check starts
+UPDATE_CHECK_DELAY_MS = 2000
 
 
 class YTDGUI(QMainWindow):
@@ -39,9 +62,12 @@ class YTDGUI(QMainWindow):
 
     # Custom signals for thread-safe GUI updates
     updateStatusSignal = pyqtSignal(str)
-    logMessageSignal = pyqtSignal(str)
     updateProgressSignal = pyqtSignal(int)
-    downloadErrorSignal = pyqtSignal(object)
+    updateSlotProgressSignal = pyqtSignal(int, int)
+    updateSlotLabelSignal = pyqtSignal(int, str)
+    progressEventSignal = pyqtSignal(int, object)
+    downloadErrorSignal = pyqtSignal(str)
+    updateFinishedSignal = pyqtSignal()
 
     # UI elements (dynamically added by UIManager)
     url_entry: QLineEdit
@@ -50,9 +76,14 @@ class YTDGUI(QMainWindow):
     video_quality_label: QLabel
     video_quality_combo: QComboBox
     progress_bar: QProgressBar
-    log_text: QTextEdit
+    slot_progress_bars: List[QProgressBar]
+    concurrency_spin: QSpinBox
+    refresh_listing_check: QCheckBox
+    sync_channel_check: QCheckBox
+    log_text: QPlainTextEdit
     queue_status_label: QLabel
-    video_favicon_pixmap: Optional[QPixmap]
+    throughput_label: QLabel
+    metrics_label: QLabel
     icons: Dict[str, QIcon]
     sidebar: QWidget
     stack: QStackedWidget
@@ -75,18 +106,22 @@ class YTDGUI(QMainWindow):
         self.resize(800, 600)
         self.base_dir = base_dir
 
-        # Initialize manager components
-        self.updater = Updater(self.base_dir, parent=self)
-        self.login_manager = LoginManager(self)
+        # Dropped files and links open the URL import
+        self.setAcceptDrops(True)
+
+        # Initialize application state, read by the managers
+        self._initialize_state()
+
+        # Initialize manager components; the updater and login manager are
+        # only needed after startup and are created on first use
+        self._updater: Optional["Updater"] = None
+        self._login_manager: Optional["LoginManager"] = None
         self.ui_manager = UIManager(self)
         self.download_manager = DownloadManager(self)
 
         # Set application icon
         self.ui_manager._set_window_icon()
 
-        # Initialize application state
-        self._initialize_state()
-
         # Load UI icons
         self.ui_manager._load_icons()
 
@@ -99,14 +134,61 @@ class YTDGUI(QMainWindow):
         # Initial status
         self.update_status("Ready")
 
-        # Check for updates on startup (delayed to allow UI to render)
-        QTimer.singleShot(100, self.check_for_updates)
+        # Check for updates in the background once the window is shown
+        QTimer.singleShot(UPDATE_CHECK_DELAY_MS, self.check_for_updates)
+
+    @property
+    def updater(self) -> "Updater":
+        """Updater for the yt-dlp binary, created on first use."""
+        if self._updater is None:
+            from .updater import Updater
+
+            self._updater = Updater(self.base_dir, parent=self)
+        return self._updater
+
+    @property
+    def login_manager(self) -> "LoginManager":
+        """Manager for cookie-based login, created on first use."""
+        if self._login_manager is None:
+            from .login_manager import LoginManager
+
+            self._login_manager = LoginManager(self)
+        return self._login_manager
 
     def _initialize_state(self) -> None:
         """Initialize application state variables."""
-        # Download management
-        self.download_queue: List[Dict[str, Any]] = []
-        self.downloading = False
+        # Activity log, filled from any thread and flushed by a timer
+        self.log_buffer = LogBuffer()
+        self._live_log_lines = 0
+
+        # Download management, the queue survives restarts and crashes
+        self.download_queue = QueueStore(
+            os.path.join(self.base_dir, "data", "queue.db")
+        )
+        if self.download_queue.resume():
+            # Start resumed tasks once the UI is up
+            QTimer.singleShot(0, self._resume_queue)
+        self.active_downloads: Dict[int, DownloadTask] = {}
+
+        # Finished downloads, checked before videos are queued again
+        self.download_index = DownloadIndex(
+            os.path.join(self.base_dir, "data", "downloads.db")
+        )
+        self.max_concurrent_downloads = 3
+        self.adaptive_concurrency = False
+        self.ytdlp_backend = BACKEND_SUBPROCESS
+        self.rate_limit: Optional[int] = None
+        self.slot_progress: Dict[int, int] = {}
+        self.slot_speeds: Dict[int, float] = {}
+        self.slot_titles: Dict[int, str] = {}
+        self.metrics_summary: Optional[Dict[str, Any]] = None
+
+        # Set while the background yt-dlp update runs; no download starts
+        # meanwhile, so bin/yt-dlp.exe is never replaced while in use
+        self.update_running = False
+
+        # force argument of an update waiting for the downloads to finish
+        self._deferred_update: Optional[bool] = None
 
         # Audio settings
         self.audio_quality_default = "320"
@@ -116,75 +198,110 @@ class YTDGUI(QMainWindow):
         self.cookie_browser = "chrome"
         self.cookie_file: Optional[str] = None
 
+    def _resume_queue(self) -> None:
+        """Continue downloading tasks left in the queue by the last session."""
+        self.log_message(
+            f"Resuming {len(self.download_queue)} queued downloads from last session"
+        )
+        self.download_manager.process_queue()
+
     def _connect_signals(self) -> None:
         """Connect Qt signals for thread-safe GUI updates."""
+        # Buffered log messages are written to the widget every LOG_FLUSH_MS
+        self.log_flush_timer = QTimer(self)
+        self.log_flush_timer.timeout.connect(self._flush_log)
+        self.log_flush_timer.start(LOG_FLUSH_MS)
+
         self.updateStatusSignal.connect(self._update_status)
-        self.logMessageSignal.connect(self._log_message)
         self.updateProgressSignal.connect(self._update_progress)
+        self.updateSlotProgressSignal.connect(self._update_slot_progress)
+        self.updateSlotLabelSignal.connect(self._update_slot_label)
+        self.progressEventSignal.connect(self._on_progress_event)
         self.downloadErrorSignal.connect(self._show_download_error_slot)
-        self.download_manager.signals.result.connect(self.on_playlist_result)
-        self.download_manager.signals.error.connect(self.on_playlist_error)
-
-    def on_playlist_result(self, result):
-        entries, save_path, mode, title = result
-        self.download_manager._show_video_selection_dialog(
-            entries, save_path, mode, title
-        )
+        self.updateFinishedSignal.connect(self.download_manager.process_queue)
 
-    def on_playlist_error(self, error_info):
-        exctype, value = error_info
-        QMessageBox.critical(
-            self, "Error", f"Failed to extract playlist information: {value}"
-        )
-
-    def check_for_updates(self) -> None:
+    def check_for_updates(self, force: bool = False) -> None:
         """
-        Prompt user to check for yt-dlp updates on application startup.
+        Update yt-dlp in a background thread.
 
-        This runs automatically when the application starts and gives the user
-        the option to update yt-dlp to the latest version.
-        """
-        reply = QMessageBox.question(
-            self,
-            "Check for Updates",
-            "Do you want to check for a new version of yt-dlp?",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-        )
+        Runs at startup without asking; the updater skips the check if the
+        last one was recent and the download if yt-dlp is up to date.
 
-        if reply == QMessageBox.StandardButton.Yes:
-            # Switch to activity page to show update progress
+        Args:
+            force: Check now even if the last check was recent (Help menu)
+        """
+        if self.update_running:
+            return
+        if not force and not self.updater.check_due():
+            return
+        if self.download_manager.is_busy():
+            # The executable cannot be replaced while downloads run it
+            if force:
+                self.log_message(
+                    "yt-dlp will be updated when the running downloads finish."
+                )
+            self._deferred_update = bool(force or self._deferred_update)
+            return
+        self._deferred_update = None
+        self.update_running = True
+        if force:
+            # Show the update progress
             self.ui_manager.switch_page("Activity")
-            # Run update in background thread
-            threading.Thread(target=self.run_updates, daemon=True).start()
+        threading.Thread(target=self.run_updates, args=(force,), daemon=True).start()
 
-    def run_updates(self) -> None:
+    def run_updates(self, force: bool = False) -> None:
         """
         Execute yt-dlp update process in background thread.
 
         This method runs in a separate thread to avoid blocking the UI
-        during the update process.
+        during the update process. Errors of the automatic check are only
+        logged; a forced check also shows them in a dialog.
+
+        Args:
+            force: Check even if the last check was recent
         """
 
         def progress_callback(msg: str) -> None:
             """Callback function to report update progress."""
             self.log_message(msg)
 
-        self.log_message("Starting yt-dlp update...")
+        last_percent = [-1]
+
+        def bytes_callback(done: int, total: int) -> None:
+            """Show the download progress in the status bar."""
+            percent = done * 100 // total if total else 0
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                size = f" of {format_bytes(total)}" if total else ""
+                self.update_status(f"Updating yt-dlp: {format_bytes(done)}{size}")
+
+        self.log_message("Checking for yt-dlp updates...")
 
         try:
-            self.updater.download_yt(progress_callback)
-            self.log_message("yt-dlp update completed successfully.")
+            if self.updater.update_yt(progress_callback, bytes_callback, force):
+                self.log_message("yt-dlp update completed successfully.")
+                self.update_status("yt-dlp updated")
         except Exception as e:
             error_msg = f"Update error: {e}"
             self.log_message(error_msg)
 
-            # Show error dialog in main thread
-            QTimer.singleShot(
-                0,
-                lambda e=e: QMessageBox.critical(
-                    self, "Updater", f"Error during yt-dlp update: {e}"
-                ),
-            )
+            if force:
+                # Show error dialog in main thread
+                QTimer.singleShot(
+                    0,
+                    lambda e=e: QMessageBox.critical(
+                        self, "Updater", f"Error during yt-dlp update: {e}"
+                    ),
+                )
+        finally:
+            self.update_running = False
+            # Start the downloads that were queued meanwhile
+            self.updateFinishedSignal.emit()
+
+    def start_deferred_update(self) -> None:
+        """Run an update that waited for the downloads to finish."""
+        if self._deferred_update is not None:
+            self.check_for_updates(self._deferred_update)
 
     def select_save_path(self) -> None:
         """Open folder selection dialog for download location."""
@@ -212,33 +329,181 @@ class YTDGUI(QMainWindow):
         if hasattr(self, "progress_bar"):
             self.progress_bar.setValue(value)
 
-    def log_message(self, msg: str) -> None:
+    def _update_slot_progress(self, slot: int, value: int) -> None:
+        """
+        Internal method to update a worker slot's progress in main thread.
+
+        The overall progress bar shows the average of all active slots.
+        """
+        if slot in self.active_downloads:
+            self.slot_progress[slot] = value
+        else:
+            self.slot_progress.pop(slot, None)
+            self.slot_speeds.pop(slot, None)
+            self._update_throughput()
+
+        if hasattr(self, "slot_progress_bars") and slot < len(self.slot_progress_bars):
+            self.slot_progress_bars[slot].setValue(value)
+
+        if self.slot_progress:
+            overall = sum(self.slot_progress.values()) // len(self.slot_progress)
+        else:
+            overall = 0
+        self._update_progress(overall)
+
+    def _on_progress_event(self, slot: int, event: ProgressEvent) -> None:
+        """
+        Internal method to apply a structured progress event in main thread.
+
+        Args:
+            slot: Worker slot the event comes from
+            event: Parsed yt-dlp progress
+        """
+        if event.stage == STAGE_DOWNLOAD:
+            self.slot_speeds[slot] = event.speed or 0.0
+        else:
+            # Post-processing uses the CPU, not the network
+            self.slot_speeds[slot] = 0.0
+            title = self.slot_titles.get(slot, "")
+            self._update_slot_label(slot, f"{title} [{event.stage}]", remember=False)
+
+        if event.percent is not None:
+            self._update_slot_progress(slot, int(event.percent))
+        self._update_throughput()
+
+    def _update_throughput(self) -> None:
+        """Internal method to show the combined download speed."""
+        if not hasattr(self, "throughput_label"):
+            return
+        total = sum(self.slot_speeds.values())
+        if total:
+            self.throughput_label.setText(f"Speed: {format_bytes(total)}/s")
+        else:
+            self.throughput_label.setText("Speed: -")
+
+    def update_metrics_summary(self, summary: Dict[str, Any]) -> None:
+        """
+        Show the summary of recent download metrics on the Activity page.
+
+        Args:
+            summary: Summary from MetricsLog.summary()
+        """
+        self.metrics_summary = summary
+        if hasattr(self, "metrics_label"):
+            parts = format_summary(summary)
+            if parts:
+                self.metrics_label.setText(" | ".join(parts))
+
+    def refresh_activity_page(self) -> None:
+        """Show the current download state on a newly created Activity page."""
+        for slot, title in self.slot_titles.items():
+            self._update_slot_label(slot, title, remember=False)
+        for slot, value in list(self.slot_progress.items()):
+            self._update_slot_progress(slot, value)
+        self._update_throughput()
+        if self.metrics_summary:
+            self.update_metrics_summary(self.metrics_summary)
+        self.download_manager.update_queue_status()
+        self._flush_log()
+
+    def _update_slot_label(self, slot: int, text: str, remember: bool = True) -> None:
+        """Internal method to show what a worker slot is downloading."""
+        if remember:
+            self.slot_titles[slot] = text
+        if hasattr(self, "slot_progress_bars") and slot < len(self.slot_progress_bars):
+            # Escape '%' so Qt does not treat it as a format placeholder
+            label = text.replace("%", "%%")
+            self.slot_progress_bars[slot].setFormat(f"{slot + 1}: {label} - %p%")
+
+    def log_message(self, msg: str, slot: Optional[int] = None) -> None:
         """
         Log message to activity panel and console (thread-safe).
 
+        Messages are buffered and written to the log widget by a timer, so
+        frequent progress output does not flood the GUI thread.
+
         Args:
             msg: Message to log
+            slot: Worker slot the message comes from; progress lines of the
+                same slot replace each other instead of piling up
         """
-        self.logMessageSignal.emit(msg)
-        print(f"[yt-downloader-gui] {msg}")  # Also log to console
+        self.log_buffer.push(msg, slot)
+        if not LogBuffer.is_progress_line(msg):
+            print(f"[yt-downloader-gui] {msg}")  # Also log to console
+
+    def _flush_log(self) -> None:
+        """Internal method to write buffered messages to the log widget."""
+        if not hasattr(self, "log_text"):
+            return
+        pending = self.log_buffer.drain()
+        if pending is None:
+            return
+        lines, live = pending
+
+        # Live progress lines always sit at the end of the log, replace them
+        self._remove_live_log_lines()
+        if lines:
+            self.log_text.appendPlainText("\n".join(lines))
+        if live:
+            self.log_text.appendPlainText("\n".join(live))
+        self._live_log_lines = len(live)
+
+    def _remove_live_log_lines(self) -> None:
+        """Remove the live progress lines from the end of the log widget."""
+        count = self._live_log_lines
+        self._live_log_lines = 0
+        if not count:
+            return
+
+        document = self.log_text.document()
+        if document.blockCount() <= count:
+            self.log_text.clear()
+            return
+
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.movePosition(
+            QTextCursor.MoveOperation.PreviousBlock,
+            QTextCursor.MoveMode.KeepAnchor,
+            count,
+        )
+        cursor.movePosition(
+            QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor
+        )
+        cursor.removeSelectedText()
 
-    def _log_message(self, msg: str) -> None:
-        """Internal method to add message to log widget in main thread."""
+    def clear_log(self) -> None:
+        """Clear the activity log."""
+        self._live_log_lines = 0
         if hasattr(self, "log_text"):
-            # Add timestamp for better logging
-            from datetime import datetime
+            self.log_text.clear()
 
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            formatted_msg = f"[{timestamp}] {msg}"
-            self.log_text.append(formatted_msg)
-
-    # Add this method to the YTDGUI class in main_window.py
-
-    def _show_download_error_slot(self, error: Exception) -> None:
+    def _show_download_error_slot(self, error: str) -> None:
         """
         Slot method to show download error dialog safely in main thread.
 
         Args:
-            error: Exception that occurred during download
+            error: Error message of the failed download
         """
         self.download_manager._show_download_error(error)
+
+    def dragEnterEvent(self, event: QDragEnterEvent) -> None:
+        """Accept dropped URL files, links and text."""
+        mime = event.mimeData()
+        if mime.hasUrls() or mime.hasText():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event: QDropEvent) -> None:
+        """Open the URL import with the dropped files, links or text."""
+        from .import_dialog import dropped_text
+
+        text = dropped_text(event.mimeData())
+        event.acceptProposedAction()
+        if text.strip():
+            # Open the dialog after the drop has finished
+            QTimer.singleShot(0, lambda: self.download_manager.open_import_dialog(text))
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """Stop running downloads before the window closes."""
+        self.download_manager.shutdown()
+        super().closeEvent(event)
@@ -0,0 +1,357 @@
+"""
+Per-download timing, throughput and resource metrics.
+
+Metrics are appended to a JSON lines file and can also be written as a
+Prometheus text file. CPU and memory sampling of the yt-dlp process tree
+needs the optional ``psutil`` package and is skipped without it.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - optional dependency
+    psutil = None
+
+from .progress import STAGE_DOWNLOAD, ProgressEvent, format_bytes
+
+# Phases recorded for every download, in order
+PHASE_SPAWN = "spawn"
+PHASE_METADATA = "metadata"
+PHASE_FIRST_BYTE = "first_byte"
+PHASE_DOWNLOAD_DONE = "download_done"
+PHASE_FINISHED = "finished"
+PHASES = [
+    PHASE_SPAWN,
+    PHASE_METADATA,
+    PHASE_FIRST_BYTE,
+    PHASE_DOWNLOAD_DONE,
+    PHASE_FINISHED,
+]
+
+# Interval in seconds between CPU/RSS samples of a running download
+SAMPLE_INTERVAL = 0.5
+
+# Number of recent downloads included in the summary
+SUMMARY_WINDOW = 20
+
+
+class TaskMetrics:
+    """Timings and resource usage of a single download."""
+
+    __slots__ = (
+        "url",
+        "mode",
+        "title",
+        "started",
+        "phases",
+        "bytes",
+        "cpu_seconds",
+        "peak_rss",
+        "success",
+        "error",
+        "_clock",
+        "_file_bytes",
+        "_completed_bytes",
+    )
+
+    def __init__(self, url: str, mode: str, title: Optional[str] = None):
+        """
+        Start measuring a download.
+
+        Args:
+            url: Video URL
+            mode: Download mode
+            title: Video title, if known
+        """
+        self.url = url
+        self.mode = mode
+        self.title = title
+        self.started = time.time()
+        self.phases: Dict[str, float] = {}
+        self.bytes = 0
+        self.cpu_seconds: Optional[float] = None
+        self.peak_rss: Optional[int] = None
+        self.success = False
+        self.error: Optional[str] = None
+        self._clock = time.monotonic()
+        self._file_bytes = 0
+        self._completed_bytes = 0
+
+    def mark(self, phase: str) -> None:
+        """
+        Record the time of a phase, once.
+
+        Args:
+            phase: One of PHASES
+        """
+        if phase not in self.phases:
+            self.phases[phase] = round(time.monotonic() - self._clock, 4)
+
+    def on_progress(self, event: ProgressEvent) -> None:
+        """
+        Update phases and byte counts from a progress event.
+
+        Args:
+            event: Parsed progress event
+        """
+        if event.stage != STAGE_DOWNLOAD:
+            self.mark(PHASE_DOWNLOAD_DONE)
+            return
+
+        downloaded = event.downloaded_bytes or 0
+        if downloaded > 0:
+            self.mark(PHASE_FIRST_BYTE)
+
+        # Video and audio are separate files; a smaller count starts a new one
+        if downloaded < self._file_bytes:
+            self._completed_bytes += self._file_bytes
+        self._file_bytes = downloaded
+        self.bytes = self._completed_bytes + downloaded
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """
+        Stop measuring.
+
+        Args:
+            error: Error message if the download failed
+        """
+        self.mark(PHASE_DOWNLOAD_DONE)
+        self.mark(PHASE_FINISHED)
+        self.success = error is None
+        self.error = error
+
+    @property
+    def average_speed(self) -> Optional[float]:
+        """Average transfer speed in bytes per second, if known."""
+        start = self.phases.get(PHASE_FIRST_BYTE)
+        end = self.phases.get(PHASE_DOWNLOAD_DONE)
+        if start is None or end is None or end <= start or not self.bytes:
+            return None
+        return self.bytes / (end - start)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the metrics as a JSON-serializable dictionary."""
+        speed = self.average_speed
+        return {
+            "url": self.url,
+            "title": self.title,
+            "mode": self.mode,
+            "started": self.started,
+            "phases": dict(self.phases),
+            "bytes": self.bytes,
+            "average_speed": round(speed, 1) if speed is not None else None,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss": self.peak_rss,
+            "success": self.success,
+            "error": self.error,
+        }
+
+
+class ProcessSampler:
+    """
+    Samples CPU time and memory of a process and its children.
+
+    CPU time is added to what earlier samplers of the same download
+    recorded, so yt-dlp and the ffmpeg runs after it are counted together.
+    Does nothing if psutil is not installed.
+    """
+
+    def __init__(self, pid: int, metrics: TaskMetrics):
+        """
+        Start sampling in a background thread.
+
+        Args:
+            pid: Process ID of the yt-dlp or ffmpeg process
+            metrics: Metrics receiving cpu_seconds and peak_rss
+        """
+        self.metrics = metrics
+        self._base_cpu = metrics.cpu_seconds or 0.0
+        self._stop = threading.Event()
+        self._cpu: Dict[int, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        if psutil is None:
+            return
+        try:
+            self._process = psutil.Process(pid)
+        except psutil.Error:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Sample until stopped."""
+        while True:
+            self._sample()
+            if self._stop.wait(SAMPLE_INTERVAL):
+                return
+
+    def _sample(self) -> None:
+        """Take one sample of the whole process tree."""
+        try:
+            processes = [self._process] + self._process.children(recursive=True)
+        except psutil.Error:
+            return
+
+        rss = 0
+        for process in processes:
+            try:
+                with process.oneshot():
+                    times = process.cpu_times()
+                    rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+            # Keep the last value of exited children such as ffmpeg
+            self._cpu[process.pid] = times.user + times.system
+
+        self.metrics.cpu_seconds = round(self._base_cpu + sum(self._cpu.values()), 3)
+        self.metrics.peak_rss = max(self.metrics.peak_rss or 0, rss)
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+
+
+class MetricsLog:
+    """
+    Thread-safe sink for finished download metrics.
+
+    Every record is appended to a JSON lines file. Recent records are kept
+    in memory for summary(), and totals are optionally written to a
+    Prometheus text file after each record.
+    """
+
+    def __init__(self, path: Optional[str], prometheus_path: Optional[str] = None):
+        """
+        Initialize the log.
+
+        Args:
+            path: JSON lines file to append to, or None to keep records in
+                memory only
+            prometheus_path: Optional Prometheus text file to keep updated
+        """
+        self.path = path
+        self.prometheus_path = prometheus_path
+        self._lock = threading.Lock()
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=SUMMARY_WINDOW)
+        self._totals = {"success": 0, "failed": 0, "bytes": 0}
+        self._phase_sums: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self._phase_counts: Dict[str, int] = {phase: 0 for phase in PHASES}
+
+    def record(self, metrics: TaskMetrics) -> Dict[str, Any]:
+        """
+        Store the metrics of a finished download.
+
+        Args:
+            metrics: Finished task metrics
+
+        Returns:
+            The stored record
+        """
+        record = metrics.to_dict()
+        with self._lock:
+            self._recent.append(record)
+            self._totals["success" if metrics.success else "failed"] += 1
+            self._totals["bytes"] += metrics.bytes
+            for phase, seconds in metrics.phases.items():
+                self._phase_sums[phase] += seconds
+                self._phase_counts[phase] += 1
+
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            if self.prometheus_path:
+                self._write_prometheus()
+        return record
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the most recent downloads.
+
+        Returns:
+            Dictionary with count, failed, bytes, average_speed and the mean
+            time to each phase in seconds ("phases")
+        """
+        with self._lock:
+            records = list(self._recent)
+
+        speeds = [r["average_speed"] for r in records if r["average_speed"]]
+        phases = {}
+        for phase in PHASES:
+            values = [r["phases"][phase] for r in records if phase in r["phases"]]
+            if values:
+                phases[phase] = sum(values) / len(values)
+        return {
+            "count": len(records),
+            "failed": sum(1 for r in records if not r["success"]),
+            "bytes": sum(r["bytes"] for r in records),
+            "average_speed": sum(speeds) / len(speeds) if speeds else None,
+            "phases": phases,
+        }
+
+    def _write_prometheus(self) -> None:
+        """Write the totals in Prometheus text format (lock held)."""
+        lines = [
+            "# HELP ytdgui_downloads_total Finished downloads by result.",
+            "# TYPE ytdgui_downloads_total counter",
+        ]
+        for result in ("success", "failed"):
+            lines.append(
+                f'ytdgui_downloads_total{{result="{result}"}} {self._totals[result]}'
+            )
+        lines += [
+            "# HELP ytdgui_download_bytes_total Bytes transferred by downloads.",
+            "# TYPE ytdgui_download_bytes_total counter",
+            f"ytdgui_download_bytes_total {self._totals['bytes']}",
+            "# HELP ytdgui_download_phase_seconds Time from start to each phase.",
+            "# TYPE ytdgui_download_phase_seconds summary",
+        ]
+        for phase in PHASES:
+            labels = f'{{phase="{phase}"}}'
+            lines.append(
+                f"ytdgui_download_phase_seconds_sum{labels} "
+                f"{self._phase_sums[phase]:.4f}"
+            )
+            lines.append(
+                f"ytdgui_download_phase_seconds_count{labels} "
+                f"{self._phase_counts[phase]}"
+            )
+
+        # Replace the file atomically so scrapers never see a partial file
+        temp_path = self.prometheus_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, self.prometheus_path)
+
+
+def format_summary(summary: Dict[str, Any]) -> List[str]:
+    """
+    Format a summary from MetricsLog.summary() for display.
+
+    Args:
+        summary: Summary dictionary
+
+    Returns:
+        Short text fragments, e.g. ["Last 5: 1 failed", "avg 2.00MiB/s"]
+    """
+    if not summary["count"]:
+        return []
+
+    parts = [f"Last {summary['count']}: {summary['failed']} failed"]
+    if summary["average_speed"]:
+        parts.append(f"avg {format_bytes(summary['average_speed'])}/s")
+    phases = summary["phases"]
+    if PHASE_METADATA in phases:
+        parts.append(f"startup {phases[PHASE_METADATA]:.1f}s")
+    if PHASE_DOWNLOAD_DONE in phases and PHASE_FINISHED in phases:
+        post = phases[PHASE_FINISHED] - phases[PHASE_DOWNLOAD_DONE]
+        parts.append(f"post-processing {post:.1f}s")
+    return parts
@@ -0,0 +1,234 @@
+"""
+Parsing of yt-dlp progress output into structured progress events.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+# Marker for machine-readable progress lines printed via --progress-template
+PROGRESS_PREFIX = "[ytdgui-progress] "
+
+# Templates passed to yt-dlp with --progress-template
+DOWNLOAD_PROGRESS_TEMPLATE = (
+    "download:"
+    + PROGRESS_PREFIX
+    + "%(progress.{status,downloaded_bytes,total_bytes,total_bytes_estimate,"
+    "speed,eta,fragment_index,fragment_count})j"
+)
+POSTPROCESS_PROGRESS_TEMPLATE = (
+    "postprocess:" + PROGRESS_PREFIX + "%(progress.{status,postprocessor})j"
+)
+
+# Sizes such as "500K", "2.5M" or "1GiB"
+_BYTES_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?\s*$", re.I)
+_BYTE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+# Progress stages
+STAGE_DOWNLOAD = "download"
+STAGE_MERGE = "merge"
+STAGE_EXTRACT_AUDIO = "extract-audio"
+STAGE_POSTPROCESS = "postprocess"
+
+# Post-processor names reported by yt-dlp mapped to progress stages
+_POSTPROCESSOR_STAGES = {
+    "Merger": STAGE_MERGE,
+    "ExtractAudio": STAGE_EXTRACT_AUDIO,
+}
+
+# Fallback for plain yt-dlp output, e.g.
+# "[download]  42.1% of ~ 10.00MiB at  1.20MiB/s ETA 00:07 (frag 3/20)"
+_LEGACY_PROGRESS_RE = re.compile(
+    r"\[download\]\s+(?P<percent>[0-9.]+)%"
+    r"(?:\s+of\s+~?\s*(?P<total>[0-9.]+)(?P<total_unit>[KMGT]?i?B))?"
+    r"(?:\s+at\s+(?P<speed>[0-9.]+)(?P<speed_unit>[KMGT]?i?B)/s)?"
+    r"(?:\s+ETA\s+(?P<eta>[0-9:]+))?"
+    r"(?:\s+\(frag\s+(?P<frag>\d+)/(?P<frags>\d+)\))?"
+)
+_LEGACY_STAGE_RE = re.compile(r"\[(Merger|ExtractAudio)\]")
+
+_UNITS = {
+    "B": 1,
+    "KiB": 1024,
+    "MiB": 1024**2,
+    "GiB": 1024**3,
+    "TiB": 1024**4,
+    "KB": 1000,
+    "MB": 1000**2,
+    "GB": 1000**3,
+    "TB": 1000**4,
+}
+
+
+@dataclass
+class ProgressEvent:
+    """Structured progress of a single download."""
+
+    stage: str = STAGE_DOWNLOAD
+    status: str = "downloading"
+    percent: Optional[float] = None
+    downloaded_bytes: Optional[int] = None
+    total_bytes: Optional[int] = None
+    speed: Optional[float] = None
+    eta: Optional[int] = None
+    fragment_index: Optional[int] = None
+    fragment_count: Optional[int] = None
+
+    def describe(self) -> str:
+        """
+        Format the event as a human-readable log line.
+
+        Download events keep yt-dlp's "[download]  x%" shape so the log
+        collapses them into one live line per download.
+        """
+        if self.stage != STAGE_DOWNLOAD:
+            if self.status == "processing" and self.percent is not None:
+                return f"[{self.stage}] {self.percent:5.1f}%"
+            return f"[{self.stage}] {self.status}"
+
+        parts = [f"[download] {self.percent or 0.0:5.1f}%"]
+        if self.total_bytes:
+            parts.append(f"of {format_bytes(self.total_bytes)}")
+        if self.speed:
+            parts.append(f"at {format_bytes(self.speed)}/s")
+        if self.eta is not None:
+            minutes, seconds = divmod(int(self.eta), 60)
+            parts.append(f"ETA {minutes:02d}:{seconds:02d}")
+        if self.fragment_count:
+            parts.append(f"(frag {self.fragment_index}/{self.fragment_count})")
+        return " ".join(parts)
+
+
+def format_bytes(value: float) -> str:
+    """
+    Format a byte count with binary units.
+
+    Args:
+        value: Number of bytes
+
+    Returns:
+        Formatted size such as "1.50MiB"
+    """
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024:
+            return f"{value:.2f}{unit}"
+        value /= 1024
+    return f"{value:.2f}TiB"
+
+
+def parse_bytes(value: str) -> int:
+    """
+    Parse a size with an optional binary unit, as accepted by yt-dlp.
+
+    Args:
+        value: Size such as "500K", "2.5M", "10MiB" or "1048576"
+
+    Returns:
+        Number of bytes
+
+    Raises:
+        ValueError: If the size cannot be parsed
+    """
+    match = _BYTES_RE.match(value)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * _BYTE_UNITS[match.group(2).upper()])
+
+
+def parse_progress_line(line: str) -> Optional[ProgressEvent]:
+    """
+    Parse a line of yt-dlp output into a progress event.
+
+    Lines printed through the progress templates are decoded as JSON;
+    plain "[download]  x%" lines are handled by a precompiled regex.
+
+    Args:
+        line: A single line of output from yt-dlp.
+
+    Returns:
+        ProgressEvent, or None if the line carries no progress.
+    """
+    if line.startswith(PROGRESS_PREFIX):
+        return _parse_template_line(line[len(PROGRESS_PREFIX) :])
+    if not line.startswith("["):
+        return None
+
+    match = _LEGACY_PROGRESS_RE.match(line)
+    if match:
+        return _parse_legacy_match(match)
+
+    match = _LEGACY_STAGE_RE.match(line)
+    if match:
+        return ProgressEvent(
+            stage=_POSTPROCESSOR_STAGES[match.group(1)], status="started"
+        )
+    return None
+
+
+def _parse_template_line(payload: str) -> Optional[ProgressEvent]:
+    """Build an event from the JSON printed by a progress template."""
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    postprocessor = data.get("postprocessor")
+    if postprocessor:
+        stage = _POSTPROCESSOR_STAGES.get(postprocessor, STAGE_POSTPROCESS)
+        return ProgressEvent(stage=stage, status=data.get("status") or "started")
+
+    downloaded = data.get("downloaded_bytes")
+    total = data.get("total_bytes") or data.get("total_bytes_estimate")
+    fragment_index = data.get("fragment_index")
+    fragment_count = data.get("fragment_count")
+
+    percent = None
+    if downloaded is not None and total:
+        percent = min(100.0, downloaded * 100.0 / total)
+    elif fragment_index is not None and fragment_count:
+        percent = min(100.0, fragment_index * 100.0 / fragment_count)
+    if data.get("status") == "finished":
+        percent = 100.0
+
+    return ProgressEvent(
+        status=data.get("status") or "downloading",
+        percent=percent,
+        downloaded_bytes=downloaded,
+        total_bytes=int(total) if total else None,
+        speed=data.get("speed"),
+        eta=data.get("eta"),
+        fragment_index=fragment_index,
+        fragment_count=fragment_count,
+    )
+
+
+def _parse_legacy_match(match: "re.Match") -> ProgressEvent:
+    """Build an event from a plain yt-dlp progress line."""
+    percent = float(match.group("percent"))
+
+    total = None
+    if match.group("total"):
+        total = int(float(match.group("total")) * _UNITS[match.group("total_unit")])
+
+    speed = None
+    if match.group("speed"):
+        speed = float(match.group("speed")) * _UNITS[match.group("speed_unit")]
+
+    eta = None
+    if match.group("eta"):
+        eta = 0
+        for part in match.group("eta").split(":"):
+            eta = eta * 60 + int(part)
+
+    return ProgressEvent(
+        percent=percent,
+        downloaded_bytes=int(total * percent / 100) if total else None,
+        total_bytes=total,
+        speed=speed,
+        eta=eta,
+        fragment_index=int(match.group("frag")) if match.group("frag") else None,
+        fragment_count=int(match.group("frags")) if match.group("frags") else None,
+    )
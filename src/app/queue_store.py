@@ -0,0 +1,211 @@
+"""
+Persistent download queue backed by SQLite.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+# Task states
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueStore:
+    """
+    Crash-safe download queue stored in an SQLite database in WAL mode.
+
+    Every task row has a state (pending, running, done or failed). Tasks are
+    dequeued in insertion order through an index on (state, id), and tasks
+    that were running when the application stopped are put back into the
+    pending state by resume().
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the queue database.
+
+        Args:
+            db_path: Path to the SQLite database file, or ":memory:"
+        """
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "state TEXT NOT NULL, "
+                "task TEXT NOT NULL, "
+                "error TEXT, "
+                "updated REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, id)"
+            )
+
+        self._pending = self._count(PENDING)
+
+    def _count(self, state: str) -> int:
+        """Count the tasks in the given state."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE state = ?", (state,)
+            ).fetchone()
+        return row[0]
+
+    def __len__(self) -> int:
+        """Return the number of pending tasks."""
+        return self._pending
+
+    def __bool__(self) -> bool:
+        """Return True if there are pending tasks."""
+        return self._pending > 0
+
+    def append(self, task: Dict[str, Any]) -> int:
+        """
+        Add a task to the end of the queue.
+
+        Args:
+            task: JSON-serializable task dictionary
+
+        Returns:
+            Queue ID of the new task
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO tasks (state, task, updated) VALUES (?, ?, ?)",
+                (PENDING, json.dumps(task), time.time()),
+            )
+            self._pending += 1
+        return cursor.lastrowid
+
+    def extend(self, tasks: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add several tasks in a single transaction.
+
+        Args:
+            tasks: JSON-serializable task dictionaries
+        """
+        now = time.time()
+        rows = [(PENDING, json.dumps(task), now) for task in tasks]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO tasks (state, task, updated) VALUES (?, ?, ?)", rows
+            )
+            self._pending += len(rows)
+
+    def pop_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest pending task and mark it as running.
+
+        Returns:
+            Task dictionary with its "queue_id", or None if nothing is pending
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id, task FROM tasks WHERE state = ? ORDER BY id LIMIT 1",
+                (PENDING,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE tasks SET state = ?, updated = ? WHERE id = ?",
+                (RUNNING, time.time(), row[0]),
+            )
+            self._pending -= 1
+
+        task = json.loads(row[1])
+        task["queue_id"] = row[0]
+        return task
+
+    def update(self, queue_id: int, task: Dict[str, Any]) -> None:
+        """
+        Store the current fields of a task without changing its state.
+
+        Used to remember the files of a running download, so an
+        interrupted download can be resumed after a restart.
+
+        Args:
+            queue_id: Queue ID of the task
+            task: JSON-serializable task dictionary
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE tasks SET task = ?, updated = ? WHERE id = ?",
+                (json.dumps(task), time.time(), queue_id),
+            )
+
+    def mark_done(self, queue_id: int) -> None:
+        """
+        Mark a task as successfully finished.
+
+        Args:
+            queue_id: Queue ID of the task
+        """
+        self._set_state(queue_id, DONE)
+
+    def mark_failed(self, queue_id: int, error: Optional[str] = None) -> None:
+        """
+        Mark a task as failed.
+
+        Args:
+            queue_id: Queue ID of the task
+            error: Optional error message
+        """
+        self._set_state(queue_id, FAILED, error)
+
+    def _set_state(self, queue_id: int, state: str, error: Optional[str] = None):
+        """Update the state of a single task."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE tasks SET state = ?, error = ?, updated = ? WHERE id = ?",
+                (state, error, time.time(), queue_id),
+            )
+
+    def resume(self) -> int:
+        """
+        Prepare the queue after a restart.
+
+        Tasks that were running when the application stopped are made
+        pending again, and finished tasks are removed.
+
+        Returns:
+            Number of pending tasks
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE tasks SET state = ? WHERE state = ?", (PENDING, RUNNING)
+            )
+            self._conn.execute("DELETE FROM tasks WHERE state = ?", (DONE,))
+
+        self._pending = self._count(PENDING)
+        return self._pending
+
+    def queued_urls(self) -> Set[str]:
+        """
+        Return the URLs of the pending and running tasks.
+
+        Returns:
+            Set of task URLs
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task FROM tasks WHERE state IN (?, ?)", (PENDING, RUNNING)
+            ).fetchall()
+        return {json.loads(row[0]).get("url") for row in rows}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
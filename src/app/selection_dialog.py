@@ -0,0 +1,313 @@
+"""
+Dialog for selecting videos from a playlist or channel.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from PyQt6.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QLabel,
+    QListView,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtSignal
+from PyQt6.QtGui import QIcon
+
+# Per-entry selection states, stored one byte per entry
+UNCHECKED = 0
+CHECKED = 1
+QUEUED = 2
+
+# bytes.translate tables used for bulk Select All / Deselect All
+_SELECT_ALL = bytes([CHECKED, CHECKED, QUEUED]) + bytes(253)
+_DESELECT_ALL = bytes([UNCHECKED, UNCHECKED, QUEUED]) + bytes(253)
+
+
+class VideoListModel(QAbstractListModel):
+    """
+    Checkable list model over a compact store of extracted videos.
+
+    Videos are kept as parallel lists of URLs and titles plus one state
+    byte each, so the model stays small for channels with thousands of
+    uploads and the view only creates items for visible rows. Videos that
+    were already downloaded are listed unchecked and marked as such.
+    """
+
+    def __init__(self, video_icon: Optional[QIcon] = None, parent=None):
+        """
+        Initialize the model.
+
+        Args:
+            video_icon: Icon shown next to every video, shared by all rows
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self.video_icon = video_icon
+        self._urls: List[str] = []
+        self._titles: List[str] = []
+        self._states = bytearray()
+        self._downloaded: Dict[int, str] = {}
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Return the number of videos (Qt model API)."""
+        if parent.isValid():
+            return 0
+        return len(self._urls)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        """Return display text, check state or icon for a row (Qt model API)."""
+        if not index.isValid():
+            return None
+        row = index.row()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if row in self._downloaded:
+                return f"{self._titles[row]} (already downloaded)"
+            return self._titles[row]
+        if role == Qt.ItemDataRole.CheckStateRole:
+            if self._states[row] == CHECKED:
+                return Qt.CheckState.Checked
+            return Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.video_icon
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if row in self._downloaded:
+                return f"{self._urls[row]}\nSaved as {self._downloaded[row]}"
+            return self._urls[row]
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        """Return item flags; queued videos are disabled (Qt model API)."""
+        if not index.isValid() or self._states[index.row()] == QUEUED:
+            return Qt.ItemFlag.NoItemFlags
+        return (
+            Qt.ItemFlag.ItemIsEnabled
+            | Qt.ItemFlag.ItemIsSelectable
+            | Qt.ItemFlag.ItemIsUserCheckable
+        )
+
+    def setData(
+        self, index: QModelIndex, value: Any, role: int = Qt.ItemDataRole.EditRole
+    ) -> bool:
+        """Toggle the check state of a row (Qt model API)."""
+        if role != Qt.ItemDataRole.CheckStateRole or not index.isValid():
+            return False
+
+        row = index.row()
+        if self._states[row] == QUEUED:
+            return False
+
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        self._states[row] = CHECKED if checked else UNCHECKED
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        return True
+
+    def add_entries(
+        self,
+        entries: List[Tuple[str, str]],
+        downloaded: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Append a batch of videos, checked unless already downloaded.
+
+        Args:
+            entries: List of (video_url, title) tuples
+            downloaded: Optional mapping of already downloaded video URLs to
+                their files
+        """
+        if not entries:
+            return
+
+        first = len(self._urls)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        for video_url, title in entries:
+            self._urls.append(video_url)
+            self._titles.append(title)
+        self._states.extend(bytes([CHECKED]) * len(entries))
+        if downloaded:
+            for row in range(first, len(self._urls)):
+                path = downloaded.get(self._urls[row])
+                if path is not None:
+                    self._downloaded[row] = path
+                    self._states[row] = UNCHECKED
+        self.endInsertRows()
+
+    def set_all_checked(self, checked: bool) -> None:
+        """
+        Check or uncheck every video that has not been queued yet.
+
+        Already downloaded videos stay unchecked; they can still be checked
+        one by one.
+        """
+        self.beginResetModel()
+        self._states = bytearray(
+            self._states.translate(_SELECT_ALL if checked else _DESELECT_ALL)
+        )
+        for row in self._downloaded:
+            if self._states[row] == CHECKED:
+                self._states[row] = UNCHECKED
+        self.endResetModel()
+
+    def downloaded_count(self) -> int:
+        """Return the number of listed videos that were already downloaded."""
+        return len(self._downloaded)
+
+    def selected_videos(self) -> List[Tuple[str, str]]:
+        """
+        Get the videos that are currently checked.
+
+        Returns:
+            List of (video_url, title) tuples
+        """
+        return [
+            (self._urls[row], self._titles[row])
+            for row, state in enumerate(self._states)
+            if state == CHECKED and self._urls[row]
+        ]
+
+    def mark_selected_queued(self) -> None:
+        """Mark checked videos as queued so they cannot be queued again."""
+        self.beginResetModel()
+        self._states = bytearray(
+            self._states.replace(bytes([CHECKED]), bytes([QUEUED]))
+        )
+        self.endResetModel()
+
+
+class VideoSelectionDialog(QDialog):
+    """
+    Non-modal dialog listing playlist or channel videos as they are extracted.
+
+    Entries are added in batches while extraction is still running, so the
+    user can start queueing videos before the full listing is available.
+    """
+
+    # Emitted when the user clicks "Download Selected"
+    downloadRequested = pyqtSignal()
+
+    def __init__(
+        self,
+        title: str,
+        video_icon: Optional[QIcon] = None,
+        parent: Optional[QWidget] = None,
+    ):
+        """
+        Initialize the dialog.
+
+        Args:
+            title: Dialog window title
+            video_icon: Icon shown next to every video, shared by all entries
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(600, 400)
+
+        self.extracting = True
+        self.model = VideoListModel(video_icon, self)
+
+        # Main layout
+        dlg_layout = QVBoxLayout(self)
+
+        # Info label
+        self.info_label = QLabel("Extracting videos...")
+        self.info_label.setStyleSheet("font-weight: bold; margin-bottom: 10px;")
+        dlg_layout.addWidget(self.info_label)
+
+        # Video list, only visible rows are rendered
+        view = QListView()
+        view.setUniformItemSizes(True)
+        view.setModel(self.model)
+        dlg_layout.addWidget(view)
+
+        # Button layout
+        button_layout = QHBoxLayout()
+
+        # Select All / Deselect All buttons
+        select_all_btn = QPushButton("Select All")
+        select_all_btn.clicked.connect(lambda: self.set_all_checked(True))
+        button_layout.addWidget(select_all_btn)
+
+        deselect_all_btn = QPushButton("Deselect All")
+        deselect_all_btn.clicked.connect(lambda: self.set_all_checked(False))
+        button_layout.addWidget(deselect_all_btn)
+
+        button_layout.addStretch()
+
+        # Cancel button
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+
+        # Download Selected button
+        download_btn = QPushButton("Download Selected")
+        download_btn.setStyleSheet("font-weight: bold;")
+        download_btn.clicked.connect(self.downloadRequested.emit)
+        button_layout.addWidget(download_btn)
+
+        dlg_layout.addLayout(button_layout)
+
+    def add_entries(
+        self,
+        entries: List[Tuple[str, str]],
+        downloaded: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Append a batch of extracted videos to the list.
+
+        Args:
+            entries: List of (video_url, title) tuples
+            downloaded: Optional mapping of already downloaded video URLs to
+                their files; these are listed unchecked
+        """
+        self.model.add_entries(entries, downloaded)
+        self._update_info_label()
+
+    def set_extraction_finished(self, error: Optional[str] = None) -> None:
+        """
+        Mark extraction as finished.
+
+        Args:
+            error: Error message if extraction stopped early
+        """
+        self.extracting = False
+        self._update_info_label(error)
+
+    def entry_count(self) -> int:
+        """Return the number of videos listed so far."""
+        return self.model.rowCount()
+
+    def set_all_checked(self, checked: bool) -> None:
+        """Check or uncheck every video that has not been queued yet."""
+        self.model.set_all_checked(checked)
+
+    def selected_videos(self) -> List[Tuple[str, str]]:
+        """
+        Get the videos that are currently selected.
+
+        Returns:
+            List of (video_url, title) tuples
+        """
+        return self.model.selected_videos()
+
+    def mark_selected_queued(self) -> None:
+        """Disable selected videos so they are not queued a second time."""
+        self.model.mark_selected_queued()
+
+    def _update_info_label(self, error: Optional[str] = None) -> None:
+        """Refresh the info label with the current entry count."""
+        count = self.model.rowCount()
+        downloaded = self.model.downloaded_count()
+        found = f"{count} videos"
+        if downloaded:
+            found += f" ({downloaded} already downloaded)"
+        if self.extracting:
+            text = f"Found {found} so far, still extracting..."
+        else:
+            text = f"Found {found}. Select videos to download:"
+        if error:
+            text += f"\nExtraction stopped early: {error}"
+        self.info_label.setText(text)
@@ -0,0 +1,75 @@
+"""
+Timing trace of the GUI start, up to the first shown window.
+
+Kept free of Qt and other heavy imports, so main.py can import it before
+anything else without distorting the measurement.
+"""
+
+import json
+import time
+from typing import List, Optional, Tuple
+
+# Time to first window in milliseconds that the startup test enforces
+STARTUP_BUDGET_MS = 2000
+
+# Command line flag printing the trace as JSON and quitting after startup
+TRACE_FLAG = "--startup-trace"
+
+
+class StartupTrace:
+    """
+    Records how long the steps of the application start take.
+
+    Every mark() stores the time since the trace started; the last mark,
+    "first window", is the time to first window.
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        """
+        Initialize the trace.
+
+        Args:
+            start: time.perf_counter() value the process started at; now
+                if not given
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str) -> float:
+        """
+        Record the end of a startup step.
+
+        Args:
+            name: Name of the step
+
+        Returns:
+            Milliseconds since the start
+        """
+        elapsed = (time.perf_counter() - self.start) * 1000
+        self.marks.append((name, elapsed))
+        return elapsed
+
+    @property
+    def total_ms(self) -> float:
+        """Milliseconds from the start to the last mark."""
+        return self.marks[-1][1] if self.marks else 0.0
+
+    def steps(self) -> List[Tuple[str, float]]:
+        """Return the duration of every step in milliseconds."""
+        steps = []
+        previous = 0.0
+        for name, elapsed in self.marks:
+            steps.append((name, elapsed - previous))
+            previous = elapsed
+        return steps
+
+    def format(self) -> str:
+        """Return a one-line summary for the log."""
+        parts = ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.steps())
+        return f"Started in {self.total_ms:.0f} ms ({parts})"
+
+    def to_json(self) -> str:
+        """Return the steps and the total as a JSON object."""
+        data = {name: round(ms, 1) for name, ms in self.steps()}
+        data["total"] = round(self.total_ms, 1)
+        return json.dumps(data)
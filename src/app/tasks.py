@@ -0,0 +1,283 @@
+"""
+Compact representations of download tasks and listing entries.
+
+Both classes use __slots__ instead of a per-instance __dict__, because
+large channels produce tens of thousands of them.
+"""
+
+from typing import Any, Dict, List, Optional
+
+# Base URL for relative video URLs in flat-playlist entries
+YOUTUBE_URL = "https://www.youtube.com"
+
+# Audio formats of the audio modes: converted to MP3, or the original
+# AAC/Opus stream copied into an .m4a/.opus file without re-encoding
+AUDIO_FORMAT_MP3 = "mp3"
+AUDIO_FORMAT_ORIGINAL = "original"
+AUDIO_FORMATS = [AUDIO_FORMAT_MP3, AUDIO_FORMAT_ORIGINAL]
+
+
+def is_audio_mode(mode: str) -> bool:
+    """Return True if the download mode extracts audio only."""
+    return "MP3" in mode
+
+
+class DownloadTask:
+    """A single video or audio download."""
+
+    __slots__ = (
+        "url",
+        "save_path",
+        "mode",
+        "video_quality",
+        "audio_quality",
+        "title",
+        "archive",
+        "video_id",
+        "duration",
+        "queue_id",
+        "error",
+        "rate_limit",
+        "concurrent_fragments",
+        "http_chunk_size",
+        "downloader",
+        "audio_format",
+        "filepath",
+        "parts",
+        "destinations",
+    )
+
+    def __init__(
+        self,
+        url: str,
+        save_path: str,
+        mode: str,
+        video_quality: str = "Best Available",
+        audio_quality: Optional[str] = None,
+        title: Optional[str] = None,
+        archive: Optional[str] = None,
+        video_id: Optional[str] = None,
+        duration: Optional[float] = None,
+        queue_id: Optional[int] = None,
+        error: Optional[str] = None,
+        rate_limit: Optional[int] = None,
+        concurrent_fragments: Optional[int] = None,
+        http_chunk_size: Optional[int] = None,
+        downloader: Optional[str] = None,
+        audio_format: Optional[str] = None,
+        filepath: Optional[str] = None,
+        parts: Optional[List[str]] = None,
+        destinations: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the task.
+
+        Args:
+            url: Video URL
+            save_path: Download destination path
+            mode: Download mode
+            video_quality: Preferred video quality
+            audio_quality: Audio quality in kbps for audio modes
+            title: Video title, if known
+            archive: Optional yt-dlp download archive recording finished videos
+            video_id: Video ID, if known
+            duration: Video duration in seconds, if known
+            queue_id: ID of the task in the persistent queue
+            error: Error message of a failed download
+            rate_limit: Download speed limit in bytes per second
+            concurrent_fragments: DASH/HLS fragments downloaded in parallel
+            http_chunk_size: Size in bytes of ranged HTTP requests
+            downloader: External downloader ("aria2c"), or None for yt-dlp's own
+            audio_format: One of AUDIO_FORMATS for audio modes (default MP3)
+            filepath: Path of the downloaded file, once known
+            parts: Paths of the separately downloaded streams, merged into
+                one file by post-processing
+            destinations: Files yt-dlp started writing, used to find partial
+                downloads after an interruption
+        """
+        self.url = url
+        self.save_path = save_path
+        self.mode = mode
+        self.video_quality = video_quality
+        self.audio_quality = audio_quality
+        self.title = title
+        self.archive = archive
+        self.video_id = video_id
+        self.duration = duration
+        self.queue_id = queue_id
+        self.error = error
+        self.rate_limit = rate_limit
+        self.concurrent_fragments = concurrent_fragments
+        self.http_chunk_size = http_chunk_size
+        self.downloader = downloader
+        self.audio_format = audio_format
+        self.filepath = filepath
+        self.parts = parts
+        self.destinations = destinations
+
+    @classmethod
+    def create(
+        cls,
+        url: str,
+        save_path: str,
+        mode: str,
+        video_quality: str = "Best Available",
+        audio_quality: str = "320",
+        title: Optional[str] = None,
+        archive: Optional[str] = None,
+        concurrent_fragments: Optional[int] = None,
+        http_chunk_size: Optional[int] = None,
+        downloader: Optional[str] = None,
+        audio_format: str = AUDIO_FORMAT_MP3,
+    ) -> "DownloadTask":
+        """
+        Create a task, keeping only the quality setting the mode uses.
+
+        Args:
+            url: Video URL
+            save_path: Download destination path
+            mode: Download mode
+            video_quality: Preferred video quality (ignored for audio modes)
+            audio_quality: Audio quality in kbps (ignored for video modes)
+            title: Video title, if already known from a listing
+            archive: Optional yt-dlp download archive recording finished videos
+            concurrent_fragments: DASH/HLS fragments downloaded in parallel
+            http_chunk_size: Size in bytes of ranged HTTP requests
+            downloader: External downloader ("aria2c"), or None for yt-dlp's own
+            audio_format: One of AUDIO_FORMATS (ignored for video modes)
+
+        Returns:
+            New download task
+        """
+        audio = is_audio_mode(mode)
+        return cls(
+            url=url,
+            save_path=save_path,
+            mode=mode,
+            video_quality="Best Available" if audio else video_quality,
+            audio_quality=audio_quality if audio else None,
+            title=title,
+            archive=archive,
+            concurrent_fragments=concurrent_fragments,
+            http_chunk_size=http_chunk_size,
+            downloader=downloader,
+            audio_format=audio_format if audio else None,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DownloadTask":
+        """
+        Rebuild a task stored by to_dict(), ignoring unknown keys.
+
+        Args:
+            data: Task dictionary, e.g. from QueueStore.pop_next()
+
+        Returns:
+            Download task
+        """
+        return cls(**{key: data[key] for key in cls.__slots__ if key in data})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the JSON-serializable fields that are set."""
+        values = ((key, getattr(self, key)) for key in self.__slots__)
+        return {key: value for key, value in values if value is not None}
+
+    @property
+    def transcodes_audio(self) -> bool:
+        """Whether the downloaded audio is converted to MP3 afterwards."""
+        audio_format = self.audio_format or AUDIO_FORMAT_MP3
+        return is_audio_mode(self.mode) and audio_format == AUDIO_FORMAT_MP3
+
+    @property
+    def merges_streams(self) -> bool:
+        """Whether separately downloaded streams still have to be merged."""
+        return len(self.parts or []) > 1
+
+    def apply_metadata(self, metadata: Dict[str, Any]) -> None:
+        """
+        Update the task with the metadata printed before downloading.
+
+        Args:
+            metadata: Dictionary with id, title, duration and the filename
+                of the stream about to be downloaded
+        """
+        self.video_id = metadata.get("id") or self.video_id
+        self.title = metadata.get("title") or self.title
+        self.duration = metadata.get("duration") or self.duration
+
+        filename = metadata.get("filename")
+        if filename and filename not in (self.destinations or []):
+            self.destinations = (self.destinations or []) + [filename]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DownloadTask):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"DownloadTask({self.to_dict()!r})"
+
+
+class PlaylistEntry:
+    """One video of a flat playlist or channel listing."""
+
+    __slots__ = ("video_id", "url", "title", "duration", "is_short")
+
+    def __init__(
+        self,
+        video_id: Optional[str],
+        url: str,
+        title: str,
+        duration: Optional[float] = None,
+        is_short: bool = False,
+    ):
+        """
+        Initialize the entry.
+
+        Args:
+            video_id: Video ID
+            url: Absolute video URL
+            title: Video title
+            duration: Video duration in seconds, if known
+            is_short: Whether the video is a YouTube Short
+        """
+        self.video_id = video_id
+        self.url = url
+        self.title = title
+        self.duration = duration
+        self.is_short = is_short
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> Optional["PlaylistEntry"]:
+        """
+        Build an entry from the fields printed for a flat-playlist entry.
+
+        Args:
+            data: Parsed JSON object with id, url, title and duration
+
+        Returns:
+            Playlist entry, or None if the entry has no URL
+        """
+        url = data.get("url")
+        if not url:
+            return None
+
+        # Ensure URL is absolute
+        if not url.startswith("http"):
+            url = YOUTUBE_URL + "/" + url.lstrip("/")
+
+        return cls(
+            data.get("id"),
+            url,
+            data.get("title") or "Unknown Title",
+            data.get("duration"),
+            "/shorts/" in url.lower(),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PlaylistEntry):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"PlaylistEntry({self.video_id!r}, {self.url!r}, {self.title!r})"
@@ -3,13 +3,14 @@ Handles creation and management of the UI.
 """
 
 import os
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from PyQt6.QtWidgets import (
     QApplication,
     QCheckBox,
     QComboBox,
     QDialog,
+    QDoubleSpinBox,
     QFileDialog,
     QHBoxLayout,
     QInputDialog,
@@ -20,18 +21,36 @@ from PyQt6.QtWidgets import (
     QProgressBar,
     QPushButton,
     QScrollArea,
+    QSpinBox,
     QStackedWidget,
     QStatusBar,
-    QTextEdit,
+    QPlainTextEdit,
     QVBoxLayout,
     QWidget,
 )
 from PyQt6.QtGui import QAction, QIcon, QPixmap
 from PyQt6.QtCore import QSize, Qt
 
+from .download_manager import MAX_CONCURRENT_DOWNLOADS
+from .engine import DEFAULT_CONCURRENT_FRAGMENTS, find_aria2c
+from .log_buffer import MAX_LOG_LINES
+from . import ytdlp_api
+from .tasks import AUDIO_FORMAT_MP3, AUDIO_FORMAT_ORIGINAL
+
 if TYPE_CHECKING:
     from .main_window import YTDGUI
 
+# Upper bound for the "Parallel Fragments" setting
+MAX_CONCURRENT_FRAGMENTS = 16
+
+# Choices of the "HTTP Chunk Size" setting in bytes
+HTTP_CHUNK_SIZES = [
+    ("Off", None),
+    ("1 MiB", 1024 * 1024),
+    ("10 MiB", 10 * 1024 * 1024),
+    ("50 MiB", 50 * 1024 * 1024),
+]
+
 
 class UIManager:
     """Handles creation and management of the UI."""
@@ -39,7 +58,10 @@ class UIManager:
     def __init__(self, main_app: "YTDGUI"):
         self.main_app = main_app
         self.main_app.icons = {}
-        self.main_app.video_favicon_pixmap = None
+
+        # Icon of the selection dialogs, loaded when the first one opens
+        self._video_favicon: Optional[QPixmap] = None
+        self._video_favicon_loaded = False
 
     def _load_stylesheet(self) -> None:
         """Load and apply the application stylesheet."""
@@ -62,7 +84,7 @@ class UIManager:
             pass
 
     def _load_icons(self) -> None:
-        """Load application icons from assets directory."""
+        """Load the sidebar icons from assets directory."""
         self.main_app.icons = {
             "download": self.load_icon(
                 os.path.join(self.main_app.base_dir, "assets", "download.png")
@@ -72,22 +94,33 @@ class UIManager:
             ),
         }
 
-        # Load video favicon for playlist/channel selection dialogs
+    def video_favicon_pixmap(self) -> Optional[QPixmap]:
+        """
+        Return the icon for videos in playlist/channel selection dialogs.
+
+        Loaded on the first call instead of at startup.
+
+        Returns:
+            16x16 pixmap, or None if the asset is missing
+        """
+        if self._video_favicon_loaded:
+            return self._video_favicon
+        self._video_favicon_loaded = True
+
         try:
             vf_path = os.path.join(
                 self.main_app.base_dir, "assets", "video-favicon.png"
             )
             if os.path.exists(vf_path):
-                self.main_app.video_favicon_pixmap = QPixmap(vf_path).scaled(
+                self._video_favicon = QPixmap(vf_path).scaled(
                     16,
                     16,
                     Qt.AspectRatioMode.KeepAspectRatio,
                     Qt.TransformationMode.SmoothTransformation,
                 )
-            else:
-                self.main_app.video_favicon_pixmap = None
         except Exception:
-            self.main_app.video_favicon_pixmap = None
+            self._video_favicon = None
+        return self._video_favicon
 
     def load_icon(self, path: str) -> QIcon:
         """
@@ -115,7 +148,7 @@ class UIManager:
 
         # Login action for cookie-based authentication
         login_action = QAction("Login", self.main_app)
-        login_action.triggered.connect(self.main_app.login_manager.open_login)
+        login_action.triggered.connect(lambda: self.main_app.login_manager.open_login())
         file_menu.addAction(login_action)
 
         file_menu.addSeparator()
@@ -128,6 +161,13 @@ class UIManager:
         # Help menu
         help_menu = menubar.addMenu("Help")
 
+        # Check for a new yt-dlp now, even if it was checked recently
+        update_action = QAction("Check for yt-dlp Updates", self.main_app)
+        update_action.triggered.connect(
+            lambda: self.main_app.check_for_updates(force=True)
+        )
+        help_menu.addAction(update_action)
+
         # About dialog
         about_action = QAction("About", self.main_app)
         about_action.triggered.connect(self.show_about)
@@ -194,6 +234,7 @@ class UIManager:
         if name == "Download":
             self.main_app.stack.setCurrentWidget(self.main_app.download_page)
         elif name == "Activity":
+            self.ensure_activity_page()
             self.main_app.stack.setCurrentWidget(self.main_app.activity_page)
 
         self.main_app.update_status(f"{name} section active")
@@ -213,11 +254,24 @@ class UIManager:
         url_label.setObjectName("header_label")
         layout.addWidget(url_label)
 
+        url_layout = QHBoxLayout()
         self.main_app.url_entry = QLineEdit()
         self.main_app.url_entry.setPlaceholderText(
             "https://www.youtube.com/watch?v=..."
         )
-        layout.addWidget(self.main_app.url_entry)
+        url_layout.addWidget(self.main_app.url_entry)
+
+        # Many URLs at once: pasted, from a .txt/.csv file or dropped
+        import_btn = QPushButton("Import URLs...")
+        import_btn.setToolTip(
+            "Queue many videos, playlists and channels at once; files and "
+            "links can also be dropped on the window"
+        )
+        import_btn.clicked.connect(
+            lambda: self.main_app.download_manager.open_import_dialog()
+        )
+        url_layout.addWidget(import_btn)
+        layout.addLayout(url_layout)
 
         # Save location section
         save_path_label = QLabel("Save Location:")
@@ -232,6 +286,16 @@ class UIManager:
         browse_btn = QPushButton("Browse Folder")
         browse_btn.clicked.connect(self.main_app.select_save_path)
         path_layout.addWidget(browse_btn)
+
+        rescan_btn = QPushButton("Rescan Folders")
+        rescan_btn.setToolTip(
+            "Rebuild the list of already downloaded videos by scanning the "
+            "download folders"
+        )
+        rescan_btn.clicked.connect(
+            self.main_app.download_manager.rebuild_download_index
+        )
+        path_layout.addWidget(rescan_btn)
         layout.addLayout(path_layout)
 
         # Download mode section
@@ -273,6 +337,110 @@ class UIManager:
         layout.addWidget(self.main_app.video_quality_label)
         layout.addWidget(self.main_app.video_quality_combo)
 
+        # Audio format section (shown for audio-only modes)
+        self.main_app.audio_format_label = QLabel("Audio Format:")
+        self.main_app.audio_format_label.setObjectName("header_label")
+        self.main_app.audio_format_combo = QComboBox()
+        self.main_app.audio_format_combo.addItem("MP3 (re-encoded)", AUDIO_FORMAT_MP3)
+        self.main_app.audio_format_combo.addItem(
+            "Original (m4a/opus, no re-encoding)", AUDIO_FORMAT_ORIGINAL
+        )
+
+        layout.addWidget(self.main_app.audio_format_label)
+        layout.addWidget(self.main_app.audio_format_combo)
+
+        # Concurrency section
+        concurrency_label = QLabel("Concurrent Downloads:")
+        concurrency_label.setObjectName("header_label")
+        layout.addWidget(concurrency_label)
+
+        self.main_app.concurrency_spin = QSpinBox()
+        self.main_app.concurrency_spin.setRange(1, MAX_CONCURRENT_DOWNLOADS)
+        self.main_app.concurrency_spin.setValue(self.main_app.max_concurrent_downloads)
+        self.main_app.concurrency_spin.valueChanged.connect(self.concurrency_changed)
+        layout.addWidget(self.main_app.concurrency_spin)
+
+        # Adaptive mode treats the value above as the upper bound
+        self.main_app.adaptive_concurrency_check = QCheckBox(
+            "Adapt to bandwidth (use the value above as maximum)"
+        )
+        self.main_app.adaptive_concurrency_check.setChecked(
+            self.main_app.adaptive_concurrency
+        )
+        self.main_app.adaptive_concurrency_check.toggled.connect(
+            self.main_app.download_manager.set_adaptive_concurrency
+        )
+        layout.addWidget(self.main_app.adaptive_concurrency_check)
+
+        # Total speed limit, split across concurrent downloads
+        rate_limit_label = QLabel("Speed Limit (all downloads):")
+        rate_limit_label.setObjectName("header_label")
+        layout.addWidget(rate_limit_label)
+
+        self.main_app.rate_limit_spin = QDoubleSpinBox()
+        self.main_app.rate_limit_spin.setRange(0, 1000)
+        self.main_app.rate_limit_spin.setDecimals(1)
+        self.main_app.rate_limit_spin.setSuffix(" MiB/s")
+        self.main_app.rate_limit_spin.setSpecialValueText("Unlimited")
+        self.main_app.rate_limit_spin.valueChanged.connect(self.rate_limit_changed)
+        layout.addWidget(self.main_app.rate_limit_spin)
+
+        # Transfer settings, stored with every queued task
+        fragments_label = QLabel("Parallel Fragments per Download:")
+        fragments_label.setObjectName("header_label")
+        layout.addWidget(fragments_label)
+
+        self.main_app.fragments_spin = QSpinBox()
+        self.main_app.fragments_spin.setRange(1, MAX_CONCURRENT_FRAGMENTS)
+        self.main_app.fragments_spin.setValue(DEFAULT_CONCURRENT_FRAGMENTS)
+        layout.addWidget(self.main_app.fragments_spin)
+
+        chunk_size_label = QLabel("HTTP Chunk Size:")
+        chunk_size_label.setObjectName("header_label")
+        layout.addWidget(chunk_size_label)
+
+        self.main_app.chunk_size_combo = QComboBox()
+        for text, size in HTTP_CHUNK_SIZES:
+            self.main_app.chunk_size_combo.addItem(text, size)
+        layout.addWidget(self.main_app.chunk_size_combo)
+
+        # aria2c is optional and only offered when it can be found
+        self.main_app.aria2c_check = QCheckBox(
+            "Use aria2c for downloads (multiple connections per file)"
+        )
+        if find_aria2c(self.main_app.base_dir) is None:
+            self.main_app.aria2c_check.setEnabled(False)
+            self.main_app.aria2c_check.setToolTip(
+                "Install aria2c or place aria2c.exe in the bin folder"
+            )
+        layout.addWidget(self.main_app.aria2c_check)
+
+        # The in-process backend needs the optional yt_dlp package
+        self.main_app.in_process_check = QCheckBox(
+            "Run yt-dlp in-process (faster start for many downloads)"
+        )
+        if not ytdlp_api.is_available():
+            self.main_app.in_process_check.setEnabled(False)
+            self.main_app.in_process_check.setToolTip(
+                "Install the yt-dlp Python package (pip install yt-dlp)"
+            )
+        self.main_app.in_process_check.toggled.connect(
+            self.main_app.download_manager.set_in_process_backend
+        )
+        layout.addWidget(self.main_app.in_process_check)
+
+        # Playlist/channel listings are cached, allow bypassing the cache
+        self.main_app.refresh_listing_check = QCheckBox(
+            "Refresh playlist/channel listing (ignore cache)"
+        )
+        layout.addWidget(self.main_app.refresh_listing_check)
+
+        # Channel sync queues only uploads missing from the channel's archive
+        self.main_app.sync_channel_check = QCheckBox(
+            "Sync channel: queue only new uploads without asking"
+        )
+        layout.addWidget(self.main_app.sync_channel_check)
+
         # Initialize visibility based on default mode
         self.mode_changed(self.main_app.mode_combo.currentText())
 
@@ -304,6 +472,55 @@ class UIManager:
             self.main_app.video_quality_label.show()
             self.main_app.video_quality_combo.show()
 
+        # The audio format only applies to audio-only modes
+        self.main_app.audio_format_label.setVisible("MP3" in text)
+        self.main_app.audio_format_combo.setVisible("MP3" in text)
+
+        # Listing options only apply to playlist and channel modes
+        self.main_app.refresh_listing_check.setVisible(
+            text.startswith(("Playlist", "Channel"))
+        )
+        self.main_app.sync_channel_check.setVisible(text.startswith("Channel"))
+
+    def concurrency_changed(self, value: int) -> None:
+        """
+        Handle change of the maximum number of concurrent downloads.
+
+        Args:
+            value: New number of worker slots
+        """
+        self.main_app.download_manager.set_max_concurrent_downloads(value)
+        self._update_slot_visibility()
+
+    def rate_limit_changed(self, value: float) -> None:
+        """
+        Handle change of the total download speed limit.
+
+        Args:
+            value: Limit in MiB/s, 0 for unlimited
+        """
+        self.main_app.download_manager.set_rate_limit(int(value * 1024 * 1024))
+
+    def _update_slot_visibility(self) -> None:
+        """Show one progress bar per configured worker slot."""
+        if not hasattr(self.main_app, "slot_progress_bars"):
+            return
+        for slot, bar in enumerate(self.main_app.slot_progress_bars):
+            bar.setVisible(slot < self.main_app.max_concurrent_downloads)
+
+    def ensure_activity_page(self) -> None:
+        """
+        Create the Activity page the first time it is shown.
+
+        Until then progress updates are kept in the application state and
+        log messages in the log buffer; both are shown once it exists.
+        """
+        if hasattr(self.main_app, "activity_page"):
+            return
+        self.main_app.activity_page = self.create_activity_page()
+        self.main_app.stack.addWidget(self.main_app.activity_page)
+        self.main_app.refresh_activity_page()
+
     def create_activity_page(self) -> QWidget:
         """
         Create the activity/logging page for monitoring downloads.
@@ -326,20 +543,43 @@ class UIManager:
         self.main_app.progress_bar.setValue(0)
         layout.addWidget(self.main_app.progress_bar)
 
-        # Log text area
-        self.main_app.log_text = QTextEdit(readOnly=True)
+        # Per-slot progress bars, one for each concurrent download
+        self.main_app.slot_progress_bars = []
+        for slot in range(MAX_CONCURRENT_DOWNLOADS):
+            bar = QProgressBar()
+            bar.setObjectName("slot_progress_bar")
+            bar.setTextVisible(True)
+            bar.setValue(0)
+            bar.setFormat(f"{slot + 1}: Idle - %p%")
+            layout.addWidget(bar)
+            self.main_app.slot_progress_bars.append(bar)
+        self._update_slot_visibility()
+
+        # Log text area, old lines are dropped beyond MAX_LOG_LINES
+        self.main_app.log_text = QPlainTextEdit(readOnly=True)
+        self.main_app.log_text.setMaximumBlockCount(MAX_LOG_LINES)
         layout.addWidget(self.main_app.log_text)
 
+        # Summary of recent download metrics
+        self.main_app.metrics_label = QLabel("No downloads finished yet")
+        self.main_app.metrics_label.setObjectName("status_label")
+        layout.addWidget(self.main_app.metrics_label)
+
         # Control buttons
         button_layout = QHBoxLayout()
 
         # Clear log button
         clear_btn = QPushButton("Clear Log")
-        clear_btn.clicked.connect(lambda: self.main_app.log_text.clear())
+        clear_btn.clicked.connect(self.main_app.clear_log)
         button_layout.addWidget(clear_btn)
 
         button_layout.addStretch()
 
+        # Combined download speed of all active downloads
+        self.main_app.throughput_label = QLabel("Speed: -")
+        self.main_app.throughput_label.setObjectName("status_label")
+        button_layout.addWidget(self.main_app.throughput_label)
+
         # Queue status label
         self.main_app.queue_status_label = QLabel("Queue: 0 pending")
         self.main_app.queue_status_label.setObjectName("status_label")
@@ -369,9 +609,7 @@ class UIManager:
         # Main content area with stacked pages
         self.main_app.stack = QStackedWidget()
         self.main_app.download_page = self.create_download_page()
-        self.main_app.activity_page = self.create_activity_page()
         self.main_app.stack.addWidget(self.main_app.download_page)
-        self.main_app.stack.addWidget(self.main_app.activity_page)
         layout.addWidget(self.main_app.stack, 1)  # Expand to fill available space
 
         # Status bar
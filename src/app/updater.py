@@ -2,15 +2,32 @@
 Handles automatic updates for the yt-dlp binary.
 """
 
+import hashlib
 import os
 import json
-import urllib.request
-import shutil
 import stat
-from typing import Dict, List, Optional, Callable, Tuple
+import subprocess
+import time
+from typing import Any, Dict, List, Optional, Callable, Tuple
 
 from PyQt6.QtWidgets import QWidget
 
+from .engine import creation_flags
+from .http_client import HttpClient, shared_client
+
+
+def version_key(version: str) -> Tuple[int, ...]:
+    """
+    Turn a yt-dlp version like "2023.12.30" into a comparable tuple.
+
+    Args:
+        version: Version string; non-numeric parts are ignored
+
+    Returns:
+        Tuple of the numeric parts
+    """
+    return tuple(int(part) for part in version.split(".") if part.isdigit())
+
 
 class Updater:
     """
@@ -23,65 +40,288 @@ class Updater:
     # GitHub API endpoint for yt-dlp releases
     YTDLP_RELEASES = "https://api.github.com/repos/yt-dlp/yt-dlp/releases/latest"
 
-    def __init__(self, base_dir: str, parent: Optional[QWidget] = None):
+    # Release asset listing the SHA-256 of every other asset
+    CHECKSUM_ASSET = "SHA2-256SUMS"
+
+    # Seconds between release checks that are not forced
+    CHECK_INTERVAL = 24 * 60 * 60
+
+    # Bytes read from the connection at a time while downloading
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        base_dir: str,
+        parent: Optional[QWidget] = None,
+        client: Optional[HttpClient] = None,
+    ):
         """
         Initialize the updater.
 
         Args:
             base_dir: Base directory where the application is installed
             parent: Parent widget for GUI operations
+            client: HTTP client; the application's shared client by default
         """
         self.base_dir = base_dir
         self.parent = parent
+        self.client = client or shared_client()
         self.yt_dlp_path = os.path.join(self.base_dir, "bin", "yt-dlp.exe")
 
+        # Last release response and its ETag, for conditional requests
+        self.release_cache_path = os.path.join(
+            self.base_dir, "data", "yt_dlp_release.json"
+        )
+
+        # Installed version (with the size and mtime it was read for) and
+        # the time of the last completed check
+        self.state_path = os.path.join(self.base_dir, "data", "updater.json")
+
+    def _load_state(self) -> Dict[str, Any]:
+        """Return the stored updater state."""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _save_state(self, **changes: Any) -> None:
+        """Update fields of the stored updater state."""
+        state = self._load_state()
+        state.update(changes)
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            with open(self.state_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+        except OSError:
+            pass
+
+    def _binary_signature(self) -> Optional[List[float]]:
+        """Return the size and modification time of yt-dlp.exe, if it exists."""
+        try:
+            info = os.stat(self.yt_dlp_path)
+        except OSError:
+            return None
+        return [info.st_size, info.st_mtime]
+
+    def installed_version(self) -> Optional[str]:
+        """
+        Return the version of bin/yt-dlp.exe.
+
+        The version is read by running ``yt-dlp.exe --version`` once and
+        cached until the file changes, so checks do not start the binary.
+
+        Returns:
+            Version string, or None if yt-dlp.exe is missing or unusable
+        """
+        signature = self._binary_signature()
+        if signature is None:
+            return None
+
+        installed = self._load_state().get("installed") or {}
+        if installed.get("signature") == signature:
+            return installed.get("version")
+
+        try:
+            result = subprocess.run(
+                [self.yt_dlp_path, "--version"],
+                capture_output=True,
+                text=True,
+                timeout=60,
+                check=True,
+                creationflags=creation_flags(),
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        version = result.stdout.strip()
+        self._save_state(installed={"version": version, "signature": signature})
+        return version
+
+    def check_due(self) -> bool:
+        """Return True if the last completed check is CHECK_INTERVAL ago."""
+        checked = self._load_state().get("checked", 0)
+        return time.time() - checked >= self.CHECK_INTERVAL
+
+    def _load_release_cache(self) -> Optional[Dict[str, Any]]:
+        """Return the cached release response with its ETag, if any."""
+        try:
+            with open(self.release_cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict) or "etag" not in cached:
+            return None
+        return cached
+
+    def _save_release_cache(self, etag: str, release: Dict[str, Any]) -> None:
+        """Store a release response and its ETag."""
+        try:
+            os.makedirs(os.path.dirname(self.release_cache_path), exist_ok=True)
+            with open(self.release_cache_path, "w", encoding="utf-8") as f:
+                json.dump({"etag": etag, "release": release}, f)
+        except OSError:
+            # The cache only saves a request, updates work without it
+            pass
+
     def get_latest_yt_version(self) -> Tuple[str, List[Dict]]:
         """
         Fetch the latest yt-dlp version information from GitHub API.
 
+        The request carries the ETag of the last response, so an unchanged
+        release is answered with 304 Not Modified, which has no body and
+        does not count against GitHub's rate limit.
+
         Returns:
             Tuple containing version string and list of release assets
 
         Raises:
-            urllib.error.URLError: If API request fails
+            OSError: If API request fails (HttpError for error statuses)
             json.JSONDecodeError: If response is not valid JSON
         """
-        with urllib.request.urlopen(self.YTDLP_RELEASES) as resp:
-            data = json.load(resp)
+        headers = {"Accept": "application/vnd.github+json"}
+        cached = self._load_release_cache()
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+
+        with self.client.get(self.YTDLP_RELEASES, headers) as resp:
+            if resp.status == 304 and cached:
+                data = cached["release"]
+            else:
+                data = resp.json()
+                etag = resp.headers.get("ETag")
+                if etag:
+                    self._save_release_cache(etag, data)
 
         version = data.get("tag_name", "").lstrip("release/")
         assets = data.get("assets", [])
 
         return version, assets
 
-    def download_yt(self, progress_callback: Callable[[str], None]) -> None:
+    def update_yt(
+        self,
+        progress_callback: Callable[[str], None],
+        bytes_callback: Optional[Callable[[int, int], None]] = None,
+        force: bool = False,
+    ) -> bool:
+        """
+        Install the latest yt-dlp unless it is installed already.
+
+        Without ``force`` nothing is requested if the last completed check
+        was less than CHECK_INTERVAL ago. A check completes when yt-dlp is
+        found up to date or has been updated, so a failed update is tried
+        again on the next call.
+
+        Args:
+            progress_callback: Function to call with progress updates
+            bytes_callback: Called with the bytes downloaded and the total
+                size (0 if unknown) while the executable downloads
+            force: Check even if the last check was recent
+
+        Returns:
+            True if a new version was installed
+
+        Raises:
+            Exception: If the check, download or installation fails
+        """
+        if not force and not self.check_due():
+            return False
+
+        version, assets = self.get_latest_yt_version()
+        installed = self.installed_version()
+        if installed and version_key(installed) >= version_key(version):
+            self._save_state(checked=time.time())
+            progress_callback(f"yt-dlp {installed} is up to date.")
+            return False
+
+        self.download_yt(progress_callback, bytes_callback, (version, assets))
+        self._save_state(checked=time.time())
+        return True
+
+    def _expected_sha256(self, assets: List[Dict], name: str) -> Optional[str]:
+        """
+        Read the SHA-256 of an asset from the release's checksum file.
+
+        Returns:
+            Hex digest, or None if the release has no checksum for the asset
+        """
+        sums = next((a for a in assets if a["name"] == self.CHECKSUM_ASSET), None)
+        if not sums:
+            return None
+        with self.client.get(sums["browser_download_url"]) as response:
+            text = response.read().decode("utf-8", "replace")
+
+        # Lines are "<digest>  <name>", binary files may be marked "*<name>"
+        for line in text.splitlines():
+            parts = line.split(None, 1)
+            if len(parts) == 2 and parts[1].strip().lstrip("*") == name:
+                return parts[0].lower()
+        return None
+
+    def download_yt(
+        self,
+        progress_callback: Callable[[str], None],
+        bytes_callback: Optional[Callable[[int, int], None]] = None,
+        release: Optional[Tuple[str, List[Dict]]] = None,
+    ) -> None:
         """
         Download and install the latest yt-dlp executable.
 
+        The file is streamed to disk in chunks while its SHA-256 is
+        computed, and only replaces the installed executable if it matches
+        the checksum published with the release.
+
         Args:
             progress_callback: Function to call with progress updates
+            bytes_callback: Called with the bytes downloaded and the total
+                size (0 if unknown) after every chunk
+            release: Version and assets from get_latest_yt_version(), fetched
+                if not given
 
         Raises:
+            ValueError: If the release has no executable or the download
+                does not match the published checksum
             Exception: If download or installation fails
         """
-        version, assets = self.get_latest_yt_version()
+        version, assets = release or self.get_latest_yt_version()
 
         # Find the executable asset in the release
         exe_asset = next((a for a in assets if a["name"].endswith(".exe")), None)
         if not exe_asset:
-            progress_callback("No yt-dlp executable found in release assets.")
-            return
+            raise ValueError("No yt-dlp executable found in release assets")
 
         url = exe_asset["browser_download_url"]
         target = self.yt_dlp_path
+        expected = self._expected_sha256(assets, exe_asset["name"])
 
         progress_callback(f"Downloading yt-dlp {version}...")
 
         # Download to temporary file first, then replace existing
         temp_path = target + ".new"
         try:
-            with urllib.request.urlopen(url) as response, open(temp_path, "wb") as file:
-                shutil.copyfileobj(response, file)
+            digest = hashlib.sha256()
+            with self.client.get(url) as response, open(temp_path, "wb") as file:
+                total = int(response.headers.get("Content-Length") or 0)
+                done = 0
+                while True:
+                    chunk = response.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    file.write(chunk)
+                    digest.update(chunk)
+                    done += len(chunk)
+                    if bytes_callback:
+                        bytes_callback(done, total)
+
+            if expected is None:
+                progress_callback(
+                    f"No checksum published for {exe_asset['name']}, not verified."
+                )
+            elif digest.hexdigest() != expected:
+                raise ValueError(
+                    f"Checksum mismatch for {exe_asset['name']}: "
+                    f"expected {expected}, got {digest.hexdigest()}"
+                )
 
             # Atomically replace the old file
             os.replace(temp_path, target)
@@ -89,6 +329,10 @@ class Updater:
             # Set executable permissions (Unix-style, may not work on Windows)
             os.chmod(target, stat.S_IEXEC | stat.S_IREAD | stat.S_IWRITE)
 
+            # The new binary reports the release version, no need to run it
+            signature = self._binary_signature()
+            self._save_state(installed={"version": version, "signature": signature})
+
             progress_callback(f"yt-dlp updated to {version} at {target}")
 
         except Exception as e:
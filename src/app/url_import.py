@@ -0,0 +1,272 @@
+"""
+Parsing, normalization and expansion of bulk-imported YouTube URLs.
+
+Pasted text, .txt and .csv files are split into URLs, each URL is reduced
+to the canonical form of the video, playlist or channel it points to, and
+duplicates are dropped by that canonical key. Playlists and channels are
+then listed concurrently with a bounded number of yt-dlp processes.
+
+Qt-free like the engine; the GUI runs it in a background thread.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from .download_index import video_id_from_url
+
+# URL types
+URL_VIDEO = "video"
+URL_PLAYLIST = "playlist"
+URL_CHANNEL = "channel"
+
+# Playlists and channels listed at the same time during an import
+EXPANSION_WORKERS = 4
+
+# Host names of YouTube pages, without "www." or "m."
+_YOUTUBE_HOSTS = {"youtube.com", "music.youtube.com", "youtube-nocookie.com"}
+
+# Separators between URLs in pasted text and CSV cells
+_TOKEN_SPLIT_RE = re.compile(r"[\s,;]+")
+
+# Characters quoting URLs in CSV files, HTML or chat messages
+_QUOTES = "\"'<>()[]"
+
+# Channel pages: /@handle, /channel/UC..., /c/name and /user/name
+_CHANNEL_PREFIXES = ("channel", "c", "user")
+
+
+@dataclass(frozen=True)
+class ImportedUrl:
+    """A recognized URL in its canonical form."""
+
+    # URL_VIDEO, URL_PLAYLIST or URL_CHANNEL
+    url_type: str
+
+    # Video ID, playlist ID or channel path ("@name" in lower case,
+    # "channel/UC..."); duplicates are detected by this key
+    key: str
+
+    # Canonical URL of the video, playlist or channel
+    url: str
+
+
+def _host(netloc: str) -> str:
+    """Return a host name without port, "www." and "m." prefixes."""
+    host = netloc.lower().rsplit("@", 1)[-1].split(":", 1)[0]
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix) :]
+    return host
+
+
+def classify_url(text: str) -> Optional[ImportedUrl]:
+    """
+    Recognize a YouTube video, playlist or channel URL.
+
+    Watch URLs with both a video and a playlist count as videos; playlist
+    pages count as playlists. Channel URLs lose their tab (/videos, ...)
+    and query, the download mode decides which tab is listed.
+
+    Args:
+        text: URL, with or without scheme
+
+    Returns:
+        Canonical URL, or None if the text is not a supported YouTube URL
+    """
+    text = text.strip().strip(_QUOTES)
+    if "://" not in text:
+        text = "https://" + text
+    parts = urlsplit(text)
+    if parts.scheme not in ("http", "https"):
+        return None
+
+    host = _host(parts.netloc)
+    if host == "youtu.be" or host in _YOUTUBE_HOSTS:
+        segments = [segment for segment in parts.path.split("/") if segment]
+        query = parse_qs(parts.query)
+
+        if host != "youtu.be" and segments[:1] == ["playlist"]:
+            return _playlist(query)
+
+        video_id = video_id_from_url(text)
+        if video_id:
+            return ImportedUrl(
+                URL_VIDEO, video_id, f"https://www.youtube.com/watch?v={video_id}"
+            )
+        if host == "youtu.be":
+            return None
+
+        if "list" in query:
+            return _playlist(query)
+
+        if segments and segments[0].startswith("@") and len(segments[0]) > 1:
+            path = segments[0]
+            # Handles are not case-sensitive, but the URL keeps the case as
+            # typed so it shares the listing cache and download archive
+            # with the same URL entered in the URL field
+            key = path.lower()
+        elif len(segments) >= 2 and segments[0] in _CHANNEL_PREFIXES:
+            path = key = f"{segments[0]}/{segments[1]}"
+        else:
+            return None
+        return ImportedUrl(URL_CHANNEL, key, f"https://www.youtube.com/{path}")
+    return None
+
+
+def playlist_from_url(text: str) -> Optional[ImportedUrl]:
+    """
+    Return the playlist of a YouTube URL, also of a watch URL in a playlist.
+
+    Args:
+        text: URL, with or without scheme
+
+    Returns:
+        Canonical playlist URL, or None if the URL has no playlist
+    """
+    text = text.strip().strip(_QUOTES)
+    if "://" not in text:
+        text = "https://" + text
+    parts = urlsplit(text)
+    host = _host(parts.netloc)
+    if host != "youtu.be" and host not in _YOUTUBE_HOSTS:
+        return None
+    return _playlist(parse_qs(parts.query))
+
+
+def _playlist(query: dict) -> Optional[ImportedUrl]:
+    """Return the canonical playlist from a parsed query, if it has one."""
+    playlist_ids = query.get("list")
+    if not playlist_ids or not playlist_ids[0]:
+        return None
+    playlist_id = playlist_ids[0]
+    return ImportedUrl(
+        URL_PLAYLIST,
+        playlist_id,
+        f"https://www.youtube.com/playlist?list={playlist_id}",
+    )
+
+
+def split_urls(text: str) -> List[str]:
+    """
+    Split pasted text or file contents into URL candidates.
+
+    Lines starting with # are comments. Tokens are separated by white
+    space, commas and semicolons, so CSV files work without a header
+    setting; tokens that do not look like URLs (titles, numbers) are
+    skipped.
+
+    Args:
+        text: Pasted text or file contents
+
+    Returns:
+        URL candidates in input order
+    """
+    candidates = []
+    for line in text.splitlines():
+        if line.lstrip().startswith("#"):
+            continue
+        for token in _TOKEN_SPLIT_RE.split(line):
+            token = token.strip(_QUOTES)
+            if "youtu" in token.lower() or token.lower().startswith("http"):
+                candidates.append(token)
+    return candidates
+
+
+def read_url_file(path: str) -> str:
+    """
+    Read a .txt or .csv file of URLs.
+
+    Args:
+        path: File path
+
+    Returns:
+        File contents, without a byte order mark
+    """
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        return f.read()
+
+
+def collect_urls(candidates: Iterable[str]) -> Tuple[List[ImportedUrl], int, List[str]]:
+    """
+    Normalize URL candidates and drop duplicates.
+
+    Args:
+        candidates: URLs as found in the input
+
+    Returns:
+        Tuple of (unique canonical URLs in input order, number of
+        duplicates dropped, candidates that are not YouTube URLs)
+    """
+    urls: List[ImportedUrl] = []
+    seen = set()
+    duplicates = 0
+    invalid: List[str] = []
+    for candidate in candidates:
+        imported = classify_url(candidate)
+        if imported is None:
+            invalid.append(candidate)
+            continue
+        identity = (imported.url_type, imported.key)
+        if identity in seen:
+            duplicates += 1
+            continue
+        seen.add(identity)
+        urls.append(imported)
+    return urls, duplicates, invalid
+
+
+def count_types(urls: Iterable[ImportedUrl]) -> Dict[str, int]:
+    """
+    Count the videos, playlists and channels among imported URLs.
+
+    Args:
+        urls: Canonical URLs
+
+    Returns:
+        Mapping of every URL type to its count
+    """
+    counts = {URL_VIDEO: 0, URL_PLAYLIST: 0, URL_CHANNEL: 0}
+    for imported in urls:
+        counts[imported.url_type] += 1
+    return counts
+
+
+ExpandResult = Union[List[Tuple[str, str]], Exception]
+
+
+def expand_concurrently(
+    urls: List[ImportedUrl],
+    expand: Callable[[ImportedUrl], List[Tuple[str, str]]],
+    max_workers: int = EXPANSION_WORKERS,
+) -> Iterator[Tuple[ImportedUrl, ExpandResult]]:
+    """
+    List playlists and channels in a bounded thread pool.
+
+    Every listing runs its own yt-dlp process, so at most ``max_workers``
+    run at once. Results are yielded as soon as each listing finishes.
+
+    Args:
+        urls: Playlists and channels to list
+        expand: Function listing one URL as (video_url, title) tuples
+        max_workers: Maximum number of listings running at once
+
+    Yields:
+        Tuples of (url, entries), with the exception instead of the
+        entries if listing failed
+    """
+    if not urls:
+        return
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(urls))),
+        thread_name_prefix="url-import",
+    ) as executor:
+        futures = {executor.submit(expand, url): url for url in urls}
+        for future in as_completed(futures):
+            try:
+                result: ExpandResult = future.result()
+            except Exception as e:
+                result = e
+            yield futures[future], result
@@ -0,0 +1,161 @@
+"""
+In-process yt-dlp backend using the optional yt_dlp Python package.
+
+Starting bin/yt-dlp.exe costs one to three seconds per call on Windows:
+the PyInstaller bundle is unpacked and the extractors are imported again
+every time. This backend runs the same command line through
+``yt_dlp.YoutubeDL`` in long-lived worker processes that import yt-dlp
+once. yt_dlp is never imported by the GUI or batch mode process itself,
+only by the workers.
+
+Each worker also keeps its last ``YoutubeDL`` instance. Downloads with the
+same options reuse it, and with it yt-dlp's HTTP session: metadata and
+format requests to YouTube go over connections that are already open.
+"""
+
+import importlib.util
+import json
+import subprocess
+from typing import Any, Callable, List, Optional, Tuple
+
+
+def is_available() -> bool:
+    """Return True if the yt_dlp package is installed."""
+    return importlib.util.find_spec("yt_dlp") is not None
+
+
+def warm_up() -> None:
+    """
+    Import yt-dlp and its extractors.
+
+    Used as initializer of the worker processes, so downloads do not pay
+    for the imports.
+    """
+    from yt_dlp.extractor import gen_extractor_classes
+
+    gen_extractor_classes()
+
+
+class LineLogger:
+    """
+    yt-dlp logger passing every message line to a callback.
+
+    With a logger, yt-dlp sends its screen output (including
+    ``--progress-template`` output) to debug(), warnings and errors
+    without the console formatting. ``--print`` output does not go through
+    the logger: YoutubeDL.to_stdout() writes it to the process's stdout, so
+    _get_session() points to_stdout() at stdout() instead.
+    """
+
+    def __init__(self, on_line: Callable[[str], None]):
+        """
+        Initialize the logger.
+
+        Args:
+            on_line: Called with every line, as printed by yt-dlp.exe
+        """
+        self.on_line = on_line
+        self.last_error: Optional[str] = None
+
+    def reset(self, on_line: Callable[[str], None]) -> None:
+        """Direct the lines of the next download to another callback."""
+        self.on_line = on_line
+        self.last_error = None
+
+    def _emit(self, message: str) -> None:
+        """Pass the lines of a message to the callback."""
+        for line in str(message).splitlines():
+            self.on_line(line)
+
+    def stdout(self, message: str, *args: Any, **kwargs: Any) -> None:
+        """Handle ``--print`` output, replacing YoutubeDL.to_stdout()."""
+        self._emit(message)
+
+    def debug(self, message: str) -> None:
+        """Handle normal output and debug messages."""
+        self._emit(message)
+
+    def info(self, message: str) -> None:
+        """Handle informational messages."""
+        self._emit(message)
+
+    def warning(self, message: str) -> None:
+        """Handle warnings, prefixed like on the console."""
+        self._emit(f"WARNING: {message}")
+
+    def error(self, message: str) -> None:
+        """Handle errors; they already start with "ERROR:"."""
+        self.last_error = str(message)
+        self._emit(message)
+
+
+# Options key, YoutubeDL instance and its logger of the last download
+_session: Optional[Tuple[str, Any, LineLogger]] = None
+
+
+def _options_key(options: dict) -> str:
+    """Return a string identifying a set of YoutubeDL options."""
+    return json.dumps(options, sort_keys=True, default=repr)
+
+
+def _get_session(
+    options: dict, on_line: Callable[[str], None]
+) -> Tuple[Any, LineLogger]:
+    """Return the YoutubeDL instance for the options, reusing the last one."""
+    global _session
+    import yt_dlp
+
+    key = _options_key(options)
+    if _session is not None and _session[0] == key:
+        ydl, logger = _session[1], _session[2]
+        logger.reset(on_line)
+        return ydl, logger
+
+    close_session()
+    logger = LineLogger(on_line)
+    ydl = yt_dlp.YoutubeDL(dict(options, logger=logger))
+    # The metadata and file path lines are printed with --print
+    ydl.to_stdout = logger.stdout
+    _session = (key, ydl, logger)
+    return ydl, logger
+
+
+def close_session() -> None:
+    """Close the kept YoutubeDL instance and its connections."""
+    global _session
+    if _session is not None:
+        ydl = _session[1]
+        _session = None
+        ydl.close()
+
+
+def download(args: List[str], on_line: Callable[[str], None]) -> None:
+    """
+    Run a yt-dlp command line in this process.
+
+    The YoutubeDL instance is kept for the next download with the same
+    options. After an error it is closed, because YoutubeDL remembers a
+    failed download and would report it again.
+
+    Args:
+        args: yt-dlp arguments, without the executable
+        on_line: Called with every output line
+
+    Raises:
+        subprocess.CalledProcessError: If yt-dlp reports an error, with the
+            last error message as output
+    """
+    import yt_dlp
+
+    parsed = yt_dlp.parse_options(args)
+    ydl, logger = _get_session(parsed.ydl_opts, on_line)
+    try:
+        code = ydl.download(parsed.urls)
+    except BaseException:
+        close_session()
+        raise
+    if code:
+        close_session()
+        raise subprocess.CalledProcessError(
+            code, ["yt-dlp"] + args, output=logger.last_error
+        )
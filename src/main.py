@@ -6,40 +6,77 @@ License: MIT
 Repository: https://github.com/uikraft-hub/yt-downloader-gui
 """
 
+import time
+
+# Taken before any other import, the startup trace measures from here
+START_TIME = time.perf_counter()
+
+import multiprocessing
 import sys
 import os
-from PyQt6.QtWidgets import QApplication
-from app.main_window import YTDGUI
+
+
+def get_base_dir() -> str:
+    """Determine the application base directory."""
+    if getattr(sys, "frozen", False):
+        # Running as compiled executable
+        return os.path.dirname(sys.executable)
+    # Running as Python script
+    return os.path.dirname(os.path.abspath(__file__))
 
 
 def main():
     """
     Main application entry point.
 
-    Initializes the Qt application and starts the main event loop.
+    Runs headless batch mode when started with --batch, otherwise
+    initializes the Qt application and starts the main event loop.
     """
+    # Batch mode never imports PyQt6; argparse also accepts --batch=FILE
+    if any(arg == "--batch" or arg.startswith("--batch=") for arg in sys.argv[1:]):
+        from app import cli
+
+        sys.exit(cli.main(sys.argv[1:], get_base_dir()))
+
+    from app.startup import TRACE_FLAG, StartupTrace
+
+    trace = StartupTrace(START_TIME)
+
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    from app.main_window import YTDGUI
+
+    trace.mark("imports")
+
     # Create Qt application
     app = QApplication(sys.argv)
 
     # Set application metadata
     app.setApplicationName("yt-downloader-gui")
     app.setApplicationVersion("1.0.0")
-
-    # Determine application base directory
-    if getattr(sys, "frozen", False):
-        # Running as compiled executable
-        base_dir = os.path.dirname(sys.executable)
-    else:
-        # Running as Python script
-        base_dir = os.path.dirname(os.path.abspath(__file__))
+    trace.mark("application")
 
     # Create and show main window
-    window = YTDGUI(base_dir)
+    window = YTDGUI(get_base_dir())
+    trace.mark("window")
     window.show()
 
+    def first_window_shown() -> None:
+        """Record the time to first window once the event loop runs."""
+        trace.mark("first window")
+        window.log_message(trace.format())
+        if TRACE_FLAG in sys.argv[1:]:
+            print(trace.to_json(), flush=True)
+            app.quit()
+
+    # Posted paint events are handled before timers fire
+    QTimer.singleShot(0, first_window_shown)
+
     # Start event loop
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
+    # Download worker processes start this executable again when frozen
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,211 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the 'src' directory to the Python path to allow for absolute imports
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, SRC_DIR)
+
+from app import cli
+from app.download_index import DownloadIndex
+from app.queue_store import QueueStore
+from app.tasks import DownloadTask, PlaylistEntry
+
+
+class TestCli(unittest.TestCase):
+    """Tests for the headless batch mode."""
+
+    def setUp(self):
+        """Create a batch file and a queue database in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.batch = os.path.join(self.temp_dir.name, "urls.txt")
+        with open(self.batch, "w", encoding="utf-8") as f:
+            f.write("https://y/watch?v=a\n# comment\n\nhttps://y/watch?v=b\n")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def _args(self, *extra):
+        """Parse batch arguments using the temporary queue database."""
+        queue = os.path.join(self.temp_dir.name, "queue.db")
+        metrics = os.path.join(self.temp_dir.name, "metrics.jsonl")
+        argv = ["--batch", self.batch, "--out", "/fake", "--queue", queue]
+        index = os.path.join(self.temp_dir.name, "downloads.db")
+        argv += ["--metrics", metrics, "--index", index]
+        return cli.build_parser().parse_args(argv + list(extra))
+
+    def test_read_urls_skips_comments_and_duplicates(self):
+        """Test reading URLs from a batch file."""
+        stream = io.StringIO("a\n# b\n\na\n c \n")
+
+        self.assertEqual(cli.read_urls(stream), ["a", "c"])
+
+    def test_expand_url_single_video(self):
+        """Test that a single-video URL becomes one task without listing."""
+        args = self._args("--mode", "MP3 Only", "--audio-quality", "192")
+
+        tasks = cli.expand_url(args, SRC_DIR, "https://y/watch?v=a")
+
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0].audio_quality, "192")
+        self.assertEqual(tasks[0].concurrent_fragments, 4)
+
+    def test_expand_url_transfer_options(self):
+        """Test that transfer options are stored with the tasks."""
+        args = self._args("--fragments", "8", "--http-chunk-size", "10M", "--aria2c")
+
+        task = cli.expand_url(args, SRC_DIR, "https://y/watch?v=a")[0]
+
+        self.assertEqual(task.concurrent_fragments, 8)
+        self.assertEqual(task.http_chunk_size, 10 * 1024 * 1024)
+        self.assertEqual(task.downloader, "aria2c")
+
+    def test_expand_url_original_audio_format(self):
+        """Test that --audio-format original keeps the downloaded codec."""
+        args = self._args("--mode", "MP3 Only", "--audio-format", "original")
+
+        task = cli.expand_url(args, SRC_DIR, "https://y/watch?v=a")[0]
+
+        self.assertEqual(task.audio_format, "original")
+        self.assertFalse(task.transcodes_audio)
+
+    @patch("app.cli.iter_flat_entries")
+    def test_expand_url_channel_filters_shorts(self, mock_entries):
+        """Test that channel listings keep only entries matching the mode."""
+        mock_entries.return_value = iter(
+            [
+                PlaylistEntry("a", "https://y/shorts/a", "A", is_short=True),
+                PlaylistEntry("b", "https://y/watch?v=b", "B"),
+            ]
+        )
+        args = self._args("--mode", "Channel Shorts")
+
+        tasks = cli.expand_url(args, SRC_DIR, "https://www.youtube.com/@name")
+
+        mock_entries.assert_called_once_with(
+            SRC_DIR, "https://www.youtube.com/@name/shorts"
+        )
+        self.assertEqual([t.title for t in tasks], ["A"])
+        self.assertIsNotNone(tasks[0].archive)
+
+    @patch("app.engine.run_download")
+    def test_run_batch_downloads_all_urls(self, mock_run):
+        """Test that every URL is downloaded and the batch succeeds."""
+        with patch("sys.stdout", new=io.StringIO()):
+            code = cli.run_batch(self._args("--jobs", "2"), SRC_DIR)
+
+        self.assertEqual(code, 0)
+        urls = sorted(call[0][0].url for call in mock_run.call_args_list)
+        self.assertEqual(urls, ["https://y/watch?v=a", "https://y/watch?v=b"])
+
+    @patch("app.engine.run_download")
+    def test_run_batch_splits_rate_limit(self, mock_run):
+        """Test that --limit-rate is shared by the concurrent downloads."""
+        with patch("sys.stdout", new=io.StringIO()):
+            cli.run_batch(self._args("--jobs", "2", "--limit-rate", "2M"), SRC_DIR)
+
+        rates = [call[0][0].rate_limit for call in mock_run.call_args_list]
+        self.assertEqual(rates, [1024 * 1024] * 2)
+
+    @patch("app.engine.run_download")
+    def test_run_batch_reports_failures(self, mock_run):
+        """Test that a failed download gives a non-zero exit code."""
+        mock_run.side_effect = [None, subprocess.CalledProcessError(1, "yt-dlp")]
+
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            code = cli.run_batch(self._args("--jobs", "1"), SRC_DIR)
+
+        self.assertEqual(code, 1)
+        self.assertIn("FAILED", output.getvalue())
+
+    @patch("app.engine.run_download")
+    def test_run_batch_skips_downloaded_videos(self, mock_run):
+        """Test that videos already in the output folder are not queued."""
+        out = os.path.join(self.temp_dir.name, "out")
+        os.makedirs(out)
+        index = DownloadIndex(os.path.join(self.temp_dir.name, "downloads.db"))
+        open(os.path.join(out, "A.mp4"), "w").close()
+        index.add(os.path.join(out, "A.mp4"), "a")
+        index.close()
+
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            cli.run_batch(self._args("--out", out), SRC_DIR)
+
+        urls = [call[0][0].url for call in mock_run.call_args_list]
+        self.assertEqual(urls, ["https://y/watch?v=b"])
+        self.assertIn("Skipping 1 already downloaded", output.getvalue())
+
+    @patch("app.engine.run_download")
+    def test_run_batch_resumes_interrupted_download(self, mock_run):
+        """Test that a download left running continues once from its partial file."""
+        stream = os.path.join(self.temp_dir.name, "B.f137.mp4")
+        with open(stream + ".part", "wb") as f:
+            f.write(b"x" * 1024)
+        store = QueueStore(os.path.join(self.temp_dir.name, "queue.db"))
+        # Left over from the same batch file, which is run again
+        task = DownloadTask.create("https://y/watch?v=b", "/fake", "Single Video")
+        task.title = "B"
+        task.destinations = [stream]
+        store.append(task.to_dict())
+        store.pop_next()  # Left running, as after a crash
+        store.close()
+
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            cli.run_batch(self._args(), SRC_DIR)
+
+        urls = [call[0][0].url for call in mock_run.call_args_list]
+        self.assertEqual(sorted(urls), ["https://y/watch?v=a", task.url])
+        self.assertIn("Resuming B: 1.00KiB kept", output.getvalue())
+        self.assertIn("Skipping 1 already queued", output.getvalue())
+
+    @patch("app.ytdlp_api.is_available", return_value=False)
+    @patch("app.engine.run_download")
+    def test_run_batch_backend_falls_back(self, mock_run, mock_available):
+        """Test that --backend api uses yt-dlp.exe without the yt_dlp package."""
+        with patch("sys.stdout", new=io.StringIO()), patch(
+            "sys.stderr", new=io.StringIO()
+        ) as errors:
+            code = cli.run_batch(self._args("--backend", "api"), SRC_DIR)
+
+        self.assertEqual(code, 0)
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertIn("yt_dlp package not found", errors.getvalue())
+
+    def test_batch_mode_does_not_import_qt(self):
+        """Test that batch mode starts without loading PyQt6."""
+        code = (
+            "import sys; sys.argv = ['main.py', '--batch', '-'];"
+            f"sys.path.insert(0, {SRC_DIR!r});"
+            "from app import cli; import main;"
+            "print('PyQt6' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_batch_option_with_equals_sign(self):
+        """Test that --batch=FILE also runs batch mode instead of the GUI."""
+        code = (
+            "import sys; sys.argv = ['main.py', '--batch=urls.txt'];"
+            f"sys.path.insert(0, {SRC_DIR!r});"
+            "from app import cli; import main;"
+            "cli.main = lambda argv, base_dir: print(argv) or 0\n"
+            "try:\n    main.main()\nexcept SystemExit:\n    pass\n"
+            "print('PyQt6' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(result.stdout.splitlines(), ["['--batch=urls.txt']", "False"])
+
+
+if __name__ == "__main__":
+    unittest.main()
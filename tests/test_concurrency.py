@@ -0,0 +1,146 @@
+import os
+import sys
+import unittest
+
+# Add the 'src' directory to the Python path to allow for absolute imports
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app.concurrency import (
+    ADJUST_INTERVAL,
+    HOLD_WINDOWS,
+    ConcurrencyController,
+    is_throttle_error,
+    parse_rate,
+)
+
+
+class TestConcurrencyController(unittest.TestCase):
+    """Tests for the adaptive concurrency controller."""
+
+    def _window(self, controller, now, speed_per_job, errors=()):
+        """Run one measurement window with every allowed job busy."""
+        for key in range(controller.limit):
+            controller.started(key)
+        for key in range(controller.limit):
+            controller.progress(key, speed_per_job(controller.limit))
+        for key, error in enumerate(errors):
+            controller.finished(key, error)
+        for key in range(len(errors), controller.limit):
+            controller.finished(key)
+        return controller.update(now)
+
+    def test_fixed_bounds_keep_limit(self):
+        """Test that equal bounds disable adaptation."""
+        controller = ConcurrencyController(3, 3)
+
+        self._window(controller, ADJUST_INTERVAL, lambda jobs: 1000)
+
+        self.assertFalse(controller.adaptive)
+        self.assertEqual(controller.limit, 3)
+
+    def test_no_change_before_interval(self):
+        """Test that the limit changes at most once per window."""
+        controller = ConcurrencyController(1, 8)
+        controller._reset_window(0.0)
+
+        self.assertFalse(self._window(controller, ADJUST_INTERVAL / 2, lambda j: 1))
+
+    def test_additive_increase_while_throughput_grows(self):
+        """Test that a growing combined speed adds one download per window."""
+        controller = ConcurrencyController(1, 8)
+        controller._reset_window(0.0)
+        start = controller.limit
+
+        # Every job gets the same speed, so the total keeps growing
+        for window in range(1, 4):
+            self._window(controller, window * ADJUST_INTERVAL, lambda jobs: 1000)
+
+        self.assertEqual(controller.limit, start + 3)
+
+    def test_backs_off_when_link_is_saturated(self):
+        """Test that an extra download without more throughput is removed."""
+        controller = ConcurrencyController(1, 8)
+        controller._reset_window(0.0)
+        start = controller.limit
+
+        # The link carries 4000 B/s in total no matter how many jobs run
+        self._window(controller, ADJUST_INTERVAL, lambda jobs: 4000 / jobs)
+        self._window(controller, 2 * ADJUST_INTERVAL, lambda jobs: 4000 / jobs)
+
+        self.assertEqual(controller.limit, start)
+
+        # The limit is held for a few windows before probing again
+        for window in range(3, 3 + HOLD_WINDOWS):
+            self._window(controller, window * ADJUST_INTERVAL, lambda j: 4000 / j)
+        self.assertEqual(controller.limit, start)
+
+    def test_multiplicative_decrease_on_throttling(self):
+        """Test that HTTP 429 errors halve the limit."""
+        controller = ConcurrencyController(1, 8)
+        controller.limit = 6
+        controller._reset_window(0.0)
+
+        self._window(
+            controller, ADJUST_INTERVAL, lambda j: 1000, ["HTTP Error 429: Too Many"]
+        )
+
+        self.assertEqual(controller.limit, 3)
+
+    def test_multiplicative_decrease_on_error_rate(self):
+        """Test that mostly failing downloads halve the limit."""
+        controller = ConcurrencyController(2, 8)
+        controller.limit = 4
+        controller._reset_window(0.0)
+
+        self._window(controller, ADJUST_INTERVAL, lambda j: 1000, ["a", "b", "c"])
+
+        self.assertEqual(controller.limit, 2)
+
+    def test_no_increase_without_queued_work(self):
+        """Test that the limit stays when fewer downloads run than allowed."""
+        controller = ConcurrencyController(1, 8)
+        controller._reset_window(0.0)
+        limit = controller.limit
+        controller.started("a")
+        controller.progress("a", 1000)
+
+        controller.update(ADJUST_INTERVAL)
+
+        self.assertEqual(controller.limit, limit)
+
+    def test_active_counts_transferring_downloads(self):
+        """Test that finished downloads no longer occupy a slot."""
+        controller = ConcurrencyController(2, 2)
+        controller.started("a")
+        controller.started("b")
+        controller.finished("a")
+
+        self.assertEqual(controller.active, 1)
+
+    def test_job_rate_limit_is_split(self):
+        """Test that the global speed limit is shared by the allowed jobs."""
+        controller = ConcurrencyController(4, 4, rate_limit=4 * 1024 * 1024)
+
+        self.assertEqual(controller.job_rate_limit(), 1024 * 1024)
+        controller.rate_limit = None
+        self.assertIsNone(controller.job_rate_limit())
+
+    def test_parse_rate(self):
+        """Test parsing of --limit-rate values."""
+        self.assertEqual(parse_rate("500K"), 500 * 1024)
+        self.assertEqual(parse_rate("2.5M"), int(2.5 * 1024 * 1024))
+        self.assertEqual(parse_rate("1048576"), 1048576)
+        self.assertEqual(parse_rate("1MiB/s"), 1024 * 1024)
+        with self.assertRaises(ValueError):
+            parse_rate("fast")
+
+    def test_is_throttle_error(self):
+        """Test recognizing rate limiting errors."""
+        self.assertTrue(is_throttle_error("ERROR: HTTP Error 429: Too Many Requests"))
+        self.assertFalse(is_throttle_error("ERROR: Video unavailable"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the 'src' directory to the Python path to allow for absolute imports
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app.download_index import (
+    KIND_AUDIO,
+    KIND_VIDEO,
+    DownloadIndex,
+    file_sha256,
+    title_stem,
+    video_id_from_url,
+)
+from app.tasks import DownloadTask
+
+
+class TestDownloadIndex(unittest.TestCase):
+    """Tests for the index of downloaded files."""
+
+    def setUp(self):
+        """Create an empty download folder and an in-memory index."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self.temp_dir.name
+        self.index = DownloadIndex(":memory:")
+
+    def tearDown(self):
+        """Close the index and remove the folder."""
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def _create(self, name):
+        """Create a file in the download folder and return its path."""
+        path = os.path.join(self.folder, name)
+        with open(path, "wb") as f:
+            f.write(b"data")
+        return path
+
+    def test_video_id_from_url(self):
+        """Test extracting IDs from the different YouTube URL shapes."""
+        self.assertEqual(video_id_from_url("https://www.youtube.com/watch?v=a1"), "a1")
+        self.assertEqual(video_id_from_url("https://youtu.be/a2?t=3"), "a2")
+        self.assertEqual(video_id_from_url("https://youtube.com/shorts/a3"), "a3")
+        self.assertIsNone(video_id_from_url("https://www.youtube.com/@channel"))
+
+    def test_title_stem_replaces_reserved_characters(self):
+        """Test that titles are mapped like yt-dlp names files."""
+        self.assertEqual(title_stem('Q&A: "Why?" 1/2 '), "Q&A： ＂Why？＂ 1⧸2")
+
+    def test_record_and_lookup_by_id(self):
+        """Test that a finished task is found again by its URL."""
+        task = DownloadTask.create("https://y/watch?v=abc", self.folder, "MP3 Only")
+        task.filepath = self._create("Song.mp3")
+
+        self.assertTrue(self.index.record(task))
+
+        found = self.index.lookup(
+            self.folder, KIND_AUDIO, [("https://y/watch?v=abc", "Other title")]
+        )
+        self.assertEqual(found, {"https://y/watch?v=abc": task.filepath})
+        self.assertEqual(self.index.lookup(self.folder, KIND_VIDEO, found.items()), {})
+
+    def test_rebuild_matches_by_title_and_file_name_id(self):
+        """Test that scanned files are matched by title or bracketed ID."""
+        self._create("A： Title.mp4")
+        self._create("Named [dQw4w9WgXcQ].mp4")
+        self._create("Clip.f137.mp4")
+        self._create("notes.txt")
+
+        self.assertEqual(self.index.rebuild([self.folder]), 2)
+
+        found = self.index.lookup(
+            self.folder,
+            KIND_VIDEO,
+            [
+                ("https://y/watch?v=x", "A: Title"),
+                ("https://y/watch?v=dQw4w9WgXcQ", "Renamed"),
+                ("https://y/watch?v=y", "Clip"),
+            ],
+        )
+        self.assertEqual(
+            sorted(found), ["https://y/watch?v=dQw4w9WgXcQ", "https://y/watch?v=x"]
+        )
+
+    def test_rebuild_keeps_known_ids_and_drops_missing_files(self):
+        """Test that rescanning keeps learned IDs and forgets deleted files."""
+        kept = self._create("Kept.mp4")
+        removed = self._create("Removed.mp4")
+        self.index.add(kept, "kept")
+        self.index.add(removed, "removed")
+        os.remove(removed)
+
+        self.index.rebuild([self.folder])
+
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(
+            self.index.find(self.folder, KIND_VIDEO, "https://y/watch?v=kept"), kept
+        )
+
+    def test_lookup_drops_stale_rows(self):
+        """Test that files deleted since indexing are not reported."""
+        path = self._create("Gone.mp4")
+        self.index.add(path, "gone")
+        os.remove(path)
+
+        self.assertIsNone(
+            self.index.find(self.folder, KIND_VIDEO, "https://y/watch?v=gone")
+        )
+        self.assertEqual(len(self.index), 0)
+
+    def test_optional_hash(self):
+        """Test that files are hashed only when requested."""
+        path = self._create("Song.mp3")
+        index = DownloadIndex(":memory:", hash_files=True)
+
+        index.add(path, "abc")
+
+        row = index._conn.execute("SELECT sha256 FROM files").fetchone()
+        self.assertEqual(row[0], file_sha256(path))
+        index.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
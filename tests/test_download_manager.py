@@ -1,14 +1,30 @@
 import os
 import sys
+import tempfile
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 # Add the 'src' directory to the Python path to allow for absolute imports
 sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
 )
 
-from app.download_manager import DownloadManager
+from PyQt6.QtWidgets import QMessageBox
+
+from app.download_manager import DownloadManager, ExtractionJob
+from app.engine import (
+    BACKEND_API,
+    BACKEND_SUBPROCESS,
+    EVENT_DOWNLOADED,
+    EVENT_FINISHED,
+    EVENT_METADATA,
+    EVENT_PROGRESS,
+    EngineEvent,
+)
+from app.progress import STAGE_MERGE, ProgressEvent
+from app.tasks import DownloadTask, PlaylistEntry
+from app.queue_store import DONE, FAILED, QueueStore
+from app.download_index import DownloadIndex
 
 
 class TestDownloadManager(unittest.TestCase):
@@ -22,92 +38,439 @@ class TestDownloadManager(unittest.TestCase):
             os.path.join(os.path.dirname(__file__), "..", "src")
         )
 
+        # Scheduler state normally set up by YTDGUI._initialize_state
+        self.mock_main_app.download_queue = QueueStore(":memory:")
+        self.mock_main_app.download_index = DownloadIndex(":memory:")
+        self.mock_main_app.active_downloads = {}
+        self.mock_main_app.update_running = False
+        self.mock_main_app.max_concurrent_downloads = 2
+        self.mock_main_app.adaptive_concurrency = False
+        self.mock_main_app.ytdlp_backend = BACKEND_SUBPROCESS
+        self.mock_main_app.rate_limit = None
+        self.mock_main_app.video_quality_combo.currentText.return_value = (
+            "Best Available"
+        )
+        self.mock_main_app.fragments_spin.value.return_value = 4
+        self.mock_main_app.chunk_size_combo.currentData.return_value = None
+        self.mock_main_app.aria2c_check.isChecked.return_value = False
+        self.mock_main_app.audio_format_combo.currentData.return_value = "mp3"
+
         # Instantiate the DownloadManager with the mocked main app
         self.download_manager = DownloadManager(self.mock_main_app)
+        self.download_manager.engine.shutdown()
+        self.download_manager.engine = MagicMock()
+        self.download_manager.extraction_cache = MagicMock()
+        self.download_manager.extraction_cache.get.return_value = None
+
+    def _queue_tasks(self, count):
+        """Add the given number of download tasks to the queue."""
+        self.mock_main_app.download_queue.extend(
+            DownloadTask.create(str(i), "/fake", "Single Video").to_dict()
+            for i in range(count)
+        )
+
+    def test_process_queue_fills_free_slots(self):
+        """Test that the scheduler starts one download per free slot."""
+        self._queue_tasks(3)
+
+        self.download_manager.process_queue()
+
+        self.assertEqual(self.download_manager.engine.submit.call_count, 2)
+        self.assertEqual(sorted(self.mock_main_app.active_downloads), [0, 1])
+        self.assertEqual(len(self.mock_main_app.download_queue), 1)
+
+    def test_download_complete_frees_slot(self):
+        """Test that a finished download frees its slot for the next task."""
+        self._queue_tasks(3)
+        self.download_manager.process_queue()
+
+        self.download_manager._on_download_complete(0)
 
-    def test_build_video_download_command_best_quality(self):
-        """Test building a video download command for the best available quality."""
-        yt_dlp_path = os.path.join(self.mock_main_app.base_dir, "bin", "yt-dlp.exe")
-        ffmpeg_path = os.path.join(self.mock_main_app.base_dir, "bin", "ffmpeg.exe")
-        url = "https://www.youtube.com/watch?v=test"
-        save_path = "/fake/path"
-        video_quality = "Best Available"
-
-        expected_cmd = [
-            yt_dlp_path,
-            "--ffmpeg-location",
-            ffmpeg_path,
-            "--no-playlist",
-            "--output",
-            os.path.join(save_path, "%(title)s.%(ext)s"),
-            "--format",
-            "bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4",
-            "--merge-output-format",
-            "mp4",
-            url,
+        self.assertEqual(self.download_manager.engine.submit.call_count, 3)
+        self.assertEqual(self.mock_main_app.active_downloads[0].url, "2")
+        self.assertEqual(len(self.mock_main_app.download_queue), 0)
+
+    def test_set_max_concurrent_downloads_starts_queued(self):
+        """Test that raising the concurrency limit starts queued tasks."""
+        self._queue_tasks(4)
+        self.download_manager.process_queue()
+
+        self.download_manager.set_max_concurrent_downloads(3)
+
+        self.assertEqual(self.mock_main_app.max_concurrent_downloads, 3)
+        self.assertEqual(len(self.mock_main_app.active_downloads), 3)
+        self.assertEqual(len(self.mock_main_app.download_queue), 1)
+
+    def _start_one(self, mode="Single Video"):
+        """Start one queued task and return it with its worker slot."""
+        self.mock_main_app.download_queue.append(
+            DownloadTask.create("https://y/watch?v=abc", "/fake", mode).to_dict()
+        )
+        self.download_manager.process_queue()
+        slot, task = next(iter(self.mock_main_app.active_downloads.items()))
+        return slot, task
+
+    def test_engine_events_update_slot(self):
+        """Test that engine events are shown in the slot of their download."""
+        slot, task = self._start_one()
+        key = task.queue_id
+        self.assertEqual(
+            self.download_manager.engine.submit.call_args[0][:2], (task, key)
+        )
+        progress = ProgressEvent(percent=50.0, speed=2.0)
+        finished = DownloadTask.from_dict(task.to_dict())
+        finished.error = "HTTP Error 403"
+
+        for kind, data in (
+            (EVENT_METADATA, {"id": "abc", "title": "Test Video", "duration": 12}),
+            (EVENT_PROGRESS, progress),
+            (EVENT_DOWNLOADED, finished),
+            (EVENT_FINISHED, finished),
+        ):
+            self.download_manager._on_engine_event(EngineEvent(kind, key, data))
+
+        self.assertEqual(task.title, "Test Video")
+        self.mock_main_app.log_message.assert_any_call(
+            "Starting download: Test Video", slot
+        )
+        self.mock_main_app.progressEventSignal.emit.assert_called_once_with(
+            slot, progress
+        )
+        self.mock_main_app.downloadErrorSignal.emit.assert_called_once_with(
+            "HTTP Error 403"
+        )
+        self.assertNotIn(slot, self.mock_main_app.active_downloads)
+        self.assertEqual(self.mock_main_app.download_queue._count(FAILED), 1)
+
+    def test_stream_files_are_kept_for_resuming(self):
+        """Test that stream files are stored and reported after a restart."""
+        slot, task = self._start_one()
+        key = task.queue_id
+        with tempfile.TemporaryDirectory() as temp_dir:
+            streams = [os.path.join(temp_dir, name) for name in ("A.f1.mp4", "A.f2")]
+            for stream in streams:
+                self.download_manager._on_engine_event(
+                    EngineEvent(EVENT_METADATA, key, {"title": "A", "filename": stream})
+                )
+            with open(streams[0] + ".part", "wb") as f:
+                f.write(b"x" * 2048)
+
+            # Interrupted before finishing, the next session resumes it
+            queue = self.mock_main_app.download_queue
+            queue.resume()
+            self.mock_main_app.active_downloads.clear()
+            self.download_manager.process_queue()
+
+        starts = [
+            call
+            for call in self.mock_main_app.log_message.call_args_list
+            if call[0][0].startswith("Starting download")
         ]
+        self.assertEqual(len(starts), 1)
+        self.assertEqual(self.mock_main_app.active_downloads[0].destinations, streams)
+        self.mock_main_app.log_message.assert_any_call(
+            "Resuming A: 2.00KiB already downloaded", 0
+        )
+
+    @patch("app.download_manager.resolve_backend", new=lambda backend: backend)
+    @patch("app.download_manager.DownloadEngine")
+    def test_backend_changes_once_downloads_finish(self, mock_engine_class):
+        """Test that the in-process backend replaces an idle engine only."""
+        self.download_manager.engine.backend = BACKEND_SUBPROCESS
+        slot, task = self._start_one()
+
+        self.download_manager.set_in_process_backend(True)
+
+        mock_engine_class.assert_not_called()
+        finished = DownloadTask.from_dict(task.to_dict())
+        for kind in (EVENT_DOWNLOADED, EVENT_FINISHED):
+            self.download_manager._on_engine_event(
+                EngineEvent(kind, task.queue_id, finished)
+            )
+
+        self.assertEqual(mock_engine_class.call_args[1]["backend"], BACKEND_API)
+        self.assertIs(self.download_manager.engine, mock_engine_class.return_value)
+
+    def test_update_waits_for_downloads(self):
+        """Test that yt-dlp is only updated while no download uses it."""
+        self.download_manager.engine.backend = BACKEND_SUBPROCESS
+        slot, task = self._start_one()
+        self._queue_tasks(1)
+        self.mock_main_app.update_running = True
+
+        finished = DownloadTask.from_dict(task.to_dict())
+        self.download_manager._on_engine_event(
+            EngineEvent(EVENT_DOWNLOADED, task.queue_id, finished)
+        )
+
+        # No download starts while the update runs
+        self.assertEqual(self.download_manager.engine.submit.call_count, 1)
+        self.assertTrue(self.download_manager.is_busy())
+
+        self.download_manager._on_engine_event(
+            EngineEvent(EVENT_FINISHED, task.queue_id, finished)
+        )
+
+        self.assertFalse(self.download_manager.is_busy())
+        self.mock_main_app.start_deferred_update.assert_called_once_with()
+
+        self.mock_main_app.update_running = False
+        self.download_manager.process_queue()
+        self.assertEqual(self.download_manager.engine.submit.call_count, 2)
+
+    def test_update_deferred_while_queue_continues(self):
+        """Test that a finished task with more queued leaves yt-dlp alone."""
+        slot, task = self._start_one()
+        self._queue_tasks(1)
+        finished = DownloadTask.from_dict(task.to_dict())
+
+        for kind in (EVENT_DOWNLOADED, EVENT_FINISHED):
+            self.download_manager._on_engine_event(
+                EngineEvent(kind, task.queue_id, finished)
+            )
 
-        cmd = self.download_manager._build_video_download_command(
-            yt_dlp_path, ffmpeg_path, url, save_path, video_quality
-        )
-        self.assertEqual(cmd, expected_cmd)
-
-    def test_build_video_download_command_specific_quality(self):
-        """Test building a video download command for a specific quality (e.g., 1080p)."""
-        yt_dlp_path = os.path.join(self.mock_main_app.base_dir, "bin", "yt-dlp.exe")
-        ffmpeg_path = os.path.join(self.mock_main_app.base_dir, "bin", "ffmpeg.exe")
-        url = "https://www.youtube.com/watch?v=test"
-        save_path = "/fake/path"
-        video_quality = "1080p"
-
-        expected_cmd = [
-            yt_dlp_path,
-            "--ffmpeg-location",
-            ffmpeg_path,
-            "--no-playlist",
-            "--output",
-            os.path.join(save_path, "%(title)s.%(ext)s"),
-            "--format",
-            "bestvideo[height<=1080]+bestaudio/merge",
-            "--merge-output-format",
-            "mp4",
-            url,
+        self.assertTrue(self.download_manager.is_busy())
+        self.mock_main_app.start_deferred_update.assert_not_called()
+
+    def test_downloaded_task_frees_slot_before_conversion(self):
+        """Test that MP3 conversion does not hold a download slot."""
+        slot, task = self._start_one("MP3 Only")
+        self._queue_tasks(1)
+        key = task.queue_id
+        downloaded = DownloadTask.from_dict(task.to_dict())
+        downloaded.filepath = "/fake/Song.opus"
+
+        self.download_manager._on_engine_event(
+            EngineEvent(EVENT_DOWNLOADED, key, downloaded)
+        )
+
+        # The next task starts while the first one is being converted
+        self.assertEqual(self.download_manager.engine.submit.call_count, 2)
+        self.assertIn(key, self.download_manager.post_processing)
+        self.assertEqual(self.mock_main_app.download_queue._count(DONE), 0)
+
+        downloaded.filepath = "/fake/Song.mp3"
+        self.download_manager._on_engine_event(
+            EngineEvent(EVENT_FINISHED, key, downloaded)
+        )
+
+        self.assertEqual(task.filepath, "/fake/Song.mp3")
+        self.assertNotIn(key, self.download_manager.post_processing)
+        self.assertEqual(self.mock_main_app.download_queue._count(DONE), 1)
+
+    def test_merge_progress_goes_to_status_bar(self):
+        """Test that post-processing progress is shown without a slot."""
+        slot, task = self._start_one("Single Video")
+        task.title = "Clip"
+        downloaded = DownloadTask.from_dict(task.to_dict())
+        self.download_manager._on_engine_event(
+            EngineEvent(EVENT_DOWNLOADED, task.queue_id, downloaded)
+        )
+        event = ProgressEvent(stage=STAGE_MERGE, status="processing", percent=40.0)
+
+        self.download_manager._on_engine_event(
+            EngineEvent(EVENT_PROGRESS, task.queue_id, event)
+        )
+
+        self.mock_main_app.update_status.assert_called_with(
+            "Merging video and audio: Clip (40%)"
+        )
+
+    def _mock_flat_process(self, lines, returncode=0):
+        """Create a fake yt-dlp process printing the given stdout lines."""
+        process = MagicMock()
+        process.stdout = iter(lines)
+        process.poll.return_value = returncode
+        process.returncode = returncode
+        return process
+
+    @patch("app.download_manager.ENTRY_BATCH_SIZE", 2)
+    @patch("app.engine.subprocess.Popen")
+    def test_stream_entries_emits_batches(self, mock_popen):
+        """Test that entries reach the dialog in batches, then a finish event."""
+        lines = [
+            '{"url": "https://y/watch?v=%d", "title": "T%d"}\n' % (i, i)
+            for i in range(5)
         ]
+        mock_popen.return_value = self._mock_flat_process(lines)
+        batches, finished = [], []
+        self.download_manager.signals.entries.connect(batches.append)
+        self.download_manager.signals.extraction_finished.connect(finished.append)
+        job = ExtractionJob("/fake", "Playlist Video", "Select", "None found")
+
+        self.download_manager._stream_entries(job, "https://y/list")
+
+        self.assertEqual([len(batch) for _, batch, _ in batches], [2, 2, 1])
+        self.assertEqual(batches[0][1][0], ("https://y/watch?v=0", "T0"))
+        self.assertEqual(finished, [(job, 5)])
+        self.download_manager.extraction_cache.put.assert_called_once()
+
+    @patch("app.engine.subprocess.Popen")
+    def test_stream_entries_uses_cached_listing(self, mock_popen):
+        """Test that a cached listing is shown without running yt-dlp."""
+        cached = [("https://y/watch?v=a", "A")]
+        self.download_manager.extraction_cache.get.return_value = cached
+        batches, finished = [], []
+        self.download_manager.signals.entries.connect(batches.append)
+        self.download_manager.signals.extraction_finished.connect(finished.append)
+        job = ExtractionJob("/fake", "Playlist Video", "Select", "None found")
+
+        self.download_manager._stream_entries(job, "https://y/playlist?list=PL1")
+
+        mock_popen.assert_not_called()
+        self.assertEqual(batches, [(job, cached, {})])
+        self.assertEqual(finished, [(job, 1)])
 
-        cmd = self.download_manager._build_video_download_command(
-            yt_dlp_path, ffmpeg_path, url, save_path, video_quality
-        )
-        self.assertEqual(cmd, expected_cmd)
-
-    def test_build_audio_download_command(self):
-        """Test building an audio download command."""
-        yt_dlp_path = os.path.join(self.mock_main_app.base_dir, "bin", "yt-dlp.exe")
-        ffmpeg_path = os.path.join(self.mock_main_app.base_dir, "bin", "ffmpeg.exe")
-        url = "https://www.youtube.com/watch?v=test"
-        save_path = "/fake/path"
-        audio_quality = "192"
-
-        expected_cmd = [
-            yt_dlp_path,
-            "--ffmpeg-location",
-            ffmpeg_path,
-            "--no-playlist",
-            "--output",
-            os.path.join(save_path, "%(title)s.%(ext)s"),
-            "--format",
-            "bestaudio/best",
-            "--extract-audio",
-            "--audio-format",
-            "mp3",
-            "--audio-quality",
-            audio_quality,
-            url,
+    @patch("app.engine.subprocess.Popen")
+    def test_stream_entries_flags_downloaded_videos(self, mock_popen):
+        """Test that videos already in the save folder are flagged."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            open(os.path.join(temp_dir, "A.mp4"), "w").close()
+            open(os.path.join(temp_dir, "B.mp3"), "w").close()
+            cached = [("https://y/watch?v=a", "A"), ("https://y/watch?v=b", "B")]
+            self.download_manager.extraction_cache.get.return_value = cached
+            batches = []
+            self.download_manager.signals.entries.connect(batches.append)
+            job = ExtractionJob(temp_dir, "Playlist Video", "Select", "None found")
+
+            self.download_manager._stream_entries(job, "https://y/playlist?list=PL1")
+
+            downloaded = batches[0][2]
+            self.assertEqual(
+                downloaded, {"https://y/watch?v=a": os.path.join(temp_dir, "A.mp4")}
+            )
+
+    @patch("app.download_manager.threading.Thread")
+    @patch("app.download_manager.QMessageBox.question")
+    def test_single_download_asks_before_downloading_again(
+        self, mock_question, mock_thread
+    ):
+        """Test that an already downloaded video is not queued silently."""
+        mock_question.return_value = QMessageBox.StandardButton.No
+        # The folder is checked in a background thread, run it right away
+        mock_thread.side_effect = lambda target, args, daemon: MagicMock(
+            start=lambda: target(*args)
+        )
+        self.mock_main_app.audio_quality_default = "320"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "Clip.mp4")
+            open(path, "w").close()
+            self.mock_main_app.download_index.add(path, "abc")
+
+            self.download_manager._handle_single_download(
+                "https://youtu.be/abc", temp_dir, "Single Video"
+            )
+            self.download_manager._handle_single_download(
+                "https://youtu.be/abc", temp_dir, "MP3 Only"
+            )
+
+        # Only the MP3, which is a different download, was started
+        self.assertEqual(mock_thread.call_count, 2)
+        mock_question.assert_called_once()
+        submitted = self.download_manager.engine.submit.call_args_list
+        self.assertEqual([call[0][0].mode for call in submitted], ["MP3 Only"])
+
+    @patch("app.engine.subprocess.Popen")
+    def test_stream_entries_stops_when_cancelled(self, mock_popen):
+        """Test that a cancelled job stops extraction and kills yt-dlp."""
+        process = self._mock_flat_process(['{"url": "https://y/a"}\n'] * 3)
+        process.poll.return_value = None
+        mock_popen.return_value = process
+        job = ExtractionJob("/fake", "Playlist Video", "Select", "None found")
+        job.cancelled.set()
+
+        self.download_manager._stream_entries(job, "https://y/list")
+
+        process.kill.assert_called_once()
+
+    @patch("app.download_manager.SYNC_KNOWN_THRESHOLD", 2)
+    @patch("app.engine.subprocess.Popen")
+    def test_sync_channel_stops_at_known_uploads(self, mock_popen):
+        """Test that channel sync queues only uploads newer than the archive."""
+        lines = [
+            '{"id": "v%d", "url": "https://y/watch?v=v%d", "title": "T%d"}\n'
+            % (i, i, i)
+            for i in (5, 4, 3, 2, 1)
         ]
+        process = self._mock_flat_process(lines)
+        process.poll.return_value = None
+        mock_popen.return_value = process
+        results = []
+        self.download_manager.signals.sync_finished.connect(results.append)
+        with patch(
+            "app.download_manager.read_archive_ids", return_value={"v3", "v2", "v1"}
+        ):
+            self.download_manager.sync_channel(
+                "https://www.youtube.com/@name", "/fake", "Channel Videos"
+            )
 
-        cmd = self.download_manager._build_audio_download_command(
-            yt_dlp_path, ffmpeg_path, url, save_path, audio_quality
+        job, entries = results[0]
+        self.assertEqual(self.download_manager.engine.submit.call_count, 2)
+        self.assertEqual(
+            entries, [("https://y/watch?v=v4", "T4"), ("https://y/watch?v=v5", "T5")]
         )
-        self.assertEqual(cmd, expected_cmd)
+        self.assertTrue(job.archive.endswith(".txt"))
+        process.kill.assert_called_once()
+
+    @patch("app.download_manager.iter_flat_entries")
+    def test_run_import_queues_unique_videos(self, mock_entries):
+        """Test that imported URLs are expanded, deduplicated and queued."""
+        listings = {
+            "https://www.youtube.com/playlist?list=PL1": [
+                PlaylistEntry("a", "https://www.youtube.com/watch?v=a", "A"),
+                PlaylistEntry("b", "https://www.youtube.com/watch?v=b", "B"),
+            ],
+            "https://www.youtube.com/@Name/videos": [
+                PlaylistEntry("c", "https://www.youtube.com/watch?v=c", "C"),
+                PlaylistEntry(
+                    "s", "https://www.youtube.com/shorts/s", "S", is_short=True
+                ),
+            ],
+        }
+        mock_entries.side_effect = lambda base_dir, url: iter(listings[url])
+        text = (
+            "https://youtu.be/a\n"
+            "https://www.youtube.com/watch?v=a\n"
+            "https://www.youtube.com/playlist?list=PL1\n"
+            "https://www.youtube.com/@Name/featured\n"
+            "not a url, https://example.com/x\n"
+        )
+        finished = []
+        self.download_manager.signals.import_finished.connect(finished.append)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "B.mp4")
+            open(path, "w").close()
+            self.mock_main_app.download_index.add(path, "b")
+
+            self.download_manager._run_import(
+                text, temp_dir, "Single Video", {"video_quality": "720p HD"}
+            )
+
+        # Both queued videos were started in the two download slots
+        submitted = self.download_manager.engine.submit.call_args_list
+        tasks = [call[0][0] for call in submitted]
+        self.assertEqual(
+            [task.url for task in tasks],
+            ["https://www.youtube.com/watch?v=a", "https://www.youtube.com/watch?v=c"],
+        )
+        self.assertEqual(tasks[0].video_quality, "720p HD")
+        self.assertIsNone(tasks[0].archive)
+        self.assertTrue(tasks[1].archive.endswith(".txt"))
+        self.assertEqual(finished, [2])
+        self.assertEqual(mock_entries.call_count, 2)
+
+    @patch("app.download_manager.threading.Thread")
+    def test_channel_download_normalizes_url(self, mock_thread):
+        """Test that channel URLs with a tab or query are cleaned up."""
+        self.mock_main_app.sync_channel_check.isChecked.return_value = False
+
+        self.download_manager._handle_channel_download(
+            "https://www.youtube.com/@name/videos?si=x", "/fake", "Channel Videos"
+        )
+
+        args = mock_thread.call_args[1]["args"]
+        self.assertEqual(args[0], "https://www.youtube.com/@name")
 
 
 if __name__ == "__main__":
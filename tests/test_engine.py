@@ -0,0 +1,774 @@
+import io
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add the 'src' directory to the Python path to allow for absolute imports
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app.tasks import AUDIO_FORMAT_ORIGINAL, DownloadTask, PlaylistEntry
+from app.engine import (
+    BACKEND_API,
+    BACKEND_SUBPROCESS,
+    EVENT_DOWNLOADED,
+    EVENT_FINISHED,
+    EVENT_METRICS,
+    EVENT_OUTPUT,
+    EVENT_PROGRESS,
+    DownloadEngine,
+    build_audio_download_command,
+    build_download_command,
+    build_transfer_options,
+    build_video_download_command,
+    iter_flat_entries,
+    merge_streams,
+    merged_path,
+    parse_metadata,
+    partial_bytes,
+    partial_files,
+    post_process_stage,
+    read_archive_ids,
+    resolve_backend,
+    run_download,
+    run_download_api,
+    run_ffmpeg,
+    transcode_audio,
+    verify_output,
+)
+from app.metrics import PHASE_DOWNLOAD_DONE, PHASE_FINISHED
+from app.progress import STAGE_EXTRACT_AUDIO, STAGE_MERGE
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+class TestEngine(unittest.TestCase):
+    """Tests for the Qt-free download engine."""
+
+    def test_build_video_download_command_best_quality(self):
+        """Test building a video download command for the best available quality."""
+        yt_dlp_path = os.path.join(BASE_DIR, "bin", "yt-dlp.exe")
+        ffmpeg_path = os.path.join(BASE_DIR, "bin", "ffmpeg.exe")
+        url = "https://www.youtube.com/watch?v=test"
+        save_path = "/fake/path"
+        video_quality = "Best Available"
+
+        expected_cmd = [
+            yt_dlp_path,
+            "--ffmpeg-location",
+            ffmpeg_path,
+            "--no-playlist",
+            "--output",
+            os.path.join(save_path, "%(title)s.f%(format_id)s.%(ext)s"),
+            "--format",
+            "bestvideo[ext=mp4]/best[ext=mp4]/best,bestaudio[ext=m4a]/bestaudio",
+            url,
+        ]
+
+        cmd = build_video_download_command(
+            yt_dlp_path, ffmpeg_path, url, save_path, video_quality
+        )
+        self.assertEqual(cmd, expected_cmd)
+
+    def test_build_video_download_command_specific_quality(self):
+        """Test building a video download command for a specific quality (e.g., 1080p)."""
+        yt_dlp_path = os.path.join(BASE_DIR, "bin", "yt-dlp.exe")
+        ffmpeg_path = os.path.join(BASE_DIR, "bin", "ffmpeg.exe")
+        url = "https://www.youtube.com/watch?v=test"
+        save_path = "/fake/path"
+        video_quality = "1080p"
+
+        expected_cmd = [
+            yt_dlp_path,
+            "--ffmpeg-location",
+            ffmpeg_path,
+            "--no-playlist",
+            "--output",
+            os.path.join(save_path, "%(title)s.f%(format_id)s.%(ext)s"),
+            "--format",
+            "bestvideo[height<=1080][ext=mp4]/best[height<=1080][ext=mp4]/"
+            "bestvideo[height<=1080]/best[height<=1080]/best,"
+            "bestaudio[ext=m4a]/bestaudio",
+            url,
+        ]
+
+        cmd = build_video_download_command(
+            yt_dlp_path, ffmpeg_path, url, save_path, video_quality
+        )
+        self.assertEqual(cmd, expected_cmd)
+
+    def test_build_audio_download_command(self):
+        """Test building an audio download command."""
+        yt_dlp_path = os.path.join(BASE_DIR, "bin", "yt-dlp.exe")
+        ffmpeg_path = os.path.join(BASE_DIR, "bin", "ffmpeg.exe")
+        url = "https://www.youtube.com/watch?v=test"
+        save_path = "/fake/path"
+        audio_quality = "192"
+
+        expected_cmd = [
+            yt_dlp_path,
+            "--ffmpeg-location",
+            ffmpeg_path,
+            "--no-playlist",
+            "--output",
+            os.path.join(save_path, "%(title)s.%(ext)s"),
+            "--format",
+            "bestaudio/best",
+            "--extract-audio",
+            "--audio-format",
+            "mp3",
+            "--audio-quality",
+            audio_quality,
+            url,
+        ]
+
+        cmd = build_audio_download_command(
+            yt_dlp_path, ffmpeg_path, url, save_path, audio_quality
+        )
+        self.assertEqual(cmd, expected_cmd)
+
+    def test_build_audio_download_command_original_format(self):
+        """Test that the original audio codec is kept without re-encoding."""
+        cmd = build_audio_download_command(
+            "yt-dlp.exe",
+            "ffmpeg.exe",
+            "https://www.youtube.com/watch?v=test",
+            "/fake/path",
+            "192",
+            audio_format=AUDIO_FORMAT_ORIGINAL,
+        )
+
+        self.assertEqual(cmd[cmd.index("--audio-format") + 1], "best")
+        self.assertNotIn("--audio-quality", cmd)
+        self.assertEqual(cmd[-1], "https://www.youtube.com/watch?v=test")
+
+    def test_parse_metadata(self):
+        """Test parsing the metadata line printed by the download process."""
+        line = '[ytdgui-meta] {"id": "abc", "title": "Test Video", "duration": 12}'
+
+        metadata = parse_metadata(line)
+
+        self.assertEqual(metadata, {"id": "abc", "title": "Test Video", "duration": 12})
+        self.assertIsNone(parse_metadata("[download] 5.0%"))
+
+    @patch("app.engine.subprocess.Popen")
+    def test_iter_flat_entries_streams_lines(self, mock_popen):
+        """Test that flat-playlist entries are parsed line by line."""
+        process = MagicMock()
+        process.stdout = iter(
+            [
+                '{"id": "a", "url": "https://y/a", "title": "A", "duration": 5}\n',
+                "not json\n",
+                '{"id": "b", "url": null, "title": "B", "duration": null}\n',
+                '{"id": "c", "url": "/shorts/c", "title": null, "duration": null}\n',
+            ]
+        )
+        process.poll.return_value = 0
+        process.returncode = 0
+        mock_popen.return_value = process
+
+        entries = list(iter_flat_entries(BASE_DIR, "https://y/list"))
+
+        self.assertEqual(
+            entries,
+            [
+                PlaylistEntry("a", "https://y/a", "A", 5),
+                PlaylistEntry(
+                    "c", "https://www.youtube.com/shorts/c", "Unknown Title", None, True
+                ),
+            ],
+        )
+        self.assertIn("--flat-playlist", mock_popen.call_args[0][0])
+        self.assertNotIn("--dump-json", mock_popen.call_args[0][0])
+
+    def test_read_archive_ids(self):
+        """Test reading video IDs from a yt-dlp download archive."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = os.path.join(temp_dir, "archive.txt")
+            with open(archive, "w", encoding="utf-8") as f:
+                f.write("youtube abc\nyoutube def\n\n")
+
+            ids = read_archive_ids(archive)
+            missing = read_archive_ids(archive + ".missing")
+
+        self.assertEqual(ids, {"abc", "def"})
+        self.assertEqual(missing, set())
+
+    def test_create_task_audio_mode(self):
+        """Test that audio tasks ignore the video quality setting."""
+        task = DownloadTask.create(
+            "https://y/a", "/fake", "Playlist MP3", "720p", "192"
+        )
+
+        self.assertEqual(task.audio_quality, "192")
+        self.assertEqual(task.video_quality, "Best Available")
+        self.assertIsNone(task.archive)
+
+    def test_build_download_command_adds_archive_and_templates(self):
+        """Test the options appended to every download command."""
+        task = DownloadTask.create(
+            "https://y/a", "/fake", "Channel Shorts", archive="/data/archive.txt"
+        )
+
+        cmd = build_download_command(task, BASE_DIR, "/cookies.txt")
+
+        self.assertNotIn("--merge-output-format", cmd)
+        self.assertEqual(cmd[cmd.index("--cookies") + 1], "/cookies.txt")
+        self.assertEqual(cmd[cmd.index("--download-archive") + 1], "/data/archive.txt")
+        self.assertEqual(cmd.count("--progress-template"), 2)
+        self.assertIn("--continue", cmd)
+        self.assertNotIn("--limit-rate", cmd)
+
+    def test_build_transfer_options(self):
+        """Test the fragment, chunk size and external downloader options."""
+        self.assertEqual(build_transfer_options(), [])
+        self.assertEqual(
+            build_transfer_options(4, 10485760),
+            ["--concurrent-fragments", "4", "--http-chunk-size", "10485760"],
+        )
+        self.assertEqual(
+            build_transfer_options(8, 10485760, "/bin/aria2c"),
+            [
+                "--external-downloader",
+                "/bin/aria2c",
+                "--external-downloader-args",
+                "aria2c:-x 8 -s 8 -k 1M",
+            ],
+        )
+
+    @patch("app.engine.find_aria2c")
+    def test_build_download_command_transfer_settings(self, mock_find):
+        """Test that the task's transfer settings reach the command."""
+        mock_find.return_value = None
+        task = DownloadTask.create(
+            "https://y/a", "/fake", "MP3 Only", concurrent_fragments=4
+        )
+        task.downloader = "aria2c"
+
+        cmd = build_download_command(task, BASE_DIR)
+
+        # Without aria2c installed the native downloader is used
+        self.assertEqual(cmd[cmd.index("--concurrent-fragments") + 1], "4")
+        self.assertNotIn("--external-downloader", cmd)
+
+        mock_find.return_value = "/bin/aria2c"
+        cmd = build_download_command(task, BASE_DIR)
+
+        self.assertEqual(cmd[cmd.index("--external-downloader") + 1], "/bin/aria2c")
+
+        # MP3 is produced by the engine, yt-dlp keeps the original codec
+        self.assertEqual(cmd[cmd.index("--audio-format") + 1], "best")
+        self.assertNotIn("--audio-quality", cmd)
+
+    def test_build_download_command_limits_rate(self):
+        """Test that the task's share of the speed limit is passed on."""
+        task = DownloadTask.create("https://y/a", "/fake", "Single Video")
+        task.rate_limit = 524288
+
+        cmd = build_download_command(task, BASE_DIR)
+
+        self.assertEqual(cmd[cmd.index("--limit-rate") + 1], "524288")
+
+    @patch("app.engine.subprocess.Popen")
+    def test_run_download_reports_output(self, mock_popen):
+        """Test that run_download dispatches output lines to the callbacks."""
+        process = MagicMock()
+        process.stdout.readline.side_effect = [
+            '[ytdgui-meta] {"id": "abc", "title": "Test Video", "duration": 12}\n',
+            "[Merger] Merging formats\n",
+            "Some warning\n",
+            "[ytdgui-file] /fake/Test Video.mp4\n",
+            "",
+        ]
+        process.returncode = 0
+        mock_popen.return_value = process
+        task = DownloadTask.create("https://y/a", "/fake", "Single Video")
+        output, metadata, events = [], [], []
+
+        run_download(
+            task, BASE_DIR, None, output.append, metadata.append, events.append
+        )
+
+        self.assertEqual(task.title, "Test Video")
+        self.assertEqual(metadata[0]["id"], "abc")
+        self.assertEqual([e.stage for e in events], ["merge"])
+        self.assertEqual(output, ["Some warning"])
+        self.assertEqual(task.filepath, "/fake/Test Video.mp4")
+
+    @patch("app.engine.subprocess.Popen")
+    def test_run_download_collects_stream_files(self, mock_popen):
+        """Test that separately downloaded streams are recorded as parts."""
+        meta = '[ytdgui-meta] {"id": "abc", "title": "Clip", "filename": "%s"}\n'
+        process = MagicMock()
+        process.stdout.readline.side_effect = [
+            meta % "/fake/Clip.f137.mp4",
+            "[ytdgui-file] /fake/Clip.f137.mp4\n",
+            meta % "/fake/Clip.f140.m4a",
+            "[ytdgui-file] /fake/Clip.f140.m4a\n",
+            "",
+        ]
+        process.returncode = 0
+        mock_popen.return_value = process
+        task = DownloadTask.create("https://y/a", "/fake", "Single Video")
+        task.parts = ["/fake/Clip.f137.mp4"]
+        metadata = []
+
+        run_download(task, BASE_DIR, on_metadata=metadata.append)
+
+        # Parts of an interrupted earlier run are not merged twice
+        self.assertEqual(len(metadata), 2)
+        self.assertEqual(task.parts, ["/fake/Clip.f137.mp4", "/fake/Clip.f140.m4a"])
+        self.assertEqual(task.destinations, task.parts)
+        self.assertTrue(task.merges_streams)
+
+    @patch("app.ytdlp_api.download")
+    def test_run_download_api_parses_same_output(self, mock_download):
+        """Test that the in-process backend reports like the executable."""
+
+        def download(args, on_line):
+            on_line('[ytdgui-meta] {"id": "abc", "title": "Clip"}')
+            on_line("Some warning")
+            on_line("[ytdgui-file] /fake/Clip.m4a")
+
+        mock_download.side_effect = download
+        task = DownloadTask.create("https://y/a", "/fake", "MP3 Only")
+        output = []
+
+        run_download_api(task, BASE_DIR, None, output.append)
+
+        args = mock_download.call_args[0][0]
+        self.assertEqual(args, build_download_command(task, BASE_DIR)[1:])
+        self.assertEqual(task.title, "Clip")
+        self.assertEqual(task.filepath, "/fake/Clip.m4a")
+        self.assertEqual(output, ["Some warning"])
+
+    @patch("app.ytdlp_api.is_available")
+    def test_resolve_backend_falls_back_without_package(self, mock_available):
+        """Test that the executable is used when yt_dlp is not installed."""
+        mock_available.return_value = False
+        self.assertEqual(resolve_backend(BACKEND_API), BACKEND_SUBPROCESS)
+
+        mock_available.return_value = True
+        self.assertEqual(resolve_backend(BACKEND_API), BACKEND_API)
+        self.assertEqual(resolve_backend(BACKEND_SUBPROCESS), BACKEND_SUBPROCESS)
+
+    @patch("app.engine.subprocess.Popen")
+    def test_run_download_raises_on_error(self, mock_popen):
+        """Test that a failing yt-dlp process raises CalledProcessError."""
+        process = MagicMock()
+        process.stdout.readline.side_effect = ["ERROR: Video unavailable\n", ""]
+        process.returncode = 1
+        mock_popen.return_value = process
+        task = DownloadTask.create("https://y/a", "/fake", "MP3 Only")
+
+        with self.assertRaises(subprocess.CalledProcessError):
+            run_download(task, BASE_DIR)
+
+    def test_task_and_entry_have_no_instance_dict(self):
+        """Test that tasks and entries are slotted."""
+        task = DownloadTask.create("https://y/a", "/fake", "Single Video")
+        entry = PlaylistEntry("a", "https://y/a", "A")
+
+        self.assertFalse(hasattr(task, "__dict__"))
+        self.assertFalse(hasattr(entry, "__dict__"))
+        self.assertEqual(pickle.loads(pickle.dumps(task)), task)
+
+    def test_task_dict_round_trip(self):
+        """Test storing a task in the queue format and reading it back."""
+        task = DownloadTask.create("https://y/a", "/fake", "Single Video", "720p")
+        data = task.to_dict()
+        data["queue_id"] = 7
+        data["unknown"] = "ignored"
+
+        restored = DownloadTask.from_dict(data)
+
+        self.assertNotIn("title", task.to_dict())
+        self.assertEqual(restored.video_quality, "720p")
+        self.assertEqual(restored.queue_id, 7)
+
+    def test_apply_metadata_records_destinations_once(self):
+        """Test that every stream's file is recorded for resuming."""
+        task = DownloadTask.create("https://y/a", "/fake", "Single Video")
+
+        for name in ("A.f137.mp4", "A.f140.m4a", "A.f137.mp4"):
+            task.apply_metadata({"title": "A", "filename": name})
+
+        self.assertEqual(task.destinations, ["A.f137.mp4", "A.f140.m4a"])
+
+    @patch("app.engine.run_download")
+    def test_engine_reports_events_from_workers(self, mock_run):
+        """Test that worker events reach the listener, ending with finished."""
+
+        def fake_download(task, base_dir, cookie_file, on_output, **callbacks):
+            on_output(f"line for {task.url}")
+            if task.url == "https://y/b":
+                raise RuntimeError("boom")
+
+        mock_run.side_effect = fake_download
+        events = []
+        engine = DownloadEngine(BASE_DIR, events.append, max_workers=2)
+
+        futures = [
+            engine.submit(DownloadTask.create(url, "/fake", "Single Video"), key)
+            for key, url in enumerate(["https://y/a", "https://y/b"])
+        ]
+        results = [future.result() for future in futures]
+        engine.shutdown()
+
+        self.assertEqual([task.error for task in results], [None, "boom"])
+        by_key = {}
+        for event in events:
+            by_key.setdefault(event.key, []).append(event.kind)
+        expected = [EVENT_OUTPUT, EVENT_DOWNLOADED, EVENT_METRICS, EVENT_FINISHED]
+        self.assertEqual(by_key, {0: expected, 1: expected})
+
+    @patch("app.engine.verify_output", new=lambda task, ffmpeg_path: None)
+    @patch("app.engine.transcode_audio")
+    @patch("app.engine.run_download")
+    def test_engine_transcodes_mp3_after_download(self, mock_run, mock_transcode):
+        """Test that MP3 conversion runs as a second stage in the CPU pool."""
+
+        def fake_download(task, *args, **callbacks):
+            task.filepath = "/fake/Song.opus"
+
+        mock_run.side_effect = fake_download
+        mock_transcode.return_value = "/fake/Song.mp3"
+        events = []
+        engine = DownloadEngine(BASE_DIR, events.append, cpu_workers=1)
+        task = DownloadTask.create(
+            "https://y/a", "/fake", "MP3 Only", audio_quality="192"
+        )
+
+        result = engine.submit(task, 3).result()
+        engine.shutdown()
+
+        self.assertEqual(
+            mock_transcode.call_args[0][:3],
+            ("/fake/Song.opus", os.path.join(BASE_DIR, "bin", "ffmpeg.exe"), "192"),
+        )
+        self.assertEqual(result.filepath, "/fake/Song.mp3")
+        kinds = [event.kind for event in events]
+        self.assertEqual(
+            kinds,
+            [
+                EVENT_DOWNLOADED,
+                EVENT_PROGRESS,
+                EVENT_PROGRESS,
+                EVENT_METRICS,
+                EVENT_FINISHED,
+            ],
+        )
+        self.assertEqual(events[1].data.stage, STAGE_EXTRACT_AUDIO)
+        self.assertEqual(events[2].data.status, "finished")
+
+    @patch("app.engine.verify_output", new=lambda task, ffmpeg_path: None)
+    @patch("app.engine.merge_streams")
+    @patch("app.engine.run_download")
+    def test_engine_merges_streams_after_download(self, mock_run, mock_merge):
+        """Test that video and audio are merged in the post-processing pool."""
+
+        def fake_download(task, *args, **callbacks):
+            task.parts = ["/fake/Clip.f137.mp4", "/fake/Clip.f140.m4a"]
+            task.filepath = task.parts[-1]
+            task.duration = 60
+
+        mock_run.side_effect = fake_download
+        mock_merge.return_value = "/fake/Clip.mp4"
+        events = []
+        engine = DownloadEngine(BASE_DIR, events.append, cpu_workers=1)
+        task = DownloadTask.create("https://y/a", "/fake", "Single Video")
+
+        result = engine.submit(task, 0).result()
+        engine.shutdown()
+
+        parts, _, duration, _ = mock_merge.call_args[0]
+        self.assertEqual(parts, ["/fake/Clip.f137.mp4", "/fake/Clip.f140.m4a"])
+        self.assertEqual(duration, 60)
+        self.assertEqual(result.filepath, "/fake/Clip.mp4")
+        self.assertIsNone(result.parts)
+        self.assertEqual(events[1].data.stage, STAGE_MERGE)
+
+    @patch("app.engine.verify_output", new=lambda task, ffmpeg_path: None)
+    @patch("app.engine.merge_streams")
+    @patch("app.engine.run_download")
+    def test_engine_times_post_processing(self, mock_run, mock_merge):
+        """Test that the download phase ends before merging starts."""
+
+        def fake_download(task, *args, **callbacks):
+            task.parts = ["/fake/Clip.f137.mp4", "/fake/Clip.f140.m4a"]
+            task.filepath = task.parts[-1]
+
+        def fake_merge(*args, **kwargs):
+            time.sleep(0.05)
+            return "/fake/Clip.mp4"
+
+        mock_run.side_effect = fake_download
+        mock_merge.side_effect = fake_merge
+        events = []
+        engine = DownloadEngine(BASE_DIR, events.append, cpu_workers=1)
+
+        engine.submit(DownloadTask.create("https://y/a", "/fake", "Single Video"), 0)
+        engine.shutdown()
+
+        metrics = next(event.data for event in events if event.kind == EVENT_METRICS)
+        self.assertIs(mock_merge.call_args[1]["metrics"], metrics)
+        self.assertGreaterEqual(
+            metrics.phases[PHASE_FINISHED] - metrics.phases[PHASE_DOWNLOAD_DONE], 0.05
+        )
+
+    @patch("app.engine.verify_output")
+    @patch("app.engine.run_download")
+    def test_engine_verifies_in_post_processing_pool(self, mock_run, mock_verify):
+        """Test that a download without merge is still verified in the CPU pool."""
+        mock_run.side_effect = lambda task, *a, **k: setattr(task, "filepath", "/f.mp4")
+        threads = []
+        mock_verify.side_effect = lambda task, ffmpeg_path: threads.append(
+            threading.current_thread().name
+        )
+        engine = DownloadEngine(BASE_DIR, lambda event: None)
+
+        result = engine.submit(
+            DownloadTask.create("https://y/a", "/fake", "Single Video"), 0
+        ).result()
+        engine.shutdown()
+
+        self.assertIsNone(result.error)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("post-process"))
+
+    @unittest.skipUnless(os.name == "posix", "uses a shell script as yt-dlp")
+    def test_engine_cancel_kills_downloads_in_worker_processes(self):
+        """Test that shutdown(wait=False) stops yt-dlp started by a worker process."""
+        with tempfile.TemporaryDirectory() as base_dir:
+            pid_file = os.path.join(base_dir, "pid")
+            os.makedirs(os.path.join(base_dir, "bin"))
+            yt_dlp = os.path.join(base_dir, "bin", "yt-dlp.exe")
+            with open(yt_dlp, "w") as f:
+                f.write(f"#!/bin/sh\necho $$ > {pid_file}\nexec sleep 30\n")
+            os.chmod(yt_dlp, 0o755)
+            engine = DownloadEngine(
+                base_dir, lambda event: None, max_workers=1, use_processes=True
+            )
+            engine.submit(DownloadTask.create("https://y/a", base_dir, "MP3 Only"), 0)
+
+            deadline = time.monotonic() + 10
+            while not os.path.exists(pid_file) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            time.sleep(0.1)
+            with open(pid_file) as f:
+                pid = int(f.read())
+
+            engine.shutdown(wait=False)
+
+            deadline = time.monotonic() + 5
+            alive = True
+            while alive and time.monotonic() < deadline:
+                try:
+                    os.kill(pid, 0)
+                    time.sleep(0.05)
+                except ProcessLookupError:
+                    alive = False
+            if alive:
+                os.kill(pid, 9)
+            self.assertFalse(alive)
+
+    @patch("app.engine.verify_output", new=lambda task, ffmpeg_path: None)
+    @patch("app.engine.run_download")
+    def test_engine_records_finished_downloads(self, mock_run):
+        """Test that finished files are added to the download index."""
+        mock_run.side_effect = lambda task, *a, **k: setattr(task, "filepath", "/f.mp4")
+        index = MagicMock()
+        events = []
+        engine = DownloadEngine(BASE_DIR, events.append, download_index=index)
+        task = DownloadTask.create("https://y/a", "/fake", "Single Video")
+
+        engine.submit(task, 0).result()
+        engine.shutdown()
+
+        index.record.assert_called_once()
+        self.assertEqual(index.record.call_args[0][0].filepath, "/f.mp4")
+
+    @patch("app.engine.verify_output", new=lambda task, ffmpeg_path: None)
+    @patch("app.engine.transcode_audio")
+    @patch("app.engine.run_download")
+    def test_engine_keeps_original_audio(self, mock_run, mock_transcode):
+        """Test that the original audio format is not transcoded."""
+        mock_run.side_effect = lambda task, *a, **k: setattr(task, "filepath", "/f.m4a")
+        engine = DownloadEngine(BASE_DIR, lambda event: None)
+        task = DownloadTask.create(
+            "https://y/a", "/fake", "MP3 Only", audio_format=AUDIO_FORMAT_ORIGINAL
+        )
+
+        result = engine.submit(task, 0).result()
+        engine.shutdown()
+
+        mock_transcode.assert_not_called()
+        self.assertEqual(result.filepath, "/f.m4a")
+
+    @patch("app.engine.subprocess.Popen")
+    def test_transcode_audio_replaces_source(self, mock_popen):
+        """Test that a successful transcode removes the original file."""
+        process = mock_popen.return_value
+        process.stdout = io.StringIO("out_time_ms=1000000\nprogress=end\n")
+        process.returncode = 0
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "Song.webm")
+            open(source, "w").close()
+
+            target = transcode_audio(source, "ffmpeg", "320")
+
+            self.assertEqual(target, os.path.join(temp_dir, "Song.mp3"))
+            self.assertFalse(os.path.exists(source))
+        cmd = mock_popen.call_args[0][0]
+        self.assertEqual(cmd[cmd.index("-b:a") + 1], "320k")
+        self.assertEqual(cmd[-1], target)
+
+    @patch("app.engine.subprocess.Popen")
+    def test_transcode_audio_keeps_source_on_error(self, mock_popen):
+        """Test that a failed transcode raises and keeps the original."""
+        process = mock_popen.return_value
+        process.stdout = io.StringIO("Invalid data\n")
+        process.returncode = 1
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "Song.m4a")
+            open(source, "w").close()
+
+            with self.assertRaises(subprocess.CalledProcessError):
+                transcode_audio(source, "ffmpeg", "320")
+
+            self.assertTrue(os.path.exists(source))
+        self.assertEqual(transcode_audio("/x/Song.mp3", "ffmpeg", "320"), "/x/Song.mp3")
+
+    @patch("app.engine.subprocess.Popen")
+    def test_run_ffmpeg_reports_progress(self, mock_popen):
+        """Test that ffmpeg progress output becomes percent events."""
+        process = mock_popen.return_value
+        process.stdout = io.StringIO(
+            "frame=10\nout_time_ms=N/A\nout_time_ms=5000000\nprogress=continue\n"
+        )
+        process.returncode = 0
+        events = []
+
+        run_ffmpeg(["ffmpeg"], STAGE_MERGE, 20.0, events.append)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].stage, STAGE_MERGE)
+        self.assertEqual(events[0].percent, 25.0)
+
+    @patch("app.engine.subprocess.Popen")
+    def test_merge_streams_replaces_parts(self, mock_popen):
+        """Test that merging copies both streams and removes the parts."""
+        process = mock_popen.return_value
+        process.stdout = io.StringIO("progress=end\n")
+        process.returncode = 0
+        with tempfile.TemporaryDirectory() as temp_dir:
+            parts = [
+                os.path.join(temp_dir, "Clip.f137.mp4"),
+                os.path.join(temp_dir, "Clip.f251.webm"),
+            ]
+            for part in parts:
+                open(part, "w").close()
+
+            target = merge_streams(parts, "ffmpeg")
+
+            self.assertEqual(target, os.path.join(temp_dir, "Clip.mp4"))
+            self.assertFalse(any(os.path.exists(part) for part in parts))
+        cmd = mock_popen.call_args[0][0]
+        self.assertEqual(cmd[cmd.index("-codec") + 1], "copy")
+        self.assertEqual(cmd[-1], target)
+
+    def test_partial_files_of_interrupted_download(self):
+        """Test finding the partial files of a task's destinations."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = os.path.join(temp_dir, "Clip [1].f137.mp4")
+            for suffix in (".part", ".part-Frag3", ".ytdl"):
+                with open(destination + suffix, "wb") as f:
+                    f.write(b"12345")
+            open(os.path.join(temp_dir, "Other.mp4.part"), "w").close()
+            task = DownloadTask.create("https://y/a", temp_dir, "Single Video")
+            task.destinations = [destination]
+
+            self.assertEqual(len(partial_files(task)), 3)
+            self.assertEqual(partial_bytes(task), 15)
+
+    def test_verify_output_checks_file(self):
+        """Test that missing and empty files fail verification."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            task = DownloadTask.create("https://y/a", temp_dir, "Single Video")
+            task.filepath = os.path.join(temp_dir, "Clip.mp4")
+
+            self.assertIn("missing", verify_output(task, "ffmpeg"))
+            open(task.filepath, "w").close()
+            self.assertIn("empty", verify_output(task, "ffmpeg"))
+            with open(task.filepath, "w") as f:
+                f.write("data")
+            self.assertIsNone(verify_output(task, "ffmpeg"))
+
+    @patch("app.engine.subprocess.run")
+    def test_verify_output_compares_duration(self, mock_run):
+        """Test that the file's duration must match the reported one."""
+        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
+            f.write(b"data")
+        self.addCleanup(os.remove, f.name)
+        task = DownloadTask.create("https://y/a", "/fake", "Single Video")
+        task.filepath = f.name
+        task.duration = 212
+
+        mock_run.return_value.stdout = "  Duration: 00:03:31.50, start: 0.000000"
+        self.assertIsNone(verify_output(task, "ffmpeg"))
+
+        mock_run.return_value.stdout = "  Duration: 00:01:40.00, start: 0.000000"
+        self.assertIn("100s instead of 212s", verify_output(task, "ffmpeg"))
+
+        mock_run.return_value.stdout = "  Duration: N/A, bitrate: N/A"
+        self.assertIsNone(verify_output(task, "ffmpeg"))
+
+        mock_run.return_value.stdout = "moov atom not found"
+        self.assertIn("cannot read", verify_output(task, "ffmpeg"))
+
+        # Without ffmpeg only the file itself is checked
+        mock_run.side_effect = FileNotFoundError
+        self.assertIsNone(verify_output(task, "ffmpeg"))
+
+    @patch("app.engine.run_download")
+    def test_engine_fails_unverified_download(self, mock_run):
+        """Test that a task whose file is missing is not reported as done."""
+        mock_run.side_effect = lambda task, *a, **k: setattr(task, "filepath", "/f.mp4")
+        engine = DownloadEngine(BASE_DIR, lambda event: None)
+        task = DownloadTask.create("https://y/a", "/fake", "Single Video")
+
+        result = engine.submit(task, 0).result()
+        engine.shutdown()
+
+        self.assertIn("missing", result.error)
+
+    @patch("app.engine.verify_output", new=lambda task, ffmpeg_path: None)
+    def test_single_stream_loses_format_id(self):
+        """Test that a video downloaded as one muxed stream gets its plain name."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stream = os.path.join(temp_dir, "Clip.f18.mp4")
+            open(stream, "w").close()
+            task = DownloadTask.create("https://y/a", temp_dir, "Single Video")
+            task.parts = [stream]
+            task.filepath = stream
+
+            result = post_process_stage(task, MagicMock(), BASE_DIR, 0, MagicMock())
+
+            self.assertEqual(result.filepath, os.path.join(temp_dir, "Clip.mp4"))
+            self.assertTrue(os.path.exists(result.filepath))
+            self.assertFalse(os.path.exists(stream))
+
+    def test_merged_path_strips_format_id(self):
+        """Test the name of the merged file."""
+        self.assertEqual(merged_path(["/v/A.b.fhls-720p.mp4"]), "/v/A.b.mp4")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the 'src' directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app.extraction_cache import ExtractionCache, listing_cache_key
+
+
+class TestExtractionCache(unittest.TestCase):
+    """Tests for the ExtractionCache class."""
+
+    def setUp(self):
+        """Create a cache in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "data", "cache.db")
+        self.cache = ExtractionCache(self.db_path, ttl=60, max_entries=2)
+        self.entries = [("https://y/watch?v=a", "A"), ("https://y/watch?v=b", "B")]
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def test_put_and_get(self):
+        """Test that a stored listing is returned unchanged."""
+        self.cache.put("key", self.entries)
+
+        self.assertEqual(self.cache.get("key"), self.entries)
+        self.assertIsNone(self.cache.get("missing"))
+
+    @patch("app.extraction_cache.time.time")
+    def test_expired_listing_is_ignored(self, mock_time):
+        """Test that listings older than the TTL are dropped."""
+        mock_time.return_value = 1000.0
+        self.cache.put("key", self.entries)
+
+        mock_time.return_value = 1061.0
+        self.assertIsNone(self.cache.get("key"))
+
+    @patch("app.extraction_cache.time.time")
+    def test_least_recently_used_is_evicted(self, mock_time):
+        """Test that the cache keeps only the most recently used listings."""
+        for now, key in enumerate(["a", "b"]):
+            mock_time.return_value = float(now)
+            self.cache.put(key, self.entries)
+
+        # Touch "a" so "b" becomes the least recently used listing
+        mock_time.return_value = 2.0
+        self.cache.get("a")
+        mock_time.return_value = 3.0
+        self.cache.put("c", self.entries)
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_invalidate(self):
+        """Test removing a single listing."""
+        self.cache.put("key", self.entries)
+        self.cache.invalidate("key")
+
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_listing_cache_key(self):
+        """Test URL normalization for cache keys."""
+        self.assertEqual(
+            listing_cache_key("https://www.youtube.com/@Name/videos/"),
+            "https://youtube.com/@Name/videos",
+        )
+        self.assertEqual(
+            listing_cache_key("https://www.youtube.com/watch?v=x&list=PL1"),
+            listing_cache_key("https://youtube.com/playlist?list=PL1"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
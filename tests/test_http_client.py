@@ -0,0 +1,154 @@
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the 'src' directory to the Python path to allow for absolute imports
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app.http_client import HttpClient, HttpError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Local stand-in for GitHub, answering with keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        if self.path == "/redirect":
+            self._reply(302, b"", {"Location": "/data"})
+        elif self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._reply(304, None, {"ETag": '"v1"'})
+            else:
+                self._reply(200, b'{"tag_name": "1"}', {"ETag": '"v1"'})
+        elif self.path == "/drop":
+            # Answer, then close without announcing it, like an idle timeout
+            self._reply(200, b"dropped")
+            self.close_connection = True
+        elif self.path == "/slow":
+            self.server.release.wait(5)
+            self._reply(200, b"late")
+        elif self.path == "/data":
+            self._reply(200, b"payload")
+        else:
+            self._reply(404, b"missing")
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body is not None:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    """HTTP server counting the connections it accepts."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.paths = []
+        self.connections = 0
+        self.release = threading.Event()
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+    def handle_error(self, request, client_address):
+        # Clients that gave up (timeout test) close the connection early
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+    """Tests for the pooled HTTP client against a local server."""
+
+    def setUp(self):
+        """Start the local server and create a client."""
+        self.server = _Server()
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}
+        )
+        self.thread.start()
+        self.base = "http://127.0.0.1:%d" % self.server.server_address[1]
+        self.client = HttpClient(timeout=5)
+
+    def tearDown(self):
+        """Stop the server and close the client's connections."""
+        self.server.release.set()
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def _get(self, path, headers=None):
+        """Request a path and return the status and body."""
+        with self.client.get(self.base + path, headers) as response:
+            return response.status, response.read()
+
+    def test_connection_is_reused(self):
+        """Test that consecutive requests share one keep-alive connection."""
+        for _ in range(3):
+            self.assertEqual(self._get("/data"), (200, b"payload"))
+
+        self.assertEqual(self.server.connections, 1)
+
+    def test_follows_redirects(self):
+        """Test that redirects are followed on the same connection."""
+        with self.client.get(self.base + "/redirect") as response:
+            self.assertEqual(response.read(), b"payload")
+            self.assertEqual(response.url, self.base + "/data")
+
+        self.assertEqual(self.server.paths, ["/redirect", "/data"])
+        self.assertEqual(self.server.connections, 1)
+
+    def test_conditional_request(self):
+        """Test that 304 Not Modified is returned instead of raised."""
+        with self.client.get(self.base + "/etag") as response:
+            etag = response.headers["ETag"]
+            self.assertEqual(response.json(), {"tag_name": "1"})
+
+        status, body = self._get("/etag", {"If-None-Match": etag})
+
+        self.assertEqual((status, body), (304, b""))
+        self.assertEqual(self.server.connections, 1)
+
+    def test_error_status_raises(self):
+        """Test that error statuses raise HttpError and keep the connection."""
+        with self.assertRaises(HttpError) as context:
+            self.client.get(self.base + "/missing")
+
+        self.assertEqual(context.exception.status, 404)
+        self.assertEqual(self._get("/data")[0], 200)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_stale_connection_is_replaced(self):
+        """Test that a connection closed by the server is retried on a new one."""
+        self._get("/drop")
+
+        self.assertEqual(self._get("/data"), (200, b"payload"))
+        self.assertEqual(self.server.connections, 2)
+
+    def test_timeout(self):
+        """Test that a server not answering in time raises an OSError."""
+        client = HttpClient(timeout=0.2)
+
+        with self.assertRaises(OSError):
+            client.get(self.base + "/slow")
+        client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+# Add the 'src' directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app.log_buffer import LogBuffer
+
+
+class TestLogBuffer(unittest.TestCase):
+    """Tests for the LogBuffer class."""
+
+    def setUp(self):
+        """Set up an empty buffer."""
+        self.buffer = LogBuffer(max_lines=3)
+
+    def test_drain_returns_none_without_changes(self):
+        """Test that nothing is flushed when no message arrived."""
+        self.assertIsNone(self.buffer.drain())
+
+    def test_progress_lines_are_collapsed_per_slot(self):
+        """Test that only the latest progress line of each slot is kept."""
+        self.buffer.push("Starting download: A", 0)
+        for percent in (10, 20, 30):
+            self.buffer.push(f"[download]  {percent}.0% of 5MiB", 0)
+            self.buffer.push(f"[download]  {percent + 1}.0% of 9MiB", 1)
+
+        lines, live = self.buffer.drain()
+
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].endswith("Starting download: A"))
+        self.assertEqual(len(live), 2)
+        self.assertTrue(live[0].endswith("30.0% of 5MiB"))
+        self.assertTrue(live[1].endswith("31.0% of 9MiB"))
+
+    def test_finished_download_ends_live_line(self):
+        """Test that a finished download no longer shows its progress line."""
+        self.buffer.push("[download]  99.0% of 5MiB", 0)
+        self.buffer.drain()
+
+        self.buffer.end_progress(0)
+
+        self.assertEqual(self.buffer.drain(), ([], []))
+
+    def test_pending_lines_are_capped(self):
+        """Test that the ring buffer keeps only the newest lines."""
+        for i in range(5):
+            self.buffer.push(f"line {i}")
+
+        lines, _ = self.buffer.drain()
+
+        self.assertEqual(
+            [line.split("] ")[1] for line in lines], ["line 2", "line 3", "line 4"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the 'src' directory to the Python path to allow for absolute imports
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app.metrics import (
+    PHASE_DOWNLOAD_DONE,
+    PHASE_FINISHED,
+    PHASE_FIRST_BYTE,
+    PHASE_METADATA,
+    MetricsLog,
+    TaskMetrics,
+    format_summary,
+)
+from app.progress import STAGE_DOWNLOAD, STAGE_POSTPROCESS, ProgressEvent
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests for per-download metrics."""
+
+    def setUp(self):
+        """Create a temporary directory for metric files."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def _metrics(self, success=True):
+        """Return finished metrics with fixed phase times."""
+        metrics = TaskMetrics("https://y/watch?v=a", "Video + Audio", "A")
+        metrics.phases = {
+            PHASE_METADATA: 1.0,
+            PHASE_FIRST_BYTE: 2.0,
+            PHASE_DOWNLOAD_DONE: 6.0,
+        }
+        metrics.bytes = 4096
+        metrics.finish(None if success else "boom")
+        metrics.phases[PHASE_FINISHED] = 8.0
+        return metrics
+
+    def test_bytes_are_summed_across_files(self):
+        """Test that separate video and audio files add up."""
+        metrics = TaskMetrics("url", "Video + Audio")
+        for downloaded in (0, 100, 300, 50, 80):
+            metrics.on_progress(
+                ProgressEvent(stage=STAGE_DOWNLOAD, downloaded_bytes=downloaded)
+            )
+
+        self.assertEqual(metrics.bytes, 380)
+        self.assertIn(PHASE_FIRST_BYTE, metrics.phases)
+        self.assertNotIn(PHASE_DOWNLOAD_DONE, metrics.phases)
+
+    def test_post_processing_marks_download_done(self):
+        """Test that the first post-processing event ends the download phase."""
+        metrics = TaskMetrics("url", "Video + Audio")
+        metrics.on_progress(ProgressEvent(stage=STAGE_POSTPROCESS))
+        metrics.finish()
+
+        self.assertIn(PHASE_DOWNLOAD_DONE, metrics.phases)
+        self.assertTrue(metrics.success)
+
+    def test_average_speed(self):
+        """Test the speed between the first byte and the end of the download."""
+        self.assertEqual(self._metrics().average_speed, 1024)
+
+    def test_record_appends_json_lines(self):
+        """Test that every record is appended to the JSON lines file."""
+        path = os.path.join(self.temp_dir.name, "data", "metrics.jsonl")
+        log = MetricsLog(path)
+
+        log.record(self._metrics())
+        log.record(self._metrics(success=False))
+
+        with open(path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["success"] for r in records], [True, False])
+        self.assertEqual(records[1]["error"], "boom")
+        self.assertEqual(records[0]["phases"][PHASE_FINISHED], 8.0)
+
+    def test_summary_and_format(self):
+        """Test the summary of recent downloads."""
+        log = MetricsLog(None)
+        log.record(self._metrics())
+        log.record(self._metrics(success=False))
+
+        summary = log.summary()
+
+        self.assertEqual(summary["count"], 2)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(summary["bytes"], 8192)
+        self.assertEqual(
+            format_summary(summary),
+            [
+                "Last 2: 1 failed",
+                "avg 1.00KiB/s",
+                "startup 1.0s",
+                "post-processing 2.0s",
+            ],
+        )
+
+    def test_format_empty_summary(self):
+        """Test that nothing is shown before the first download finishes."""
+        self.assertEqual(format_summary(MetricsLog(None).summary()), [])
+
+    def test_prometheus_text_file(self):
+        """Test the Prometheus text file written after each record."""
+        path = os.path.join(self.temp_dir.name, "ytdgui.prom")
+        log = MetricsLog(None, path)
+
+        log.record(self._metrics())
+
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        self.assertIn('ytdgui_downloads_total{result="success"} 1', text)
+        self.assertIn("ytdgui_download_bytes_total 4096", text)
+        self.assertIn('ytdgui_download_phase_seconds_count{phase="finished"} 1', text)
+        self.assertFalse(os.path.exists(path + ".tmp"))
+
+    @patch("app.metrics.psutil", None)
+    def test_sampler_without_psutil(self):
+        """Test that resource sampling is skipped without psutil."""
+        from app.metrics import ProcessSampler
+
+        metrics = TaskMetrics("url", "Video + Audio")
+        sampler = ProcessSampler(os.getpid(), metrics)
+        sampler.stop()
+
+        self.assertIsNone(metrics.cpu_seconds)
+        self.assertIsNone(metrics.peak_rss)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import unittest
+
+# Add the 'src' directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app.progress import (
+    STAGE_DOWNLOAD,
+    STAGE_EXTRACT_AUDIO,
+    STAGE_MERGE,
+    ProgressEvent,
+    format_bytes,
+    parse_bytes,
+    parse_progress_line,
+)
+
+
+class TestParseProgressLine(unittest.TestCase):
+    """Tests for parse_progress_line."""
+
+    def test_template_download_line(self):
+        """Test parsing a machine-readable download progress line."""
+        event = parse_progress_line(
+            '[ytdgui-progress] {"status": "downloading", "downloaded_bytes": 2048,'
+            ' "total_bytes": 8192, "speed": 1024.0, "eta": 6}'
+        )
+
+        self.assertEqual(event.stage, STAGE_DOWNLOAD)
+        self.assertEqual(event.percent, 25.0)
+        self.assertEqual(event.total_bytes, 8192)
+        self.assertEqual(event.speed, 1024.0)
+        self.assertEqual(event.eta, 6)
+
+    def test_template_fragment_line(self):
+        """Test that fragment counts are used when the size is unknown."""
+        event = parse_progress_line(
+            '[ytdgui-progress] {"status": "downloading", "downloaded_bytes": 10,'
+            ' "fragment_index": 3, "fragment_count": 12}'
+        )
+
+        self.assertEqual(event.percent, 25.0)
+        self.assertEqual(event.fragment_count, 12)
+
+    def test_template_postprocess_line(self):
+        """Test mapping post-processors to progress stages."""
+        merge = parse_progress_line(
+            '[ytdgui-progress] {"status": "started", "postprocessor": "Merger"}'
+        )
+        audio = parse_progress_line(
+            '[ytdgui-progress] {"status": "finished", "postprocessor": "ExtractAudio"}'
+        )
+
+        self.assertEqual((merge.stage, merge.status), (STAGE_MERGE, "started"))
+        self.assertEqual(audio.stage, STAGE_EXTRACT_AUDIO)
+
+    def test_legacy_download_line(self):
+        """Test parsing plain yt-dlp progress output."""
+        event = parse_progress_line(
+            "[download]  50.0% of ~ 10.00MiB at  2.00MiB/s ETA 01:05 (frag 4/8)"
+        )
+
+        self.assertEqual(event.percent, 50.0)
+        self.assertEqual(event.total_bytes, 10 * 1024**2)
+        self.assertEqual(event.speed, 2 * 1024**2)
+        self.assertEqual(event.eta, 65)
+        self.assertEqual((event.fragment_index, event.fragment_count), (4, 8))
+
+    def test_non_progress_lines(self):
+        """Test that unrelated output is ignored."""
+        self.assertIsNone(parse_progress_line("[youtube] abc: Downloading webpage"))
+        self.assertIsNone(parse_progress_line("ERROR: Video unavailable"))
+        self.assertIsNone(parse_progress_line("[ytdgui-progress] not json"))
+
+    def test_describe_keeps_download_prefix(self):
+        """Test that described events look like yt-dlp progress lines."""
+        event = parse_progress_line("[download]  42.0% of 1.00KiB at 1.00KiB/s")
+
+        self.assertEqual(event.describe(), "[download]  42.0% of 1.00KiB at 1.00KiB/s")
+        self.assertEqual(format_bytes(1536), "1.50KiB")
+
+    def test_describe_post_processing_percent(self):
+        """Test that post-processing progress is described with its percent."""
+        event = ProgressEvent(stage=STAGE_MERGE, status="processing", percent=12.5)
+
+        self.assertEqual(event.describe(), "[merge]  12.5%")
+
+    def test_parse_bytes(self):
+        """Test parsing sizes with binary units."""
+        self.assertEqual(parse_bytes("10M"), 10 * 1024 * 1024)
+        self.assertEqual(parse_bytes("1.5KiB"), 1536)
+        self.assertEqual(parse_bytes("4096"), 4096)
+        with self.assertRaises(ValueError):
+            parse_bytes("10 MB/s")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the 'src' directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app.queue_store import QueueStore
+
+
+class TestQueueStore(unittest.TestCase):
+    """Tests for the QueueStore class."""
+
+    def setUp(self):
+        """Create a queue database in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "data", "queue.db")
+        self.queue = QueueStore(self.db_path)
+
+    def tearDown(self):
+        """Close the database and remove the temporary directory."""
+        self.queue.close()
+        self.temp_dir.cleanup()
+
+    def test_fifo_order(self):
+        """Test that tasks are dequeued in insertion order."""
+        self.queue.append({"url": "a"})
+        self.queue.extend([{"url": "b"}, {"url": "c"}])
+
+        self.assertEqual(len(self.queue), 3)
+        urls = [self.queue.pop_next()["url"] for _ in range(3)]
+
+        self.assertEqual(urls, ["a", "b", "c"])
+        self.assertIsNone(self.queue.pop_next())
+        self.assertFalse(self.queue)
+
+    def test_resume_after_restart(self):
+        """Test that running tasks are pending again after a restart."""
+        self.queue.extend([{"url": "a"}, {"url": "b"}, {"url": "c"}])
+        done = self.queue.pop_next()
+        self.queue.pop_next()  # Left running, as after a crash
+        self.queue.mark_done(done["queue_id"])
+        self.queue.close()
+
+        self.queue = QueueStore(self.db_path)
+        pending = self.queue.resume()
+
+        self.assertEqual(pending, 2)
+        self.assertEqual(self.queue.pop_next()["url"], "b")
+        self.assertEqual(self.queue.pop_next()["url"], "c")
+
+    def test_update_keeps_running_task_files(self):
+        """Test that files recorded while running survive a restart."""
+        self.queue.append({"url": "a"})
+        task = self.queue.pop_next()
+        task["destinations"] = ["/v/A.f137.mp4"]
+        self.queue.update(task["queue_id"], task)
+        self.queue.close()
+
+        self.queue = QueueStore(self.db_path)
+        self.queue.resume()
+
+        self.assertEqual(self.queue.pop_next()["destinations"], ["/v/A.f137.mp4"])
+
+    def test_queued_urls(self):
+        """Test that pending and running tasks count as queued."""
+        self.queue.extend([{"url": "a"}, {"url": "b"}, {"url": "c"}])
+        self.queue.pop_next()
+        failed = self.queue.pop_next()
+        self.queue.mark_failed(failed["queue_id"])
+
+        self.assertEqual(self.queue.queued_urls(), {"a", "c"})
+
+    def test_failed_tasks_are_not_resumed(self):
+        """Test that failed tasks stay out of the pending queue."""
+        self.queue.append({"url": "a"})
+        task = self.queue.pop_next()
+        self.queue.mark_failed(task["queue_id"], "HTTP Error 403")
+
+        self.assertEqual(self.queue.resume(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
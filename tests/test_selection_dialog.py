@@ -0,0 +1,90 @@
+import os
+import sys
+import unittest
+
+# Add the 'src' directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from PyQt6.QtCore import Qt
+
+from app.selection_dialog import VideoListModel
+
+
+class TestVideoListModel(unittest.TestCase):
+    """Tests for the VideoListModel class."""
+
+    def setUp(self):
+        """Set up a model with a few entries."""
+        self.model = VideoListModel()
+        self.model.add_entries(
+            [("https://y/watch?v=%d" % i, "Video %d" % i) for i in range(4)]
+        )
+
+    def test_entries_checked_by_default(self):
+        """Test that newly added entries are listed and checked."""
+        index = self.model.index(1)
+
+        self.assertEqual(self.model.rowCount(), 4)
+        self.assertEqual(self.model.data(index), "Video 1")
+        self.assertEqual(
+            self.model.data(index, Qt.ItemDataRole.CheckStateRole),
+            Qt.CheckState.Checked,
+        )
+        self.assertEqual(len(self.model.selected_videos()), 4)
+
+    def test_set_data_toggles_check_state(self):
+        """Test unchecking a single entry through the model API."""
+        self.model.setData(
+            self.model.index(0),
+            Qt.CheckState.Unchecked.value,
+            Qt.ItemDataRole.CheckStateRole,
+        )
+
+        selected = self.model.selected_videos()
+        self.assertEqual(len(selected), 3)
+        self.assertNotIn(("https://y/watch?v=0", "Video 0"), selected)
+
+    def test_bulk_select_and_deselect(self):
+        """Test Select All / Deselect All as one bulk update."""
+        self.model.set_all_checked(False)
+        self.assertEqual(self.model.selected_videos(), [])
+
+        self.model.set_all_checked(True)
+        self.assertEqual(len(self.model.selected_videos()), 4)
+
+    def test_queued_entries_are_disabled(self):
+        """Test that queued entries cannot be selected again."""
+        self.model.setData(
+            self.model.index(3),
+            Qt.CheckState.Unchecked.value,
+            Qt.ItemDataRole.CheckStateRole,
+        )
+        self.model.mark_selected_queued()
+        self.model.set_all_checked(True)
+
+        self.assertEqual(
+            self.model.selected_videos(), [("https://y/watch?v=3", "Video 3")]
+        )
+        self.assertEqual(self.model.flags(self.model.index(0)), Qt.ItemFlag.NoItemFlags)
+
+    def test_downloaded_entries_are_flagged_and_unchecked(self):
+        """Test that already downloaded videos are listed but not selected."""
+        self.model.add_entries(
+            [("https://y/watch?v=4", "Video 4"), ("https://y/watch?v=5", "Video 5")],
+            {"https://y/watch?v=4": "/out/Video 4.mp4"},
+        )
+        index = self.model.index(4)
+
+        self.assertEqual(self.model.data(index), "Video 4 (already downloaded)")
+        self.assertEqual(self.model.downloaded_count(), 1)
+        self.model.set_all_checked(True)
+        self.assertNotIn(
+            ("https://y/watch?v=4", "Video 4"), self.model.selected_videos()
+        )
+        self.assertEqual(len(self.model.selected_videos()), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the 'src' directory to the Python path to allow for absolute imports
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, SRC_DIR)
+
+from app.startup import STARTUP_BUDGET_MS, TRACE_FLAG, StartupTrace
+
+# Modules that must not be imported before the first window is shown
+DEFERRED_MODULES = [
+    "app.http_client",
+    "app.import_dialog",
+    "app.login_manager",
+    "app.selection_dialog",
+    "app.updater",
+]
+
+
+class TestStartupTrace(unittest.TestCase):
+    """Tests for the startup timing trace."""
+
+    @patch("app.startup.time.perf_counter")
+    def test_steps_and_summary(self, mock_clock):
+        """Test that marks are turned into step durations."""
+        mock_clock.side_effect = [0.100, 0.250, 0.300]
+        trace = StartupTrace(0.0)
+
+        trace.mark("imports")
+        trace.mark("window")
+        trace.mark("first window")
+
+        self.assertEqual(
+            [(name, round(ms)) for name, ms in trace.steps()],
+            [("imports", 100), ("window", 150), ("first window", 50)],
+        )
+        self.assertEqual(round(trace.total_ms), 300)
+        self.assertEqual(
+            trace.format(),
+            "Started in 300 ms (imports 100 ms, window 150 ms, first window 50 ms)",
+        )
+        self.assertEqual(json.loads(trace.to_json())["total"], 300.0)
+
+
+class TestStartup(unittest.TestCase):
+    """Tests for the time to first window of the GUI."""
+
+    def test_first_window_within_budget(self):
+        """Test that the window shows within budget without deferred modules."""
+        with tempfile.TemporaryDirectory() as base_dir:
+            code = (
+                "import json, sys;"
+                f"sys.argv = ['main.py', {TRACE_FLAG!r}];"
+                f"sys.path.insert(0, {SRC_DIR!r});"
+                f"import main; main.get_base_dir = lambda: {base_dir!r}\n"
+                "try:\n    main.main()\nexcept SystemExit:\n    pass\n"
+                "print(json.dumps(sorted(sys.modules)))"
+            )
+            env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+            result = subprocess.run(
+                [sys.executable, "-c", code],
+                capture_output=True,
+                text=True,
+                check=True,
+                env=env,
+                timeout=60,
+            )
+
+        # The trace is the last JSON object printed, the module list the last line
+        lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+        trace = json.loads(lines[-1])
+        modules = json.loads(result.stdout.splitlines()[-1])
+
+        self.assertLess(trace["total"], STARTUP_BUDGET_MS)
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
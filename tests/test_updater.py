@@ -1,8 +1,9 @@
+import hashlib
 import os
 import sys
+import tempfile
 import unittest
-import json
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import patch, MagicMock
 
 # Add the 'src' directory to the Python path
 sys.path.insert(
@@ -17,8 +18,10 @@ class TestUpdater(unittest.TestCase):
 
     def setUp(self):
         """Set up the test environment."""
-        self.base_dir = "/fake/base/dir"
-        self.updater = Updater(self.base_dir)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = self.temp_dir.name
+        self.client = MagicMock()
+        self.updater = Updater(self.base_dir, client=self.client)
         self.mock_api_response = {
             "tag_name": "2023.12.30",
             "assets": [
@@ -30,75 +33,194 @@ class TestUpdater(unittest.TestCase):
             ],
         }
 
-    @patch("urllib.request.urlopen")
-    def test_get_latest_yt_version_success(self, mock_urlopen):
+    def tearDown(self):
+        """Remove the temporary base directory."""
+        self.temp_dir.cleanup()
+
+    def _respond(self, status, body=None, etag=None):
+        """Make the client answer the next request with the given response."""
+        response = MagicMock(status=status, headers={"ETag": etag} if etag else {})
+        response.json.return_value = body
+        response.__enter__.return_value = response
+        self.client.get.return_value = response
+
+    def test_get_latest_yt_version_success(self):
         """Test successfully fetching the latest version from the GitHub API."""
-        # Mock the API response
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps(self.mock_api_response).encode()
-        mock_response.__enter__.return_value = mock_response
-        mock_urlopen.return_value = mock_response
+        self._respond(200, self.mock_api_response)
 
         version, assets = self.updater.get_latest_yt_version()
 
         self.assertEqual(version, "2023.12.30")
         self.assertEqual(len(assets), 2)
         self.assertEqual(assets[0]["name"], "yt-dlp.exe")
+        headers = self.client.get.call_args[0][1]
+        self.assertNotIn("If-None-Match", headers)
 
-    @patch("app.updater.Updater.get_latest_yt_version")
-    @patch("urllib.request.urlopen")
-    @patch("shutil.copyfileobj")
-    @patch("os.replace")
-    @patch("os.chmod")
-    @patch("builtins.open", new_callable=mock_open)
-    def test_download_yt_success(
-        self,
-        mock_file,
-        mock_chmod,
-        mock_replace,
-        mock_copy,
-        mock_urlopen,
-        mock_get_version,
-    ):
-        """Test the full download and replacement process."""
-        # Mock the necessary functions
-        mock_get_version.return_value = ("2023.12.30", self.mock_api_response["assets"])
-
-        mock_url_response = MagicMock()
-        mock_url_response.__enter__.return_value = mock_url_response
-        mock_urlopen.return_value = mock_url_response
-
-        progress_callback = MagicMock()
+    def test_get_latest_yt_version_not_modified(self):
+        """Test that an unchanged release is answered from the cached response."""
+        self._respond(200, self.mock_api_response, etag='"abc"')
+        self.updater.get_latest_yt_version()
 
-        self.updater.download_yt(progress_callback)
+        self._respond(304)
+        version, assets = Updater(
+            self.base_dir, client=self.client
+        ).get_latest_yt_version()
 
-        # Verify that the correct URL was opened
-        mock_urlopen.assert_called_once_with("https://fake.url/yt-dlp.exe")
-
-        # Verify that the file was opened for writing
-        mock_file.assert_called_once_with(self.updater.yt_dlp_path + ".new", "wb")
+        headers = self.client.get.call_args[0][1]
+        self.assertEqual(headers["If-None-Match"], '"abc"')
+        self.assertEqual(version, "2023.12.30")
+        self.assertEqual(len(assets), 2)
 
-        # Verify that shutil.copyfileobj was called
-        self.assertTrue(mock_copy.called)
+    def _serve(self, files):
+        """Make the client answer downloads with the given file contents."""
+
+        def get(url, headers=None):
+            body = files[url]
+            response = MagicMock(status=200, headers={"Content-Length": len(body)})
+            chunks = [body[:4], body[4:], b""]
+            response.read.side_effect = lambda amt=None: (
+                chunks.pop(0) if amt else body
+            )
+            response.__enter__.return_value = response
+            return response
+
+        self.client.get.side_effect = get
+
+    def _release(self, exe, listed_digest=None):
+        """Return the release of the mocked API response with checksums."""
+        assets = list(self.mock_api_response["assets"])
+        files = {"https://fake.url/yt-dlp.exe": exe}
+        if listed_digest is not None:
+            assets.append(
+                {
+                    "name": "SHA2-256SUMS",
+                    "browser_download_url": "https://fake.url/sums",
+                }
+            )
+            files["https://fake.url/sums"] = (
+                f"{'0' * 64}  yt-dlp\n{listed_digest}  yt-dlp.exe\n".encode()
+            )
+        self._serve(files)
+        return "2023.12.30", assets
+
+    def test_download_yt_success(self):
+        """Test the streamed download, verification and replacement."""
+        os.makedirs(os.path.dirname(self.updater.yt_dlp_path))
+        exe = b"new yt-dlp binary"
+        release = self._release(exe, hashlib.sha256(exe).hexdigest())
+        progress_callback = MagicMock()
+        sizes = []
 
-        # Verify that os.replace was called to atomically move the file
-        mock_replace.assert_called_once_with(
-            self.updater.yt_dlp_path + ".new", self.updater.yt_dlp_path
+        self.updater.download_yt(
+            progress_callback, lambda done, total: sizes.append((done, total)), release
         )
 
-        # Verify that chmod was called
-        self.assertTrue(mock_chmod.called)
+        with open(self.updater.yt_dlp_path, "rb") as f:
+            self.assertEqual(f.read(), exe)
+        self.assertFalse(os.path.exists(self.updater.yt_dlp_path + ".new"))
+        self.assertEqual(sizes, [(4, len(exe)), (len(exe), len(exe))])
+
+        # The installed version is known without running the new binary
+        with patch("subprocess.run") as mock_run:
+            self.assertEqual(self.updater.installed_version(), "2023.12.30")
+        mock_run.assert_not_called()
 
         # Verify progress callbacks
-        self.assertIn(
-            "Downloading yt-dlp 2023.12.30...",
-            [call[0][0] for call in progress_callback.call_args_list],
+        messages = [call[0][0] for call in progress_callback.call_args_list]
+        self.assertNotIn(
+            "No checksum published for yt-dlp.exe, not verified.", messages
         )
+        self.assertIn("Downloading yt-dlp 2023.12.30...", messages)
         self.assertIn(
-            f"yt-dlp updated to 2023.12.30 at {self.updater.yt_dlp_path}",
-            [call[0][0] for call in progress_callback.call_args_list],
+            f"yt-dlp updated to 2023.12.30 at {self.updater.yt_dlp_path}", messages
         )
 
+    def test_download_yt_checksum_mismatch(self):
+        """Test that a download not matching the checksum is not installed."""
+        os.makedirs(os.path.dirname(self.updater.yt_dlp_path))
+        release = self._release(b"tampered", hashlib.sha256(b"other").hexdigest())
+
+        with self.assertRaises(ValueError):
+            self.updater.download_yt(MagicMock(), release=release)
+
+        self.assertFalse(os.path.exists(self.updater.yt_dlp_path))
+        self.assertFalse(os.path.exists(self.updater.yt_dlp_path + ".new"))
+
+    @patch("subprocess.run")
+    def test_installed_version_is_cached(self, mock_run):
+        """Test that yt-dlp.exe --version runs only once per binary."""
+        os.makedirs(os.path.dirname(self.updater.yt_dlp_path))
+        with open(self.updater.yt_dlp_path, "wb") as f:
+            f.write(b"binary")
+        mock_run.return_value = MagicMock(stdout="2023.11.16\n")
+
+        self.assertEqual(self.updater.installed_version(), "2023.11.16")
+        self.assertEqual(self.updater.installed_version(), "2023.11.16")
+        self.assertEqual(mock_run.call_count, 1)
+
+        # A replaced binary is asked again
+        with open(self.updater.yt_dlp_path, "wb") as f:
+            f.write(b"other binary")
+        mock_run.return_value = MagicMock(stdout="2023.12.30\n")
+        self.assertEqual(self.updater.installed_version(), "2023.12.30")
+
+    @patch("app.updater.Updater.download_yt")
+    @patch("app.updater.Updater.installed_version", return_value="2023.12.30")
+    def test_update_yt_skips_current_version(self, mock_installed, mock_download):
+        """Test that nothing is downloaded when yt-dlp is up to date."""
+        self._respond(200, self.mock_api_response)
+        progress_callback = MagicMock()
+
+        self.assertFalse(self.updater.update_yt(progress_callback))
+
+        mock_download.assert_not_called()
+        progress_callback.assert_called_once_with("yt-dlp 2023.12.30 is up to date.")
+
+        # The next check is rate limited unless forced
+        self.assertFalse(self.updater.check_due())
+        self.assertFalse(self.updater.update_yt(progress_callback))
+        self.assertEqual(self.client.get.call_count, 1)
+        self.updater.update_yt(progress_callback, force=True)
+        self.assertEqual(self.client.get.call_count, 2)
+
+    @patch("app.updater.Updater.download_yt")
+    @patch("app.updater.Updater.installed_version", return_value="2023.11.16")
+    def test_update_yt_installs_newer_version(self, mock_installed, mock_download):
+        """Test that an outdated yt-dlp is replaced."""
+        self._respond(200, self.mock_api_response)
+        progress_callback = MagicMock()
+
+        self.assertTrue(self.updater.update_yt(progress_callback))
+
+        release = mock_download.call_args[0][2]
+        self.assertEqual(release[0], "2023.12.30")
+        self.assertFalse(self.updater.check_due())
+
+    @patch("app.updater.Updater.installed_version", return_value="2023.11.16")
+    def test_release_without_executable_is_retried(self, mock_installed):
+        """Test that a release without yt-dlp.exe is not reported as installed."""
+        release = dict(
+            self.mock_api_response, assets=self.mock_api_response["assets"][1:]
+        )
+        self._respond(200, release)
+
+        with self.assertRaises(ValueError):
+            self.updater.update_yt(MagicMock())
+
+        self.assertTrue(self.updater.check_due())
+        self.assertEqual(self.client.get.call_count, 1)
+
+    @patch("app.updater.Updater.download_yt", side_effect=OSError("in use"))
+    @patch("app.updater.Updater.installed_version", return_value=None)
+    def test_failed_update_is_retried(self, mock_installed, mock_download):
+        """Test that a failed update does not count as a completed check."""
+        self._respond(200, self.mock_api_response)
+
+        with self.assertRaises(OSError):
+            self.updater.update_yt(MagicMock())
+
+        self.assertTrue(self.updater.check_due())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,160 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Add the 'src' directory to the Python path to allow for absolute imports
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app.engine import channel_listing_url
+from app.extraction_cache import listing_cache_key
+from app.url_import import (
+    URL_CHANNEL,
+    URL_PLAYLIST,
+    URL_VIDEO,
+    ImportedUrl,
+    classify_url,
+    collect_urls,
+    count_types,
+    expand_concurrently,
+    playlist_from_url,
+    read_url_file,
+    split_urls,
+)
+
+
+class TestUrlImport(unittest.TestCase):
+    """Tests for bulk URL parsing, normalization and expansion."""
+
+    def test_classify_video_urls(self):
+        """Test that every video URL shape maps to the same watch URL."""
+        for url in [
+            "https://www.youtube.com/watch?v=abc&t=10s",
+            "youtube.com/watch?v=abc",
+            "https://m.youtube.com/watch?v=abc&list=PL1",
+            "https://youtu.be/abc?si=x",
+            "https://www.youtube.com/shorts/abc",
+            "https://music.youtube.com/watch?v=abc",
+        ]:
+            self.assertEqual(
+                classify_url(url),
+                ImportedUrl(URL_VIDEO, "abc", "https://www.youtube.com/watch?v=abc"),
+                url,
+            )
+
+    def test_classify_playlist_and_channel_urls(self):
+        """Test canonical playlist and channel URLs without tabs or queries."""
+        self.assertEqual(
+            classify_url("https://www.youtube.com/playlist?list=PL1&si=x"),
+            ImportedUrl(
+                URL_PLAYLIST, "PL1", "https://www.youtube.com/playlist?list=PL1"
+            ),
+        )
+        channel = classify_url("https://www.youtube.com/@Name/videos?view=0")
+        self.assertEqual(channel.url, "https://www.youtube.com/@Name")
+        self.assertEqual(channel.key, "@name")
+        # The same cache entry and archive as the URL typed in the URL field
+        self.assertEqual(
+            listing_cache_key(channel_listing_url(channel.url, "Channel Videos")),
+            listing_cache_key("https://www.youtube.com/@Name/videos"),
+        )
+        self.assertEqual(
+            classify_url("youtube.com/channel/UCabc/shorts").key, "channel/UCabc"
+        )
+        self.assertEqual(classify_url("https://youtube.com/c/Name").url_type, "channel")
+
+    def test_classify_rejects_other_urls(self):
+        """Test that non-YouTube and unsupported pages are not recognized."""
+        for url in [
+            "https://vimeo.com/123",
+            "https://www.youtube.com/feed/trending",
+            "https://youtu.be/",
+            "ftp://youtube.com/watch?v=abc",
+        ]:
+            self.assertIsNone(classify_url(url), url)
+
+    def test_playlist_from_url(self):
+        """Test finding the playlist of a watch URL inside a playlist."""
+        playlist = playlist_from_url("https://www.youtube.com/watch?v=abc&list=PL1")
+
+        self.assertEqual(playlist.url, "https://www.youtube.com/playlist?list=PL1")
+        self.assertIsNone(playlist_from_url("https://www.youtube.com/watch?v=abc"))
+
+    def test_split_urls_from_csv(self):
+        """Test that CSV cells, quotes and comments are handled."""
+        text = (
+            "url,title\n"
+            '"https://youtu.be/a",First video\n'
+            "# https://youtu.be/skipped\n"
+            "https://youtu.be/b; https://youtu.be/c\n"
+        )
+
+        self.assertEqual(
+            split_urls(text),
+            ["https://youtu.be/a", "https://youtu.be/b", "https://youtu.be/c"],
+        )
+
+    def test_read_url_file_strips_bom(self):
+        """Test reading a CSV file saved with a byte order mark."""
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "urls.csv")
+            with open(path, "w", encoding="utf-8-sig") as f:
+                f.write("https://youtu.be/a\n")
+
+            self.assertEqual(split_urls(read_url_file(path)), ["https://youtu.be/a"])
+
+    def test_collect_urls_dedups_by_canonical_key(self):
+        """Test that different spellings of one video are queued once."""
+        urls, duplicates, invalid = collect_urls(
+            [
+                "https://youtu.be/a",
+                "https://www.youtube.com/watch?v=a&t=1",
+                "https://www.youtube.com/@Name",
+                "https://www.youtube.com/@name/videos",
+                "https://example.com/a",
+            ]
+        )
+
+        self.assertEqual([u.key for u in urls], ["a", "@name"])
+        self.assertEqual(duplicates, 2)
+        self.assertEqual(invalid, ["https://example.com/a"])
+        self.assertEqual(
+            count_types(urls), {URL_VIDEO: 1, URL_PLAYLIST: 0, URL_CHANNEL: 1}
+        )
+
+    def test_expand_concurrently_is_bounded(self):
+        """Test that listings run in parallel, but at most max_workers at once."""
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def expand(imported):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            if imported.key == "bad":
+                raise OSError("listing failed")
+            return [(f"https://youtu.be/{imported.key}", imported.key)]
+
+        playlists = [
+            classify_url(f"https://www.youtube.com/playlist?list={key}")
+            for key in ["p1", "p2", "p3", "p4", "p5", "bad"]
+        ]
+
+        results = dict(expand_concurrently(playlists, expand, max_workers=3))
+
+        self.assertEqual(peak[0], 3)
+        self.assertEqual(len(results), 6)
+        self.assertIsInstance(results[playlists[-1]], OSError)
+        self.assertEqual(results[playlists[0]], [("https://youtu.be/p1", "p1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import subprocess
+import sys
+import unittest
+from collections import namedtuple
+from unittest.mock import MagicMock, patch
+
+# Add the 'src' directory to the Python path to allow for absolute imports
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from app import ytdlp_api
+
+ParsedOptions = namedtuple("ParsedOptions", "parser options urls ydl_opts")
+
+
+class TestYtDlpApi(unittest.TestCase):
+    """Tests for the in-process yt-dlp backend."""
+
+    def setUp(self):
+        """Start every test without a kept YoutubeDL instance."""
+        ytdlp_api._session = None
+
+    def tearDown(self):
+        """Forget the instance kept by the test."""
+        ytdlp_api._session = None
+
+    def _fake_yt_dlp(self, lines, code=0, printed=()):
+        """
+        Create a yt_dlp module whose downloads log the given lines.
+
+        Like the real package, ``printed`` lines (--print output) are not
+        logged but written with YoutubeDL.to_stdout(), which by default
+        goes to the process's stdout.
+        """
+        module = MagicMock()
+        module.parse_options.return_value = ParsedOptions(
+            None, None, ["https://y/a"], {"format": "best"}
+        )
+        ydl = module.YoutubeDL.return_value
+        ydl.stdout = []
+        ydl.to_stdout = ydl.stdout.append
+
+        def download(urls):
+            logger = module.YoutubeDL.call_args[0][0]["logger"]
+            for method, message in lines:
+                getattr(logger, method)(message)
+            for message in printed:
+                ydl.to_stdout(message)
+            return code
+
+        module.YoutubeDL.return_value.download.side_effect = download
+        return module
+
+    def test_download_passes_output_lines(self):
+        """Test that everything yt-dlp logs reaches the callback as lines."""
+        module = self._fake_yt_dlp(
+            [("debug", "[ytdgui-meta] {}\nsecond"), ("warning", "slow")]
+        )
+        lines = []
+
+        with patch.dict(sys.modules, {"yt_dlp": module}):
+            ytdlp_api.download(["-f", "best", "https://y/a"], lines.append)
+
+        module.parse_options.assert_called_once_with(["-f", "best", "https://y/a"])
+        options = module.YoutubeDL.call_args[0][0]
+        self.assertEqual(options["format"], "best")
+        self.assertEqual(lines, ["[ytdgui-meta] {}", "second", "WARNING: slow"])
+
+    def test_download_captures_printed_lines(self):
+        """Test that --print output written to stdout reaches the callback."""
+        module = self._fake_yt_dlp(
+            [("debug", "[download] Destination: a.mp4")],
+            printed=['[ytdgui-meta] {"id": "a"}', "[ytdgui-file] /out/a.mp4"],
+        )
+        lines = []
+
+        with patch.dict(sys.modules, {"yt_dlp": module}):
+            ytdlp_api.download(["https://y/a"], lines.append)
+
+        self.assertEqual(
+            lines,
+            [
+                "[download] Destination: a.mp4",
+                '[ytdgui-meta] {"id": "a"}',
+                "[ytdgui-file] /out/a.mp4",
+            ],
+        )
+        self.assertEqual(module.YoutubeDL.return_value.stdout, [])
+
+    def test_download_raises_on_error(self):
+        """Test that a failed download raises with the last error message."""
+        module = self._fake_yt_dlp([("error", "ERROR: [youtube] a: Private")], 1)
+
+        with patch.dict(sys.modules, {"yt_dlp": module}):
+            with self.assertRaises(subprocess.CalledProcessError) as context:
+                ytdlp_api.download(["https://y/a"], lambda line: None)
+
+        self.assertEqual(context.exception.output, "ERROR: [youtube] a: Private")
+        module.YoutubeDL.return_value.close.assert_called_once_with()
+        self.assertIsNone(ytdlp_api._session)
+
+    def test_download_reuses_session(self):
+        """Test that downloads with the same options share one YoutubeDL."""
+        module = self._fake_yt_dlp([("debug", "line")])
+        first, second = [], []
+
+        with patch.dict(sys.modules, {"yt_dlp": module}):
+            ytdlp_api.download(["https://y/a"], first.append)
+            ytdlp_api.download(["https://y/a"], second.append)
+            module.YoutubeDL.assert_called_once()
+
+            module.parse_options.return_value = ParsedOptions(
+                None, None, ["https://y/a"], {"format": "worst"}
+            )
+            ytdlp_api.download(["https://y/a"], lambda line: None)
+
+        self.assertEqual(first, ["line"])
+        self.assertEqual(second, ["line"])
+        self.assertEqual(module.YoutubeDL.call_count, 2)
+        module.YoutubeDL.return_value.close.assert_called_once_with()
+
+    @patch("app.ytdlp_api.importlib.util.find_spec")
+    def test_is_available(self, mock_find_spec):
+        """Test detecting the optional yt_dlp package without importing it."""
+        mock_find_spec.return_value = None
+        self.assertFalse(ytdlp_api.is_available())
+
+        mock_find_spec.return_value = object()
+        self.assertTrue(ytdlp_api.is_available())
+        mock_find_spec.assert_called_with("yt_dlp")
+
+
+if __name__ == "__main__":
+    unittest.main()